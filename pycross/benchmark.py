@@ -0,0 +1,616 @@
+# -*- coding: utf-8 -*-
+# Copyright: (c) 2020, Iskander Shafikov <s00mbre@gmail.com>
+# GNU General Public License v3.0+ (see LICENSE.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+## @package pycross.benchmark
+# @brief Console benchmarks for the core (GUI-independent) crossword objects -- see main().
+# The 'render' command (grid image export) also needs PyQt5; it runs on the offscreen
+# Qt platform unless `QT_QPA_PLATFORM` is set.
+#
+# Usage examples (run from the 'pycross' directory):
+# <pre>
+#   python benchmark.py wordsrc
+#   python benchmark.py wordsrc --db de fr --queries 500
+#   python benchmark.py db
+#   python benchmark.py generate
+#   python benchmark.py generate --methods csp recurse --sizes 7 9 --patterns 1 2 3
+#   python benchmark.py grid --sizes 15 25
+#   python benchmark.py stack --sizes 5 7 --seeds 0 1 2
+#   python benchmark.py stack --sizes --chain 1500 --seeds 0 -f -d de
+#   python benchmark.py suite -o results.json
+#   python benchmark.py suite --sizes 7 --sources de --seeds 0 -o new.json
+#   python benchmark.py compare baseline.json new.json
+#   python benchmark.py render --sizes 25 --dpi 300 600
+# </pre>
+import os, sys, json, argparse, timeit, sqlite3, shutil, tempfile, platform
+import numpy as np
+from utils.globalvars import *
+
+# the core modules use the gettext '_()' function, so install it first
+switch_lang('')
+
+from wordsrc import DBWordsource, TextWordsource, TextfileWordsource, MultiWordsource
+from crossword import Crossword, Wordgrid, GenMetrics, CWTimeoutError, BLANK, FILLER
+from sqlitedb import Sqlitedb
+
+# ******************************************************************************** #
+
+## Reads words from word list text files and SQLite dictionaries.
+# @param files `iterable` paths to text files (one word per line)
+# @param dbs `iterable` short names of SQLite dictionaries in utils::globalvars::DICFOLDER, e.g. 'de'
+# @returns `list` of `str` the collected words (lowercase, duplicates removed)
+def load_words(files=(), dbs=()):
+    words = []
+    for f in files:
+        words += [w[0] for w in TextfileWordsource(f, indexed=False).words]
+    for db in dbs:
+        conn = sqlite3.connect(os.path.join(DICFOLDER, db + '.db'))
+        words += [row[0] for row in conn.execute(f"select {SQL_TABLES['words']['fwords']} from {SQL_TABLES['words']['table']}")]
+        conn.close()
+    return list(dict.fromkeys(w.lower() for w in words if w))
+
+## Makes random word patterns (masks) from the given words.
+# Each mask keeps a random number of letters (from none to half the word length)
+# of a random source word; the other letters are replaced by `blank`.
+# @param words `list` of `str` source words
+# @param count `int` number of masks to make
+# @param blank `str` placeholder character for unknown letters
+# @param seed `int` random seed
+# @returns `list` of `str` the masks
+def make_masks(words, count, blank='_', seed=0):
+    rng = np.random.default_rng(seed)
+    masks = []
+    while len(masks) < count:
+        w = words[rng.integers(len(words))]
+        if len(w) < 2: continue
+        keep = set(rng.choice(len(w), rng.integers(len(w) // 2 + 1), replace=False).tolist())
+        masks.append(''.join(c if i in keep else blank for i, c in enumerate(w)))
+    return masks
+
+## Times a callable over a list of word patterns.
+# @param func `callable` function taking a single argument (the mask)
+# @param masks `list` of `str` word patterns
+# @returns `2-tuple` (`float` total seconds, `list` results of each call)
+def time_queries(func, masks):
+    results = []
+    t = timeit.default_timer()
+    for m in masks:
+        results.append(func(m))
+    return (timeit.default_timer() - t, results)
+
+# ******************************************************************************** #
+
+## Benchmarks TextWordsource pattern queries: positional index vs. regex scan.
+# @param args `argparse.Namespace` parsed command-line arguments
+def bench_wordsrc(args):
+    words = load_words(args.file, args.db)
+    print(f"Loaded {len(words)} words")
+    masks = make_masks(words, args.queries, '_', args.seed)
+
+    t = timeit.default_timer()
+    src_scan = TextWordsource(words, indexed=False)
+    print(f"Load (regex scan):  {timeit.default_timer() - t:.3f} sec")
+    t = timeit.default_timer()
+    src_index = TextWordsource(words, indexed=True)
+    print(f"Load (index):       {timeit.default_timer() - t:.3f} sec")
+
+    t_scan, res_scan = time_queries(lambda m: src_scan.fetch(m, '_', shuffle=False, truncate=False), masks)
+    t_index, res_index = time_queries(lambda m: src_index.fetch(m, '_', shuffle=False, truncate=False), masks)
+    if res_scan != res_index:
+        print('ERROR: index and regex scan results differ!')
+        return 1
+    found = sum(len(r) for r in res_index)
+    print(f"{len(masks)} queries, {found} words found")
+    print(f"Regex scan:  {t_scan * 1000 / len(masks):.3f} ms / query")
+    print(f"Index:       {t_index * 1000 / len(masks):.3f} ms / query")
+    print(f"Speedup:     x{t_scan / t_index:.1f}")
+
+    t_count, res_count = time_queries(lambda m: src_index.count(m, '_'), masks)
+    t_exists, res_exists = time_queries(lambda m: src_index.exists(m, '_'), masks)
+    if res_count != [len(r) for r in res_index] or res_exists != [bool(r) for r in res_index]:
+        print('ERROR: count() / exists() and fetch() results differ!')
+        return 1
+    print(f"Count:       {t_count * 1000 / len(masks):.3f} ms / query")
+    print(f"Exists:      {t_exists * 1000 / len(masks):.3f} ms / query")
+    return 0
+
+## @brief Benchmarks DBWordsource pattern queries before and after the DB schema upgrade.
+# The dictionaries are copied to a temporary folder and upgraded there
+# (see dbapi::Sqlitedb::upgrade_schema()), so the installed files are left intact.
+# @param args `argparse.Namespace` parsed command-line arguments
+def bench_db(args):
+    tempdir = tempfile.mkdtemp()
+    ret = 0
+    try:
+        for lang in args.db:
+            dbpath = shutil.copy(os.path.join(DICFOLDER, lang + '.db'), tempdir)
+            print(f"\n{lang}: {dbpath}")
+            words = load_words(dbs=(lang,))
+            masks = make_masks(words, args.queries, '_', args.seed)
+            timings = []
+            results = []
+            for upgrade in (False, True):
+                db = Sqlitedb(dbpath, fullpath=True)
+                if upgrade:
+                    t = timeit.default_timer()
+                    db.upgrade_schema()
+                    print(f"Schema upgrade: {timeit.default_timer() - t:.2f} sec")
+                src = DBWordsource(SQL_TABLES, db, shuffle=False)
+                print(f"Indexed = {src.indexed}, size = {os.path.getsize(dbpath) / 1024 / 1024:.1f} MB")
+                t, res = time_queries(lambda m: sorted(src.fetch(m, '_', args.pos, shuffle=False, truncate=False)), masks)
+                timings.append(t)
+                results.append(res)
+                print(f"{t * 1000 / len(masks):.3f} ms / query")
+                del src
+                db.disconnect()
+            if results[0] != results[1]:
+                print('ERROR: results before and after the upgrade differ!')
+                ret = 1
+            else:
+                print(f"Speedup: x{timings[0] / timings[1]:.1f}")
+    finally:
+        shutil.rmtree(tempdir, ignore_errors=True)
+    return ret
+
+## @brief Benchmarks the crossword generation methods (see crossword::Crossword::generate()).
+# Each method fills the same basic grids (see crossword::Crossword::basic_grid()) 
+# with the same word source; the success rate and generation time are reported.
+# @param args `argparse.Namespace` parsed command-line arguments
+def bench_generate(args):
+    src = MultiWordsource(max_fetch=args.max_fetch)
+    for f in args.file:
+        src.add(TextfileWordsource(f))
+    for db in args.db:
+        src.add(DBWordsource(SQL_TABLES, Sqlitedb(db)))
+    print(f"{'method':<10}{'size':>6}{'pattern':>9}{'result':>9}{'time':>10}{'nodes':>9}{'backtracks':>12}{'fetches':>9}{'fetch time':>12}")
+    for method in args.methods:
+        solved = 0
+        total_time = 0.0
+        for size in args.sizes:
+            for pattern in args.patterns:
+                cw = Crossword(Crossword.basic_grid(size, size, pattern), wordsource=src, pos=args.pos, log=None)
+                status = []
+                t = timeit.default_timer()
+                res = cw.generate(method=method, timeout=args.timeout, seed=args.seed,
+                                  ontimeout=lambda timeout: status.append('TIMEOUT'), 
+                                  onerror=lambda err: status.append('ERROR'))
+                t = timeit.default_timer() - t
+                if res and cw.validate():
+                    # the grid is filled, but has words missing from the word source
+                    res = False
+                    status = ['INVALID']
+                status = 'OK' if res else (status[0] if status else 'FAIL')
+                solved += bool(res)
+                total_time += t
+                m = cw.metrics
+                print(f"{method:<10}{size:>6}{pattern:>9}{status:>9}{t:>9.2f}s{m.nodes:>9}{m.backtracks:>12}{m.suggest_calls:>9}{m.suggest_time:>11.2f}s")
+        print(f"{method}: solved {solved} / {len(args.sizes) * len(args.patterns)} in {total_time:.2f} sec\n")
+    return 0
+
+## @brief Micro-benchmarks the Wordgrid methods called in the generation hot path.
+# The grids are basic grids (see crossword::Crossword::basic_grid()) with filled-in letters.
+# @param args `argparse.Namespace` parsed command-line arguments
+def bench_grid(args):
+    print(f"{'size':>6}{'words':>7}  {'method':<20}{'time / call':>14}")
+    for size in args.sizes:
+        for pattern in args.patterns:
+            grid = Crossword.basic_grid(size, size, pattern).replace(BLANK, 'a')
+            wgrid = Wordgrid(grid)
+            words = wgrid.words
+            if not words: continue
+            cells = [(x, y) for y in range(wgrid.height) for x in range(wgrid.width)]
+            texts = [wgrid.get_word_str(w) for w in words]
+            calls = (('get_word_str', lambda: [wgrid.get_word_str(w) for w in words], len(words)),
+                     ('is_word_complete', lambda: [wgrid.is_word_complete(w) for w in words], len(words)),
+                     ('change_word', lambda: [wgrid.change_word(w, t) for w, t in zip(words, texts)], len(words)),
+                     ('intersects_of', lambda: [wgrid.intersects_of(w) for w in words], len(words)),
+                     ('find_by_coord', lambda: [wgrid.find_by_coord(c, False) for c in cells], len(cells)))
+            for name, func, count in calls:
+                t = timeit.timeit(func, number=args.repeat)
+                print(f"{size:>6}{len(words):>7}  {name:<20}{t * 1e6 / (args.repeat * count):>11.2f} us")
+    return 0
+
+## @brief Runs a generation engine (a Crossword generation method) the way crossword::Crossword::generate() does.
+# @param cw `crossword::Crossword` the crossword to fill
+# @param engine `callable` the generation method, e.g. `cw.generate_recurse`
+# @param seed `int` random seed of the generation
+# @param timeout `float` generation timeout in seconds
+# @returns `str` the result: 'OK', 'FAIL', 'TIMEOUT' or 'RECURSION' (recursion limit exceeded)
+def run_engine(cw, engine, seed, timeout):
+    cw.metrics = GenMetrics('recurse', seed)
+    cw.rng = np.random.default_rng(seed)
+    cw.reset_used()
+    cw.time_start = timeit.default_timer()
+    try:
+        return 'OK' if engine(timeout=timeout) else 'FAIL'
+    except CWTimeoutError:
+        return 'TIMEOUT'
+    except RecursionError:
+        return 'RECURSION'
+
+## @brief Makes a 'snake' grid: a chain of words, each one crossing just the previous and the next one.
+# Filling such a grid from one end takes as many nested steps as there are words.
+# @param count `int` number of words
+# @param length `int` word length, >= 3
+# @returns `str` the grid rows
+def make_chain_grid(count, length=6):
+    rows = [[FILLER] * length for _ in range((count // 2 + 1) * (length - 1) + 1)]
+    for i in range(count):
+        top = (i // 2) * (length - 1)
+        if i % 2 == 0:
+            # across word
+            rows[top][:] = [BLANK] * length
+        else:
+            # down word at the right and left edges in turns
+            col = length - 1 if (i // 2) % 2 == 0 else 0
+            for row in rows[top:top + length]: row[col] = BLANK
+    return '\n'.join(''.join(row) for row in rows if BLANK in row)
+
+## @brief Compares the recursive generator with its explicit-stack version.
+# crossword::Crossword::generate_recurse() and crossword::Crossword::generate_stack()
+# fill the same grids with the same seeds; their results, fills and node counts must match
+# (unless the recursion limit is hit).
+# @param args `argparse.Namespace` parsed command-line arguments
+# @returns `int` 1 if the fills differ, 0 otherwise
+def bench_stack(args):
+    sources = [TextfileWordsource(f) for f in args.file] + [DBWordsource(SQL_TABLES, Sqlitedb(db)) for db in args.db]
+    grids = [(f"{size}x{size}-{pattern}", Crossword.basic_grid(size, size, pattern)) for size in args.sizes for pattern in args.patterns]
+    if args.chain: grids.append((f"chain-{args.chain}", make_chain_grid(args.chain)))
+    print(f"{'grid':<12}{'seed':>6}{'recurse':>11}{'time':>9}{'stack':>11}{'time':>9}{'nodes':>9}  fill")
+    mismatches = 0
+    for grid_name, grid in grids:
+        for seed in args.seeds:
+            results = []
+            for engine in ('generate_recurse', 'generate_stack'):
+                src = MultiWordsource(max_fetch=args.max_fetch)
+                for wsrc in sources: src.add(wsrc)
+                cw = Crossword(grid, wordsource=src, pos=args.pos, log=None)
+                t = timeit.default_timer()
+                status = run_engine(cw, getattr(cw, engine), seed, args.timeout)
+                results.append((status, timeit.default_timer() - t, cw.metrics.nodes, cw.words.tostr()))
+            (status1, t1, nodes1, fill1), (status2, t2, nodes2, fill2) = results
+            if status1 == 'RECURSION' or 'TIMEOUT' in (status1, status2):
+                # the runs stopped at different points
+                match = 'n/a'
+            elif (status1, nodes1, fill1) == (status2, nodes2, fill2):
+                match = 'same'
+            else:
+                match = 'DIFFERENT'
+                mismatches += 1
+            print(f"{grid_name:<12}{seed:>6}{status1:>11}{t1:>8.2f}s{status2:>11}{t2:>8.2f}s{nodes2:>9}  {match}")
+    print(f"\n{mismatches} mismatch(es)")
+    return 1 if mismatches else 0
+
+## Makes the grids for the benchmark suite.
+# @param sizes `iterable` of `int` sizes of the basic grids (square grids)
+# @param patterns `iterable` of `int` basic grid patterns (see crossword::Crossword::basic_grid());
+# grids without words (pattern 6) are skipped
+# @param files `iterable` of `str` crossword files (XPF / IPUZ), which are cleared before generation
+# @returns `list` of 2-tuples: (`str` grid name, `str` grid rows)
+def make_suite_grids(sizes, patterns, files):
+    grids = []
+    for size in sizes:
+        for pattern in patterns:
+            grid = Crossword.basic_grid(size, size, pattern)
+            if Wordgrid(grid).words:
+                grids.append((f"{size}x{size}-{pattern}", grid))
+    for f in files:
+        wgrid = Wordgrid(f, 'file')
+        wgrid.clear()
+        grids.append((os.path.basename(f), wgrid.tostr()))
+    return grids
+
+## Makes a word source for the benchmark suite.
+# @param name `str` short name of an SQLite dictionary in utils::globalvars::DICFOLDER (e.g. 'de')
+# or path to a word list text file
+# @returns `wordsrc::Wordsource` the word source
+def make_suite_source(name):
+    if name.lower() in LANG:
+        return DBWordsource(SQL_TABLES, Sqlitedb(name))
+    return TextfileWordsource(name if os.path.isfile(name) else os.path.join(DICFOLDER, name))
+
+## Calculates the statistics of a group of benchmark runs.
+# @param runs `list` of `dict` runs (see bench_suite())
+# @returns `dict` stats: number of runs, success rate, time percentiles (p50, p90, p95) and max time,
+# mean nodes and backtracks
+def suite_stats(runs):
+    times = [run['time'] for run in runs]
+    p50, p90, p95 = np.percentile(times, [50, 90, 95]).tolist() if times else (0.0, 0.0, 0.0)
+    return {'runs': len(runs), 'solved': sum(run['success'] for run in runs),
+            'success_rate': sum(run['success'] for run in runs) / len(runs) if runs else 0.0,
+            'time_p50': p50, 'time_p90': p90, 'time_p95': p95, 'time_max': max(times, default=0.0),
+            'nodes_mean': float(np.mean([run['nodes'] for run in runs])) if runs else 0.0,
+            'backtracks_mean': float(np.mean([run['backtracks'] for run in runs])) if runs else 0.0}
+
+## @brief Runs the generation benchmark suite: each method fills each grid with each word source and seed.
+# The word sources are loaded once, but each run gets a fresh wordsrc::MultiWordsource (with an empty cache),
+# so the runs don't depend on each other. The results (each run and the stats per method / source
+# and per method) are saved to a JSON file that can be compared with a baseline -- see bench_compare().
+# @param args `argparse.Namespace` parsed command-line arguments
+def bench_suite(args):
+    grids = make_suite_grids(args.sizes, args.patterns, args.xpf)
+    sources = []
+    for name in args.sources:
+        t = timeit.default_timer()
+        sources.append((name, make_suite_source(name)))
+        print(f"Loaded '{name}' in {timeit.default_timer() - t:.2f} sec")
+    total = len(grids) * len(sources) * len(args.methods) * len(args.seeds)
+    print(f"{total} runs: {len(grids)} grids x {len(sources)} sources x {len(args.methods)} methods x {len(args.seeds)} seeds\n")
+    print(f"{'method':<10}{'source':<20}{'grid':<20}{'seed':>6}{'result':>9}{'time':>10}{'nodes':>9}")
+
+    runs = []
+    for name, wsrc in sources:
+        for method in args.methods:
+            for grid_name, grid in grids:
+                for seed in args.seeds:
+                    src = MultiWordsource(max_fetch=args.max_fetch)
+                    src.add(wsrc)
+                    cw = Crossword(grid, wordsource=src, pos=args.pos, log=None)
+                    t = timeit.default_timer()
+                    metrics = cw.generate(method=method, timeout=args.timeout, seed=seed)
+                    t = timeit.default_timer() - t
+                    if metrics and cw.validate():
+                        metrics.success = False
+                        metrics.status = 'invalid'
+                    runs.append({'method': method, 'source': name, 'grid': grid_name, 'seed': seed,
+                                 'success': metrics.success, 'status': metrics.status, 'time': t,
+                                 'nodes': metrics.nodes, 'backtracks': metrics.backtracks,
+                                 'suggest_calls': metrics.suggest_calls, 'suggest_time': metrics.suggest_time})
+                    print(f"{method:<10}{name[:19]:<20}{grid_name[:19]:<20}{seed:>6}{metrics.status.upper():>9}{t:>9.2f}s{metrics.nodes:>9}")
+
+    summary = {}
+    for method in args.methods:
+        summary[method] = suite_stats([run for run in runs if run['method'] == method])
+        for name, _ in sources:
+            summary[f"{method}/{name}"] = suite_stats([run for run in runs if run['method'] == method and run['source'] == name])
+
+    print(f"\n{'group':<30}{'solved':>10}{'p50':>9}{'p90':>9}{'p95':>9}")
+    for key, stats in summary.items():
+        print(f"{key[:29]:<30}{stats['solved']:>5} / {stats['runs']:<3}{stats['time_p50']:>8.2f}s{stats['time_p90']:>8.2f}s{stats['time_p95']:>8.2f}s")
+
+    results = {'config': {'grids': [name for name, _ in grids], 'sources': args.sources, 'methods': args.methods,
+                          'seeds': args.seeds, 'timeout': args.timeout, 'max_fetch': args.max_fetch, 'pos': args.pos},
+               'platform': {'python': platform.python_version(), 'system': platform.platform(), 'cpus': os.cpu_count()},
+               'summary': summary, 'runs': runs}
+    if args.output:
+        with open(args.output, 'w', encoding=ENCODING) as outfile:
+            json.dump(results, outfile, indent='\t')
+        print(f"\nResults saved to {args.output}")
+    return 0
+
+## @brief Compares benchmark suite results with a baseline (see bench_suite()) and reports regressions.
+# A regression is a lower success rate in a group of runs, a time percentile (p50 / p90) longer
+# than in the baseline by more than the given tolerance, or a run solved in the baseline and not solved now.
+# @param args `argparse.Namespace` parsed command-line arguments
+# @returns `int` 1 if regressions are found, 0 otherwise
+def bench_compare(args):
+    with open(args.baseline, 'r', encoding=ENCODING) as infile:
+        baseline = json.load(infile)
+    with open(args.results, 'r', encoding=ENCODING) as infile:
+        results = json.load(infile)
+    if baseline['config'] != results['config']:
+        print('WARNING: the benchmark configurations differ, only the common groups and runs are compared!')
+
+    regressions = []
+    print(f"{'group':<30}{'success rate':>22}{'p50':>22}{'p90':>22}")
+    for key, new in results['summary'].items():
+        old = baseline['summary'].get(key, None)
+        if old is None: continue
+        flags = []
+        if new['success_rate'] < old['success_rate'] - 1e-9:
+            flags.append('success rate')
+        for p in ('time_p50', 'time_p90'):
+            # ignore differences below the timer noise
+            if new[p] > old[p] * (1.0 + args.tolerance) and new[p] - old[p] > args.min_time:
+                flags.append(p)
+        if flags: regressions.append(f"{key}: {', '.join(flags)}")
+        print(f"{key[:29]:<30}{old['success_rate']:>10.0%} -> {new['success_rate']:<6.0%}"
+              f"{old['time_p50']:>10.2f} -> {new['time_p50']:<6.2f}{old['time_p90']:>10.2f} -> {new['time_p90']:<6.2f}"
+              f"{'  REGRESSION' if flags else ''}")
+
+    runs_old = {(run['method'], run['source'], run['grid'], run['seed']): run for run in baseline['runs']}
+    for run in results['runs']:
+        old = runs_old.get((run['method'], run['source'], run['grid'], run['seed']), None)
+        if old and old['success'] and not run['success']:
+            regressions.append(f"{run['method']}/{run['source']}/{run['grid']}/seed {run['seed']}: {old['status'].upper()} -> {run['status'].upper()}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        for reg in regressions: print(f"  {reg}")
+        return 1
+    print('\nNo regressions')
+    return 0
+
+## @brief Paints the grid the way the export did before forms::CwRenderCache (the baseline for bench_render()).
+# The brushes, pens and fonts are made for every cell, and the word numbers are looked up
+# with crossword::Wordgrid::find_by_coord() and drawn as text.
+# @param painter `QtGui.QPainter` the painter
+# @param words `crossword::Wordgrid` the grid to paint
+# @param cliprect `QtCore.QRectF` the area to paint the grid in
+# @param clear_cw `bool` whether to paint the grid without letters
+def paint_grid_percell(painter, words, cliprect, clear_cw=True):
+    from PyQt5 import QtGui, QtCore
+    from utils.utils import make_font
+    from guisettings import CWSettings
+    from crossword import FILLER2
+
+    num_settings = CWSettings.settings['grid_style']['numbers']
+    gridline_width = CWSettings.settings['grid_style']['line_width']
+    cols = words.width
+    rows = words.height
+    cell_w = int((cliprect.width() + gridline_width) / cols + 2 * gridline_width)
+    cell_h = int((cliprect.height() + gridline_width) / rows + 2 * gridline_width)
+    cell_sz = min(cell_w, cell_h)
+    v_offset = cliprect.top()
+    for r in range(rows):
+        h_offset = cliprect.left()
+        for c in range(cols):
+            coord = (c, r)
+            ch = words.get_char(coord)
+            found = words.find_by_coord(coord)
+            w = found['h'] or found['v']
+            dic_format = CWSettings.settings['cell_format']['NORMAL']
+            if ch == FILLER:
+                dic_format = CWSettings.settings['cell_format']['FILLER']
+            elif ch == FILLER2:
+                dic_format = CWSettings.settings['cell_format']['FILLER2'].copy()
+                dic_format.update({'bg_pattern': QtCore.Qt.NoBrush})
+            elif ch == BLANK:
+                dic_format = CWSettings.settings['cell_format']['BLANK']
+            brush_cell = QtGui.QBrush(QtGui.QColor.fromRgba(dic_format['bg_color']), dic_format['bg_pattern'])
+            brush_cell_border = QtGui.QBrush(QtGui.QColor.fromRgba(CWSettings.settings['grid_style']['line_color']))
+            if ch != FILLER2:
+                pen_cell = QtGui.QPen(brush_cell_border, gridline_width, CWSettings.settings['grid_style']['line'])
+            else:
+                pen_cell = QtGui.QPen(QtCore.Qt.NoPen)
+            font_cell = make_font(dic_format['font_name'], dic_format['font_size'],
+                                  dic_format['font_weight'], dic_format['font_italic'])
+            pen_cell_font = QtGui.QPen(QtGui.QColor.fromRgba(dic_format['fg_color']))
+            cell_rect = QtCore.QRectF(h_offset + gridline_width, v_offset + gridline_width,
+                                      cell_sz - 2 * gridline_width, cell_sz - 2 * gridline_width)
+            painter.setPen(pen_cell)
+            painter.setBrush(brush_cell)
+            painter.drawRect(cell_rect)
+            if num_settings['show'] and not w is None:
+                pen_num_font = QtGui.QPen(QtGui.QColor.fromRgba(num_settings['color']))
+                font_num = make_font(num_settings['font_name'], num_settings['font_size'],
+                                     num_settings['font_weight'], num_settings['font_italic'])
+                painter.setPen(pen_num_font)
+                painter.setFont(font_num)
+                # (the original passed float coordinates, which recent PyQt5 versions reject)
+                painter.drawText(int(cell_rect.x()), int(cell_rect.y()), int(cell_rect.width() // 2), int(cell_rect.height() // 2),
+                                 QtCore.Qt.AlignCenter, str(w.num))
+            if not clear_cw and ch != BLANK and ch != FILLER and ch != FILLER2:
+                ch = ch.upper() if CWSettings.settings['grid_style']['char_case'] == 'upper' else ch.lower()
+                painter.setPen(pen_cell_font)
+                painter.setFont(font_cell)
+                painter.drawText(cell_rect.toRect(), dic_format['align'], ch)
+            h_offset += cell_sz - 2 * gridline_width
+        v_offset += cell_sz - 2 * gridline_width
+
+## @brief Benchmarks the grid image export (forms::CwRenderCache::paint_grid()).
+# Each grid is painted into an image the way gui::MainWindow::export_cw() does it:
+# with a cold style cache (brushes, pens, fonts and number glyphs made anew for the paint)
+# and with a warm one (reused from the previous paint). The baseline is the painting
+# without the cache, making the styles for every cell (see paint_grid_percell()).
+# @param args `argparse.Namespace` parsed command-line arguments
+# @returns `int` 0
+def bench_render(args):
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5 import QtGui, QtCore
+    app = QtGui.QGuiApplication.instance() or QtGui.QGuiApplication(sys.argv[:1])
+    from forms import CwRenderCache
+
+    print(f"{'size':>6}{'dpi':>6}{'image':>13}  {'per cell':>12}{'cold cache':>12}{'warm cache':>12}{'speedup':>9}")
+    for size in args.sizes:
+        wgrid = Wordgrid(Crossword.basic_grid(size, size, args.pattern).replace(BLANK, 'a'))
+        for dpi in args.dpi:
+            cell_px = dpi / 25.4 * args.mm_per_cell
+            img = QtGui.QImage(int(size * cell_px), int(size * cell_px), QtGui.QImage.Format_ARGB32)
+
+            def paint(mode):
+                if mode == 'cold': CwRenderCache.clear()
+                img.fill(QtCore.Qt.white)
+                painter = QtGui.QPainter(img)
+                if mode == 'percell':
+                    paint_grid_percell(painter, wgrid, QtCore.QRectF(img.rect()), args.clear)
+                else:
+                    CwRenderCache.paint_grid(painter, wgrid, QtCore.QRectF(img.rect()), args.clear)
+                painter.end()
+
+            t_base = timeit.timeit(lambda: paint('percell'), number=args.repeat) / args.repeat
+            t_cold = timeit.timeit(lambda: paint('cold'), number=args.repeat) / args.repeat
+            t_warm = timeit.timeit(lambda: paint('warm'), number=args.repeat) / args.repeat
+            print(f"{size:>6}{dpi:>6}{img.width():>7}x{img.height():<5}  {t_base * 1e3:>9.1f} ms{t_cold * 1e3:>9.1f} ms"
+                  f"{t_warm * 1e3:>9.1f} ms{t_base / t_cold:>8.1f}x")
+    return 0
+
+# ******************************************************************************** #
+
+## Main function: parses command-line arguments and runs the requested benchmark.
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks for the crossword generation core')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    p = subparsers.add_parser('wordsrc', help='Text word source: positional index vs. regex scan')
+    p.add_argument('-f', '--file', default=[os.path.join(DICFOLDER, 'english-words.20')], nargs='*', help='Word list text files')
+    p.add_argument('-d', '--db', default=['de', 'fr'], nargs='*', help='SQLite dictionaries to take words from (short names)')
+    p.add_argument('-q', '--queries', type=int, default=200, help='Number of pattern queries')
+    p.add_argument('-s', '--seed', type=int, default=0, help='Random seed for the query patterns')
+    p.set_defaults(func=bench_wordsrc)
+
+    p = subparsers.add_parser('db', help='SQLite word source: LIKE scan vs. schema with length / letter indexes')
+    p.add_argument('-d', '--db', default=['de', 'fr'], nargs='*', help='SQLite dictionaries (short names)')
+    p.add_argument('-q', '--queries', type=int, default=200, help='Number of pattern queries')
+    p.add_argument('-s', '--seed', type=int, default=0, help='Random seed for the query patterns')
+    p.add_argument('-p', '--pos', default=None, nargs='*', help='Parts of speech to filter, e.g. N V')
+    p.set_defaults(func=bench_db)
+
+    p = subparsers.add_parser('generate', help='Crossword generation methods on basic grids')
+    p.add_argument('-m', '--methods', default=['csp', 'iter', 'recurse'], nargs='*', help='Generation methods to compare')
+    p.add_argument('-z', '--sizes', type=int, default=[5, 7], nargs='*', help='Grid sizes (square grids)')
+    p.add_argument('-n', '--patterns', type=int, default=[1, 2, 3, 4, 5, 6], nargs='*', help='Basic grid patterns (1 - 6)')
+    p.add_argument('-f', '--file', default=[os.path.join(DICFOLDER, 'english-words.20')], nargs='*', help='Word list text files')
+    p.add_argument('-d', '--db', default=[], nargs='*', help='SQLite dictionaries (short names)')
+    p.add_argument('-p', '--pos', default=None, nargs='*', help='Parts of speech to filter, e.g. N V')
+    p.add_argument('-t', '--timeout', type=float, default=20.0, help='Generation timeout in seconds')
+    p.add_argument('-x', '--max_fetch', type=int, default=500, help='Max number of suggestions per word')
+    p.add_argument('-s', '--seed', type=int, default=None, help='Random seed of the generation (random if not set)')
+    p.set_defaults(func=bench_generate)
+
+    p = subparsers.add_parser('grid', help='Wordgrid methods used in the generation hot path')
+    p.add_argument('-z', '--sizes', type=int, default=[15, 25], nargs='*', help='Grid sizes (square grids)')
+    p.add_argument('-n', '--patterns', type=int, default=[1, 5], nargs='*', help='Basic grid patterns (1 - 6)')
+    p.add_argument('-r', '--repeat', type=int, default=100, help='Number of passes over all words / cells')
+    p.set_defaults(func=bench_grid)
+
+    p = subparsers.add_parser('stack', help='Recursive generator vs. its explicit-stack version: speed and fills')
+    p.add_argument('-z', '--sizes', type=int, default=[5, 7, 9], nargs='*', help='Grid sizes (square grids)')
+    p.add_argument('-n', '--patterns', type=int, default=[1, 2, 3, 4, 5], nargs='*', help='Basic grid patterns (1 - 6)')
+    p.add_argument('-c', '--chain', type=int, default=0, help='Add a grid with a chain of this many words (deeper than the recursion limit if > 1000)')
+    p.add_argument('-s', '--seeds', type=int, default=[0, 1, 2], nargs='*', help='Random seeds (each grid is filled once per seed)')
+    p.add_argument('-f', '--file', default=[os.path.join(DICFOLDER, 'english-words.20')], nargs='*', help='Word list text files')
+    p.add_argument('-d', '--db', default=[], nargs='*', help='SQLite dictionaries (short names)')
+    p.add_argument('-p', '--pos', default=None, nargs='*', help='Parts of speech to filter, e.g. N V')
+    p.add_argument('-t', '--timeout', type=float, default=10.0, help='Generation timeout in seconds')
+    p.add_argument('-x', '--max_fetch', type=int, default=500, help='Max number of suggestions per word')
+    p.set_defaults(func=bench_stack)
+
+    p = subparsers.add_parser('suite', help='Generation benchmark suite: grids x word sources x methods x seeds')
+    p.add_argument('-m', '--methods', default=['iter', 'recurse'], nargs='*', help='Generation methods')
+    p.add_argument('-z', '--sizes', type=int, default=[7, 15, 21], nargs='*', help='Basic grid sizes (square grids)')
+    p.add_argument('-n', '--patterns', type=int, default=[1, 2, 3, 4, 5], nargs='*', help='Basic grid patterns (1 - 6)')
+    p.add_argument('-g', '--xpf', default=[os.path.join(DICFOLDER, 'Sep11-2008.xpf')], nargs='*', help='Crossword files (XPF / IPUZ) to use as grids (cleared)')
+    p.add_argument('-d', '--sources', default=['english-words.20', 'de', 'fr'], nargs='*', help='Word sources: SQLite dictionaries (short names) or word list files')
+    p.add_argument('-s', '--seeds', type=int, default=[0, 1, 2], nargs='*', help='Random seeds (each grid is filled once per seed)')
+    p.add_argument('-p', '--pos', default=None, nargs='*', help='Parts of speech to filter, e.g. N V')
+    p.add_argument('-t', '--timeout', type=float, default=10.0, help='Generation timeout in seconds')
+    p.add_argument('-x', '--max_fetch', type=int, default=500, help='Max number of suggestions per word')
+    p.add_argument('-o', '--output', default='', help='JSON file to save the results to')
+    p.set_defaults(func=bench_suite)
+
+    p = subparsers.add_parser('compare', help='Compare benchmark suite results with a baseline')
+    p.add_argument('baseline', help='Baseline results (JSON file saved by the suite command)')
+    p.add_argument('results', help='New results (JSON file saved by the suite command)')
+    p.add_argument('--tolerance', type=float, default=0.2, help='Max relative increase of time percentiles')
+    p.add_argument('--min_time', type=float, default=0.05, help='Min absolute increase of time percentiles (seconds) to report')
+    p.set_defaults(func=bench_compare)
+
+    p = subparsers.add_parser('render', help='Grid image export (PyQt5): per-cell styles vs. cold and warm style cache')
+    p.add_argument('-z', '--sizes', type=int, default=[15, 25], nargs='*', help='Grid sizes (square grids)')
+    p.add_argument('-n', '--pattern', type=int, default=1, help='Basic grid pattern (1 - 6)')
+    p.add_argument('--dpi', type=int, default=[72, 300, 600], nargs='*', help='Image resolutions (dots per inch)')
+    p.add_argument('--mm_per_cell', type=float, default=20, help='Cell size in millimeters')
+    p.add_argument('-c', '--clear', action='store_true', help='Paint the grid without letters')
+    p.add_argument('-r', '--repeat', type=int, default=5, help='Number of paints per grid and resolution')
+    p.set_defaults(func=bench_render)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+# ******************************************************************************** #
+
+## Program entry point.
+if __name__ == '__main__':
+    main()
@@ -9,7 +9,7 @@
 # The classes implemented here are independent of GUI and can be used in a console environment
 # or accessed by plugins.
 from utils.globalvars import *
-from utils.utils import *
+from utils.common import *
 
 import sys, os, json, datetime, timeit, copy
 import numpy as np
@@ -37,6 +37,14 @@ ___**_*_**___
 *_*********_*"""
 ## indentation character(s) in log messages
 LOG_INDENT = '\t'
+## log level: generation start / end, results and errors
+LOG_INFO = 20
+## log level: words (paths) being filled, fetched suggestions, failures for words
+LOG_DEBUG = 10
+## log level: each tried suggestion, grid snapshots, skipped and cleared words
+LOG_TRACE = 5
+## log level: logging off
+LOG_OFF = 100
 
 # ******************************************************************************** #
 
@@ -81,6 +89,9 @@ class MLStripper(HTMLParser):
 # the start coordinate given by Coords::start and the end coordinate given by Coords::end.
 # All coordinates are given as 2-tuples (x, y): x = row, y = column (0-based)
 class Coords:
+
+    # compact objects: no per-instance dict
+    __slots__ = ('start', 'end', 'dir', 'coords')
     
     ## The Coords constructor: initializes and validates Coords::start and Coords::end.
     # @param coord_start `2-tuple` the start coordinate (x, y)
@@ -112,30 +123,26 @@ class Coords:
             self.dir = 'h'
         else:
             raise CWError(_('One coordinate must be equal!'))
+        ## `tuple` the (x, y) coordinates between Coords::start and Coords::end (see coord_array())
+        if self.dir == 'h':
+            self.coords = tuple((x, self.start[1]) for x in range(self.start[0], self.end[0] + 1))
+        else:
+            self.coords = tuple((self.start[0], y) for y in range(self.start[1], self.end[1] + 1))
 
     ## Outputs a list of (x,y) coordinates (`2-tuples`) between Coords::start and Coords::end.
     # @returns `list` a list of coordinate `2-tuples` beginning with Coords::start and ending with Coords::end
     def coord_array(self):
-        if self.dir == 'h': 
-            l = self.end[0] - self.start[0] + 1
-            return [(i + self.start[0], self.start[1]) for i in range(l)]
-        else:
-            l = self.end[1] - self.start[1] + 1
-            return [(self.start[0], i + self.start[1]) for i in range(l)]
+        return list(self.coords)
         
     ## Checks if a coordinate lies anywhere between Coords::start and Coords::end.
     # @param coord [tuple] the coordinate to check
     # @returns `bool` `True` if coord crosses (lies between Coords::start and Coords::end), `False` otherwise
     def does_cross(self, coord):
-        for c in self.coord_array():
-            if c == coord: 
-                return True
-        return False
+        return coord in self.coords
 
     ## Python `len()` overload: the distance between Coords::start and Coords::end.
     def __len__(self):
-        cooord_index = 1 if self.dir == 'v' else 0
-        return self.end[cooord_index] - self.start[cooord_index] + 1
+        return len(self.coords)
     
     ## Python `repr()` overload: human-readable representation of Coords.
     def __repr__(self):
@@ -146,6 +153,8 @@ class Coords:
 ## @brief Implementation of a single word in a hypothetical crossword.
 # The class adds to Coords the word number (as found in a crossword), word string, and clue text.
 class Word(Coords):
+
+    __slots__ = ('num', 'clue', 'word', 'slot')
     
     ## Initializes and validates data.
     # @param coord_start `2-tuple` the start coordinate (x, y)
@@ -159,6 +168,8 @@ class Word(Coords):
         self.num = num
         ## `str` word clue text
         self.clue = clue
+        ## `int` index of the word in the grid it belongs to (set by Wordgrid::build_index()), -1 = no grid
+        self.slot = -1
         self.set_word(word)
         
     ## Sets the internal word string (text).
@@ -247,10 +258,14 @@ class Wordgrid:
     #   * `Coord` | `2-tuple` coordinate of the character
     #   * `str` character's previous value
     #   * `str` character's new value
+    # @param on_update `callable` callback function triggered once when the callbacks
+    # are resumed after a batch of changes (see suspend_callbacks() and resume_callbacks())
+    # Callback parameters are:
+    #   * `Wordgrid` pointer to the calling class instance
     # @exception crossword::CWError wrong 'data_type' value
     def __init__(self, data, data_type='grid', info=CWInfo(), 
                  on_reset=None, on_clear=None, on_change=None, 
-                 on_clear_word=None, on_putchar=None):
+                 on_clear_word=None, on_putchar=None, on_update=None):
         ## `CWInfo` crossword meta info, such as title, author, etc.
         self.info = info
         ## callback function triggered when the grid is reset via reset()
@@ -263,6 +278,10 @@ class Wordgrid:
         self.on_clear_word = on_clear_word
         ## callback function triggered when a charater is set in the grid via put_char()
         self.on_putchar = on_putchar
+        ## callback function triggered when the callbacks are resumed by resume_callbacks()
+        self.on_update = on_update
+        ## `tuple` | `None` callbacks saved by suspend_callbacks()
+        self.suspended_callbacks = None
         ## backup of Wordgrid::words used in save() and restore()
         self.old_words = None
         self.initialize(data, data_type)
@@ -304,16 +323,17 @@ class Wordgrid:
     ## @brief Reconstructs the internal grid from the given grid data.
     # The following class members are fully re-initialized:
     #   * Wordgrid::words - the collection of Word objects
-    #   * Wordgrid::grid - the internal grid pattern OR the existing self.grid if == `None`
+    #   * Wordgrid::chars - the internal grid pattern OR the existing one if `grid` == `None`
     #   * Wordgrid::width - the horizontal size (in cells)
     #   * Wordgrid::height - the vertical size (in cells)
+    #   * Wordgrid::cells, Wordgrid::starts, Wordgrid::crossings, Wordgrid::spans - the lookup tables (see build_index())
     # @param grid `list` | `str` crossword grid -- see 'data' argument in __init__()
     # If `None`, Wordgrid::grid will be used, if initialized (otherwise, an exception will be raised)
     # @param update_internal_strings `bool` tells the function to update each 
     # Word object's string representation
     # @exception crossword::CWError empty / null 'grid' argument and Wordgrid::grid not initialized 
     def reset(self, grid=None, update_internal_strings=False):
-        if grid is None and not getattr(self, 'grid', None): 
+        if grid is None and not getattr(self, 'chars', None): 
             raise CWError(_('Cannot call reset() on a null grid!'))
             
         if not grid is None: 
@@ -321,7 +341,10 @@ class Wordgrid:
             if isinstance(grid, str): grid = grid.split('\n')
         
         # convert grid to 2D matrix
-        grid = self.grid if grid is None and (not getattr(self, 'grid', None) is None) else [list(l.lower()) for l in grid]
+        if grid is None:
+            grid = self.grid
+        else:
+            grid = [list(l.lower()) if isinstance(l, str) else [c.lower() for c in l] for l in grid]
         
         # validate characters
         for row in grid:
@@ -377,16 +400,109 @@ class Wordgrid:
         
         # sort words using default sorting method
         self.sort()
-        ## internal 2-dimensional character grid, e.g.
-        # <pre> [['f', 'a', 't', 'h', 'e', 'r', '*', '_', 'o', 'm'], [...]] </pre>
-        self.grid = grid
+        ## internal character grid stored as a flat list of rows (row after row), e.g.
+        # <pre> ['f', 'a', 't', 'h', 'e', 'r', '*', '_', 'o', 'm', ...] </pre>
+        # The character in the (x, y) coordinate is `chars[y * width + x]`.
+        # @see grid
+        self.chars = [c for row in grid for c in row]
         ## number of columns in grid
         self.width = grid_width
         ## number of rows in grid
         self.height = lgrid  
+        self.build_index()
         if update_internal_strings: self.update_word_strings()
-        if self.on_reset: self.on_reset(self, self.grid)
+        if self.on_reset: self.on_reset(self, grid)
+
+    ## @brief The 2-dimensional character grid, e.g.
+    # <pre> [['f', 'a', 't', 'h', 'e', 'r', '*', '_', 'o', 'm'], [...]] </pre>
+    # @warning The grid is assembled from Wordgrid::chars on each call, so changing
+    # the returned list will not change the grid: pass it to reset() to apply the changes.
+    @property
+    def grid(self):
+        return [self.chars[i:i + self.width] for i in range(0, len(self.chars), self.width)]
         
+    ## @brief Builds the lookup tables used to find words by coordinates and intersects.
+    # The following tables are (re-)built:
+    #   * Wordgrid::cells - cell coordinate -> words crossing that cell
+    #   * Wordgrid::starts - cell coordinate -> words starting in that cell
+    #   * Wordgrid::crossings - (start, direction) of each word -> its intersects
+    #   * Wordgrid::slots - words indexed by Word::slot (to check if a word belongs to the grid)
+    #   * Wordgrid::spans - positions of each word's characters in Wordgrid::chars
+    #   * Wordgrid::cell_slots - Word::slot values of words crossing each position in Wordgrid::chars
+    #
+    # The blank counters are then initialized by update_counts().
+    #
+    # The tables depend only on the grid structure (word positions), not the characters,
+    # so they are built once by reset() and used by intersects_of(), find_by_coord()
+    # and find_by_coord_dir(). Call this method if Wordgrid::words is modified directly.
+    def build_index(self):
+        ## `tuple` words in the grid indexed by their Word::slot values
+        self.slots = tuple(self.words)
+        for i, w in enumerate(self.slots):
+            w.slot = i
+        ## `tuple` of `slice` objects indexed by Word::slot: the positions of word characters
+        # in Wordgrid::chars (consecutive positions for across words, every `width`-th for down words)
+        self.spans = tuple(self._span(w) for w in self.slots)
+        cell_slots = [[] for _ in range(len(self.chars))]
+        for w in self.slots:
+            for pos in range(len(self.chars))[self.spans[w.slot]]:
+                cell_slots[pos].append(w.slot)
+        ## `tuple` of `tuple` Word::slot values of words crossing each position in Wordgrid::chars
+        self.cell_slots = tuple(tuple(slots) for slots in cell_slots)
+        ## `dict` cell coordinate -> `dict` {'h': Word|None, 'v': Word|None} words crossing the cell
+        self.cells = {}
+        ## `dict` cell coordinate -> `dict` {'h': Word|None, 'v': Word|None} words starting in the cell
+        self.starts = {}
+        for w in self.words:
+            self.starts.setdefault(w.start, {'h': None, 'v': None})[w.dir] = w
+            for coord in w.coords:
+                self.cells.setdefault(coord, {'h': None, 'v': None})[w.dir] = w
+        ## `dict` (`2-tuple` start coordinate, `str` direction) -> `list` of (Word, coord) intersects
+        self.crossings = {}
+        for w in self.words:
+            other_dir = 'v' if w.dir == 'h' else 'h'
+            crosses = [(self.cells[coord][other_dir], coord) for coord in w.coords if self.cells[coord][other_dir]]
+            # keep intersects in the order of Wordgrid::words
+            crosses.sort(key=lambda cross: cross[0].slot)
+            self.crossings[(w.start, w.dir)] = crosses
+        self.update_counts()
+
+    ## @brief Recounts the blanks in all the words.
+    # The counters are then kept up to date by put_char(), change_word(), clear_word() and clear(),
+    # so that is_word_complete(), count_complete() and find_incomplete() don't have to
+    # look at the word characters.
+    def update_counts(self):
+        ## `list` number of crossword::BLANK characters in each word, indexed by Word::slot
+        self.blanks = [self.chars[span].count(BLANK) for span in self.spans]
+        ## `list` of `set` Word::slot values grouped by their blank counts:
+        # `blank_groups[n]` = slots of words having `n` blanks
+        self.blank_groups = [set() for _ in range(max((len(w) for w in self.slots), default=0) + 1)]
+        for slot, blanks in enumerate(self.blanks):
+            self.blank_groups[blanks].add(slot)
+
+    ## @brief Writes characters to Wordgrid::chars updating the blank counters.
+    # @param span `slice` positions in Wordgrid::chars
+    # @param chars `str` new characters (one for each position)
+    def _put_chars(self, span, chars):
+        old_chars = self.chars[span]
+        self.chars[span] = chars
+        if not BLANK in chars and not BLANK in old_chars: return
+        for pos, old_char, char in zip(range(len(self.chars))[span], old_chars, chars):
+            if (old_char == BLANK) == (char == BLANK): continue
+            delta = 1 if char == BLANK else -1
+            for slot in self.cell_slots[pos]:
+                self.blank_groups[self.blanks[slot]].discard(slot)
+                self.blanks[slot] += delta
+                self.blank_groups[self.blanks[slot]].add(slot)
+
+    ## Gets the positions of the given word's characters in Wordgrid::chars.
+    # @param w `Word` the Word object
+    # @returns `slice` the position slice
+    def _span(self, w):
+        pos = w.start[1] * self.width + w.start[0]
+        step = 1 if w.dir == 'h' else self.width
+        return slice(pos, pos + (len(w) - 1) * step + 1, step)
+
     ## @brief Constructs the internal grid, dimensions and words 
     # from the given collection of Word objects.
     # 
@@ -699,26 +815,26 @@ class Wordgrid:
     ## Checks if all the words are completed (have no blanks left).
     # @returns `bool` `True` if grid contains no blanks, `False` otherwise
     def is_complete(self):
-        for r in self.grid:
-            if BLANK in r: return False
-        return True
+        return not BLANK in self.chars
 
     ## @brief Removes the given row from grid. 
     # @warning Use with care! Destroys word structure.
     # @param row `int` index of row to delete
     def remove_row(self, row):
         if row >= 0 and row < self.height:
-            del self.grid[row]
-            self.reset()
+            grid = self.grid
+            del grid[row]
+            self.reset(grid)
 
     ## @brief Removes the given column from grid. 
     # @warning Use with care! Destroys word structure.
     # @param col `int` index of column to delete
     def remove_column(self, col):
         if col >= 0 and col < self.width:
-            for row in self.grid:
+            grid = self.grid
+            for row in grid:
                 del row[col]
-            self.reset()
+            self.reset(grid)
 
     ## @brief Inserts a new row after the one given by `index`.
     # If `index == -1`, appends a row after the last one.    
@@ -726,11 +842,12 @@ class Wordgrid:
     # @param index `int` index of row after which a new one will be inserted
     # @param char `str` fill character for new row (default = crossword::BLANK)
     def add_row(self, index=-1, char=BLANK):
+        grid = self.grid
         if index < 0 or index >= self.height:
-            self.grid.append([char] * self.width)
+            grid.append([char] * self.width)
         else:
-            self.grid.insert(index, [char] * self.width)
-        self.reset()
+            grid.insert(index, [char] * self.width)
+        self.reset(grid)
 
     ## @brief Inserts a new column after the one given by 'index'.
     # If `index == -1`, appends a column after the last one.    
@@ -738,17 +855,19 @@ class Wordgrid:
     # @param index `int` index of column after which a new one will be inserted
     # @param char `str` fill character for new column (default = crossword::BLANK)
     def add_column(self, index=-1, char=BLANK):
-        for row in self.grid:
+        grid = self.grid
+        for row in grid:
             if index < 0 or index >= self.width:
                 row.append(char)
             else:
                 row.insert(index, char)
-        self.reset()
+        self.reset(grid)
 
     ## Duplicates the current grid by reflecting its cells downwards.
     # @see reflect() for description of arguments.
     def reflect_bottom(self, mirror=True, reverse=True, border=''):
-        last_row = len(self.grid)
+        grid = self.grid
+        last_row = len(grid)
 
         if border:
             sborder = border * (self.width // len(border))
@@ -756,20 +875,21 @@ class Wordgrid:
                 sborder += border
             sborder = sborder[:self.width]
             sborder = sborder.replace(' ', BLANK).replace('*', FILLER).replace('~', FILLER2)
-            self.grid.append(list(sborder))
+            grid.append(list(sborder))
 
         to_insert = []
         for i in range(last_row):
-            ls = [c if c in (BLANK, FILLER, FILLER2) else BLANK for c in self.grid[i]]
+            ls = [c if c in (BLANK, FILLER, FILLER2) else BLANK for c in grid[i]]
             to_insert.append(list(reversed(ls)) if reverse else ls)
         if mirror: to_insert.reverse()
 
-        self.grid += to_insert
-        self.reset()
+        grid += to_insert
+        self.reset(grid)
 
     ## Duplicates the current grid by reflecting its cells upwards.
     # @see reflect() for description of arguments.
     def reflect_top(self, mirror=True, reverse=True, border=''):
+        grid = self.grid
         first_row = 0
         
         if border:
@@ -778,23 +898,23 @@ class Wordgrid:
                 sborder += border
             sborder = sborder[:self.width]
             sborder = sborder.replace(' ', BLANK).replace('*', FILLER).replace('~', FILLER2)
-            self.grid.insert(0, list(sborder))
+            grid.insert(0, list(sborder))
             first_row = 1
 
-        last_row = len(self.grid)
+        last_row = len(grid)
         to_insert = []
         for i in range(first_row, last_row):
-            ls = [c if c in (BLANK, FILLER, FILLER2) else BLANK for c in self.grid[i]]
+            ls = [c if c in (BLANK, FILLER, FILLER2) else BLANK for c in grid[i]]
             to_insert.append(list(reversed(ls)) if reverse else ls)
         if mirror: to_insert.reverse()
 
-        self.grid[0:0] = to_insert
-        self.reset()
+        grid[0:0] = to_insert
+        self.reset(grid)
 
     ## Duplicates the current grid by reflecting its cells to the right.
     # @see reflect() for description of arguments.
     def reflect_right(self, mirror=True, reverse=True, border=''):
-        self.height = len(self.grid)
+        grid = self.grid
         last_col = self.width
 
         if border:
@@ -804,27 +924,27 @@ class Wordgrid:
             sborder = sborder[:self.height]
             sborder = sborder.replace(' ', BLANK).replace('*', FILLER).replace('~', FILLER2)
             for i in range(self.height):
-                self.grid[i].append(sborder[i])
+                grid[i].append(sborder[i])
 
         if not reverse:
-            for row in self.grid:
+            for row in grid:
                 ls = [c if c in (BLANK, FILLER, FILLER2) else BLANK for c in row[:last_col]]
                 if mirror: ls.reverse()
                 row += ls
         else:
             i = 0
-            for row in reversed(self.grid):
+            for row in reversed(grid):
                 ls = [c if c in (BLANK, FILLER, FILLER2) else BLANK for c in row[:last_col]]
                 if mirror: ls.reverse()
-                self.grid[i] += ls
+                grid[i] += ls
                 i += 1
 
-        self.reset()
+        self.reset(grid)
 
     ## Duplicates the current grid by reflecting its cells to the left.
     # @see reflect() for description of arguments.
     def reflect_left(self, mirror=True, reverse=True, border=''):
-        self.height = len(self.grid)
+        grid = self.grid
         first_col = 0
 
         if border:
@@ -834,24 +954,24 @@ class Wordgrid:
             sborder = sborder[:self.height]
             sborder = sborder.replace(' ', BLANK).replace('*', FILLER).replace('~', FILLER2)
             for i in range(self.height):
-                self.grid[i].insert(0, sborder[i])
+                grid[i].insert(0, sborder[i])
             first_col = 1
 
         if not reverse:
-            for row in self.grid:
+            for row in grid:
                 ls = [c if c in (BLANK, FILLER, FILLER2) else BLANK for c in row[first_col:]]
                 if mirror: ls.reverse()
                 row[0:0] = ls
         else:
-            w = len(self.grid[0])
+            w = len(grid[0])
             i = 0
-            for row in reversed(self.grid):
+            for row in reversed(grid):
                 ls = [c if c in (BLANK, FILLER, FILLER2) else BLANK for c in row[(len(row) - w):]]
                 if mirror: ls.reverse()
-                self.grid[i][0:0] = ls
+                grid[i][0:0] = ls
                 i += 1
 
-        self.reset()
+        self.reset(grid)
 
     ## @brief Duplicates the current grid by reflecting its cells in a given direction.
     # @param direction `str` the direction to duplicate / reflect the current grid:
@@ -890,20 +1010,25 @@ class Wordgrid:
     # otherwise, only the list of intersecting Word objects is returned
     # @returns `list` list of Word objects or (Word, coord) tuples depending on `word_coord_tuples`
     def intersects_of(self, word, word_coord_tuples=True):
-        index1 = 0 if word.dir == 'h' else 1
-        index2 = 0 if index1 else 1
-        intersects = []
-        for w in self.words:
-            if w.dir != word.dir and \
-               w.start[index1] >= word.start[index1] and w.start[index1] <= word.end[index1] and \
-               w.start[index2] <= word.start[index2] and w.end[index2] >= word.end[index2]:
-                if word_coord_tuples:
-                    intersects.append((w, (w.start[0], word.start[1]) if word.dir == 'h' else (word.start[0], w.start[1])))  
-                else:
-                    intersects.append(w)
-        return intersects
+        if self.has_word(word):
+            intersects = self.crossings[(word.start, word.dir)]
+        else:
+            # not a word in this grid: search by coordinates
+            index1 = 0 if word.dir == 'h' else 1
+            index2 = 0 if index1 else 1
+            intersects = []
+            for w in self.words:
+                if w.dir != word.dir and \
+                   w.start[index1] >= word.start[index1] and w.start[index1] <= word.end[index1] and \
+                   w.start[index2] <= word.start[index2] and w.end[index2] >= word.end[index2]:
+                    intersects.append((w, (w.start[0], word.start[1]) if word.dir == 'h' else (word.start[0], w.start[1])))
+        if word_coord_tuples:
+            return list(intersects)
+        return [cross[0] for cross in intersects]
     
     ## @brief Retrieves a next incomplete word (fully or partially blank).
+    # The words are looked up in the blank counters (see update_counts()), from the 
+    # least (or most) blanks on, so only the excluded words are checked one by one.
     # @param method `str` governs the search algorithm; it can be one of:
     #   * 'first-incomplete' (default): the first incomplete word will be returned
     #   * 'most-complete': the first word having the least blanks will be returned
@@ -911,43 +1036,43 @@ class Wordgrid:
     #   * 'random': a random incomplete word will be returned
     # @param exclude `callable` allows excluding words from search.
     # It accepts a single argument - a Word object, and returns `True` to exclude it and `False` otherwise
+    # @param rng `numpy.random.Generator` | `None` random generator used by the 'random' method;
+    # if `None`, a new generator (seeded by the OS) is used
     # @returns `Word` | `None` a next incomplete Word object in the grid, or None if no such words are found
-    def find_incomplete(self, method='most-complete', exclude=None):
-        word = (None, 0)
-        words = []
-        for w in self.words:
-            if exclude and exclude(w): continue
-            blanks = 0
-            for coord in w.coord_array():
-                if self.grid[coord[1]][coord[0]] == BLANK:
-                    if method == 'first-incomplete':                        
-                        return w
-                    elif method == 'most-complete' or method == 'most-incomplete':
-                        blanks += 1
-                    elif method == 'random':
-                        words.append(w)
-                        break
-            if blanks and (word[0] is None or 
-                (method == 'most-complete' and blanks < word[1]) or 
-                (method == 'most-incomplete' and blanks > word[1])):
-                word = (w, blanks)
-                
+    def find_incomplete(self, method='most-complete', exclude=None, rng=None):
         if method == 'most-complete' or method == 'most-incomplete':
-            return word[0]
+            groups = self.blank_groups[1:]
+            if method == 'most-incomplete': groups.reverse()
+            for group in groups:
+                for slot in sorted(group):
+                    if not exclude or not exclude(self.slots[slot]):
+                        return self.slots[slot]
+            return None
+
+        words = [w for w in self.slots if self.blanks[w.slot] and not (exclude and exclude(w))]
+        if method == 'first-incomplete':
+            return words[0] if words else None
         elif method == 'random' and words:
-            np.random.seed()
-            return np.random.choice(words)
+            return words[(np.random.default_rng() if rng is None else rng).integers(len(words))]
                 
         return None
     
+    ## Checks if the given Word object belongs to the grid (is one of Wordgrid::words).
+    # @param w `Word` the Word object
+    # @returns `bool` `True` if the word is in the grid, `False` otherwise
+    def has_word(self, w):
+        slot = getattr(w, 'slot', -1)
+        return 0 <= slot < len(self.slots) and self.slots[slot] is w
+
     ## Counts incomplete words (those containing at least one crossword::BLANK).
     # @returns `int` number of incomplete words
     def count_incomplete(self):
-        c = 0
-        for w in self.words:
-            if not self.is_word_complete(w):
-                c += 1
-        return c
+        return len(self.slots) - len(self.blank_groups[0])
+
+    ## Counts complete words (those without crossword::BLANK characters).
+    # @returns `int` number of complete words
+    def count_complete(self):
+        return len(self.blank_groups[0])
     
     ## @brief Gets the text of a Word object in the grid.
     # Since the internal structure of Wordgrid is a matrix of characters 
@@ -957,28 +1082,27 @@ class Wordgrid:
     # @returns `str` the text representation of the word (e.g. "father")
     # @see update_word_strings()
     def get_word_str(self, w):
-        if not w in self.words: 
+        if not self.has_word(w): 
             raise CWError(_("Word '{}' is absent from grid!").format(str(w)))
-        return ''.join(self.grid[coord[1]][coord[0]] for coord in w.coord_array())
+        return ''.join(self.chars[self.spans[w.slot]])
     
     ## Checks if a word is complete (has no blanks).
     # @param w `Word` the Word object
     # @returns `bool` `True` if the word has no crossword::BLANK characters, `False` otherwise
     # @see is_word_blank() - the reverse method
     def is_word_complete(self, w):
-        if not w in self.words: 
+        if not self.has_word(w): 
             raise CWError(_("Word '{}' is absent from grid!").format(str(w)))
-        for coord in w.coord_array():
-            if self.grid[coord[1]][coord[0]] == BLANK:
-                return False
-        return True
+        return self.blanks[w.slot] == 0
     
     ## Checks if a word is blank (consists entirely of crossword::BLANK characters).
     # @param w `Word` the Word object
     # @returns `bool` `True` if the word has no characters other than crossword::BLANK, `False` otherwise
     # @see is_word_complete() - the reverse method
     def is_word_blank(self, w):
-        return self.get_word_str(w) == BLANK * len(w)
+        if not self.has_word(w): 
+            raise CWError(_("Word '{}' is absent from grid!").format(str(w)))
+        return self.blanks[w.slot] == len(w)
     
     ## Finds a Word object in the Wordgrid::words collection.
     # @param word `Word` the Word object to look for
@@ -1004,24 +1128,16 @@ class Wordgrid:
     #   * 'v' = Word object intersecting the coordinate in the Down (vertical) direction
     #   (`None` if not found)
     def find_by_coord(self, coord, start_coord=True):
-        found = {'h': None, 'v': None}
-        for w in self.words:
-            if start_coord:
-                if w.start == coord:
-                    found[w.dir] = w
-            elif w.does_cross(coord):
-                found[w.dir] = w
-        return found
+        found = (self.starts if start_coord else self.cells).get(tuple(coord), None)
+        return dict(found) if found else {'h': None, 'v': None}
     
     ## Gets a word by its start coordinate and direction.
     # @param coord `2-tuple` the start coordinate of the word looked for
     # @param direction `str` the word's direction: 'h' = 'horizonal' or 'v' = 'vertical'
     # @returns `Word` | `None` the found Word object or `None` if not found
     def find_by_coord_dir(self, coord, direction):
-        for w in self.words:
-            if w.start == coord and w.dir == direction:
-                return w
-        return None
+        found = self.starts.get(tuple(coord), None)
+        return found.get(direction, None) if found else None
     
     ## @brief Gets a word by its text representation.
     # @warning The search will return the FIRST word corresponding 
@@ -1062,7 +1178,7 @@ class Wordgrid:
     # @exception crossword::CWError coordinate out of range
     def get_char(self, coord):
         self._validate_coord(coord)
-        return self.grid[coord[1]][coord[0]]
+        return self.chars[coord[1] * self.width + coord[0]]
         
     ## @brief Puts a character into a given coordinate (replacing the existing one).
     # The Wordgrid::on_putchar callback is called after putting the character.
@@ -1073,35 +1189,93 @@ class Wordgrid:
         old_char = self.get_char(coord)
         new_char = char.lower()
         self._validate_char(new_char)
-        self.grid[coord[1]][coord[0]] = new_char
+        pos = coord[1] * self.width + coord[0]
+        self._put_chars(slice(pos, pos + 1), new_char)
         if self.on_putchar: self.on_putchar(self, coord, old_char, new_char)
 
+    ## @brief Puts a word's text into the grid recording the changed cells.
+    # This is a lightweight version of change_word() used by the generators:
+    # the characters are not validated, no callbacks are called, and only the cells
+    # whose characters actually change are written. The returned list is the change trail
+    # of this placement: pass it to undo() to restore the cells on backtracking.
+    # @param word `Word` the Word object to replace the text for
+    # @param new_word `str` the new text for the word (lowercase, same length as the word)
+    # @returns `list` of 2-tuples: (`int` position in Wordgrid::chars, `str` old character)
+    def place_word(self, word, new_word):
+        chars = self.chars
+        changes = []
+        for pos, char in zip(range(len(chars))[self.spans[word.slot]], new_word):
+            old_char = chars[pos]
+            if old_char == char: continue
+            changes.append((pos, old_char))
+            self._set_char(pos, old_char, char)
+        return changes
+
+    ## @brief Restores the cells changed by place_word().
+    # @param changes `list` the change trail returned by place_word()
+    def undo(self, changes):
+        chars = self.chars
+        for pos, char in reversed(changes):
+            self._set_char(pos, chars[pos], char)
+
+    ## @brief Writes a single character to Wordgrid::chars updating the blank counters.
+    # @param pos `int` position in Wordgrid::chars
+    # @param old_char `str` current character in that position
+    # @param char `str` new character
+    def _set_char(self, pos, old_char, char):
+        self.chars[pos] = char
+        if (old_char == BLANK) == (char == BLANK): return
+        delta = 1 if char == BLANK else -1
+        for slot in self.cell_slots[pos]:
+            self.blank_groups[self.blanks[slot]].discard(slot)
+            self.blanks[slot] += delta
+            self.blank_groups[self.blanks[slot]].add(slot)
+
+    ## @brief Suspends the callbacks on grid changes.
+    # Wordgrid::on_clear, Wordgrid::on_change, Wordgrid::on_clear_word and Wordgrid::on_putchar
+    # are not called until resume_callbacks() is called. This is used in the generation
+    # to avoid a callback on each step of the search.
+    def suspend_callbacks(self):
+        if not self.suspended_callbacks is None: return
+        self.suspended_callbacks = (self.on_clear, self.on_change, self.on_clear_word, self.on_putchar)
+        self.on_clear = self.on_change = self.on_clear_word = self.on_putchar = None
+
+    ## @brief Resumes the callbacks suspended by suspend_callbacks().
+    # @param notify `bool` whether to call Wordgrid::on_update once (to report all the changes
+    # made while the callbacks were suspended)
+    def resume_callbacks(self, notify=True):
+        if self.suspended_callbacks is None: return
+        self.on_clear, self.on_change, self.on_clear_word, self.on_putchar = self.suspended_callbacks
+        self.suspended_callbacks = None
+        if notify and self.on_update: self.on_update(self)
+
     ## @brief Clears all the words in the collection.
     # This method effectively puts crossword::BLANK into all non-blocked cells
     # of the grid. The internal text representations of each Word object
     # are not updated - call update_word_strings() after this operation if required.
     # The Wordgrid::on_clear callback is called after clearing.
     def clear(self):
-        for y in range(self.height):
-            for x in range(self.width):
-                if not self.grid[y][x] in (FILLER, FILLER2):
-                    self.grid[y][x] = BLANK
+        self.chars = [c if c in (FILLER, FILLER2) else BLANK for c in self.chars]
+        self.update_counts()
         if self.on_clear: self.on_clear(self)
             
     ## @brief Replaces the text representation of a given word.
-    # The Wordgrid::on_change callback is called after the replacement.
+    # The Wordgrid::on_change callback is called once after the replacement
+    # (Wordgrid::on_putchar is not called for the individual characters).
     # @param word `Word` the Word object to replace the text for
     # @param new_word `str` the new text for the word, e.g. "father"
     # @exception crossword::CWError word not found in grid or new text has incorrect length 
     # (different from the given word's length)
     def change_word(self, word, new_word: str):        
-        if not word in self.words: 
+        if not self.has_word(word): 
             raise CWError(_("Word '{}' is absent from grid!").format(str(word)))
+        new_word = new_word.lower()
         if len(new_word) != len(word):
             raise CWError("Lengths of words do not match!")
+        for char in new_word:
+            self._validate_char(char)
         if self.on_change: w_old = self.get_word_str(word)
-        for i, coord in enumerate(word.coord_array()):
-            self.put_char(coord, new_word[i])
+        self._put_chars(self.spans[word.slot], new_word)
         #self.update_word_strings()
         if self.on_change: self.on_change(self, word, w_old)
             
@@ -1111,18 +1285,19 @@ class Wordgrid:
     # will be replaced by crossword::BLANK, regardless of intersecting words, if any.
     # Otherwise (if False, which is the default), only the free characters 
     # will be cleared (that is, those not intersecting with other words).
-    # The Wordgrid::on_clear_word callback is called after clearing.
+    # The Wordgrid::on_clear_word callback is called once after clearing
+    # (Wordgrid::on_putchar is not called for the individual characters).
     def clear_word(self, word, force_clear=False):
         if self.is_word_blank(word): return
         if self.on_clear_word: w_old = self.get_word_str(word)
-        coord_array = word.coord_array()
+        chars = self.chars
+        positions = range(len(chars))[self.spans[word.slot]]
         if not force_clear:
-            intersects = self.intersects_of(word)
-            for cross in intersects:
-                if cross[1] in coord_array and self.is_word_complete(cross[0]):
-                    coord_array.remove(cross[1])
-        for coord in coord_array:
-            self.put_char(coord, BLANK)    
+            # keep the cells shared with complete intersects
+            positions = [pos for pos in positions 
+                         if not any(self.blanks[slot] == 0 for slot in self.cell_slots[pos] if slot != word.slot)]
+        for pos in positions:
+            if chars[pos] != BLANK: self._set_char(pos, chars[pos], BLANK)
         #self.update_word_strings()
         if self.on_clear_word: self.on_clear_word(self, word, w_old)
             
@@ -1139,7 +1314,7 @@ class Wordgrid:
     # @returns `str` a string formatted like so: '(coord_x, coord_y) dir word_text'
     # @exception crossword::CWError word is not found in grid
     def print_word(self, w):
-        if not w in self.words:
+        if not self.has_word(w):
             raise CWError(_("Word '{}' is absent from grid!").format(str(w)))
         return f"{repr(w.start)} {w.dir} '{self.get_word_str(w)}'"
 
@@ -1191,7 +1366,7 @@ class Wordgrid:
     #   ...
     # </pre>
     def tostr(self):
-        return '\n'.join([''.join(row) for row in self.grid]) if self.grid else ''
+        return '\n'.join([''.join(row) for row in self.grid]) if self.chars else ''
 
     ## Counts grid cells that satisfy a given condition.
     # @param condition `callable` callback function - the condition to satisfy. 
@@ -1234,9 +1409,9 @@ class Wordgrid:
         self.stats['grid_width'] = self.width
         self.stats['grid_height'] = self.height
         self.stats['cell_count'] = self.height * self.width
-        self.stats['filler_cell_count'] = self._cell_count(lambda r, c: self.grid[r][c] in (FILLER, FILLER2))
+        self.stats['filler_cell_count'] = sum(1 for c in self.chars if c in (FILLER, FILLER2))
         self.stats['word_count'] = len(self.words)
-        self.stats['complete_word_count'] = self._word_count(self.is_word_complete)
+        self.stats['complete_word_count'] = self.count_complete()
         self.stats['blank_word_count'] = self._word_count(self.is_word_blank)
         self.stats['across_word_count'] = self._word_count(lambda w: w.dir == 'h')
         self.stats['down_word_count'] = self.stats['word_count'] - self.stats['across_word_count']
@@ -1266,8 +1441,10 @@ class Wordgrid:
             word = word.lower() 
         elif not isinstance(word, Word):
             raise CWError(_('Word must be a Word object!')) 
+        if isinstance(word, Word):
+            return self.has_word(word)
         for w in self.words:
-            if (isinstance(word, Word) and w == word) or (isinstance(word, str) and self.get_word_str(w) == word):
+            if self.get_word_str(w) == word:
                 return True            
         return False
     
@@ -1285,23 +1462,103 @@ class Wordgrid:
     # @returns `str` grid as tabular-formatted text
     # @see print_words(), print_clues(), tostr()
     def __str__(self):
-        # print horizontal coordinates
-        s = ' ' * 5 + ''.join([str(c).rjust(4, ' ') for c in range(self.width)])
-        # print top border         
-        s += '\n' + ' ' * 5 + ' ___' * self.width
-        # print rows
+        # horizontal coordinates and top border
+        lines = [' ' * 5 + ''.join([str(c).rjust(4, ' ') for c in range(self.width)]),
+                 ' ' * 5 + ' ___' * self.width]
+        border = ' ' * 5 + ' ---' * self.width
+        # rows: vertical coord, row chars and horizontal line
         for n, row in enumerate(self.grid):
-            # vertical coord
-            s += '\n' + str(n).rjust(3, ' ') + ' '
-            # row chars
-            s += ' | ' + ' | '.join(row) + ' |'
-            # horizontal line
-            s += '\n' + ' ' * 5 + ' ---' * self.width
-        return s
+            lines.append(str(n).rjust(3, ' ') + '  | ' + ' | '.join(row) + ' |')
+            lines.append(border)
+        return '\n'.join(lines)
             
         
 # ******************************************************************************** #
 
+## @brief Metrics (counters and timings) of a single generation run -- see Crossword::generate().
+# The object evaluates to `True` if the generation has succeeded, so it can be used
+# as a `bool` generation result.
+class GenMetrics:
+
+    __slots__ = ('method', 'status', 'success', 'elapsed', 'nodes', 'backtracks', 'max_depth',
+                 'suggest_calls', 'suggest_time', 'cache_hits', 'cache_misses', 'callback_time', 'log_time',
+                 'words', 'complete', 'seed')
+
+    ## @param method `str` | `None` generation method (see Crossword::generate())
+    # @param seed `int` | `None` random seed passed to Crossword::generate()
+    def __init__(self, method=None, seed=None):
+        ## `str` | `None` generation method
+        self.method = method
+        ## `str` result status: 'ok', 'fail', 'timeout', 'stopped' or 'error'
+        self.status = 'fail'
+        ## `bool` whether the generation has succeeded
+        self.success = False
+        ## `float` generation time in seconds
+        self.elapsed = 0.0
+        ## `int` nodes expanded: suggestions put into the grid
+        self.nodes = 0
+        ## `int` backtracks: steps back (reverting filled words) after failures
+        self.backtracks = 0
+        ## `int` max search depth (recursion level / number of words filled on the search stack)
+        self.max_depth = 0
+        ## `int` number of Crossword::suggest() calls
+        self.suggest_calls = 0
+        ## `float` time spent in Crossword::suggest() in seconds
+        self.suggest_time = 0.0
+        ## `int` word source cache hits (for wordsrc::MultiWordsource)
+        self.cache_hits = 0
+        ## `int` word source cache misses (for wordsrc::MultiWordsource)
+        self.cache_misses = 0
+        ## `float` time spent in the progress callback in seconds
+        self.callback_time = 0.0
+        ## `float` time spent on writing log messages in seconds
+        self.log_time = 0.0
+        ## `int` total number of words in the grid
+        self.words = 0
+        ## `int` number of complete words at the end of generation
+        self.complete = 0
+        ## `int` | `None` random seed
+        self.seed = seed
+
+    ## Python `bool()` overload.
+    # @returns `bool` GenMetrics::success
+    def __bool__(self):
+        return self.success
+
+    ## Converts the metrics to a dictionary.
+    # @returns `dict` the metrics as {name: value}
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.__slots__}
+
+    ## Creates a metrics object from a dictionary made by to_dict().
+    # @param d `dict` the metrics as {name: value}
+    # @returns `GenMetrics` the new object
+    @staticmethod
+    def from_dict(d):
+        metrics = GenMetrics()
+        for key in GenMetrics.__slots__:
+            if key in d: setattr(metrics, key, d[key])
+        return metrics
+
+    ## Exports the metrics to JSON.
+    # @param filepath `str` | `None` path to the file to save the JSON data to;
+    # if `None`, the data is only returned
+    # @returns `str` the metrics as a JSON string
+    def to_json(self, filepath=None):
+        data = json.dumps(self.to_dict(), indent='\t')
+        if filepath:
+            with open(filepath, 'w', encoding=ENCODING) as outfile:
+                outfile.write(data)
+        return data
+
+    ## Python `str()` overload: short human-readable summary.
+    def __str__(self):
+        return _("{}: {} in {:.1f} sec., {} nodes, {} backtracks, max depth {}, {} fetches ({:.1f} sec.)").format(
+                 self.method, self.status.upper(), self.elapsed, self.nodes, self.backtracks, self.max_depth,
+                 self.suggest_calls, self.suggest_time)
+
+# ******************************************************************************** #
+
 ## @brief Implementation of a crossword puzzle with auto generation functionality.
 # This class wraps (incapsulates) crossword::Wordgrid to construct and manipulate
 # the crossword grid on the low level (file I/O, putting and getting individual words
@@ -1330,10 +1587,20 @@ class Crossword:
     #   * empty string or `None`: no logging will be made
     # @param bufferedlog `bool` whether the log should be buffered (or written on disk only on destruction)
     # or not buffered (default), when log messages will be written immediately
+    # @param loglevel `int` minimum level of messages to log: one of crossword::LOG_INFO, 
+    # crossword::LOG_DEBUG or crossword::LOG_TRACE (default = all messages)
+    # @param asynclog `bool` whether to write the log file in a background thread
+    # (so the generation never waits for disk I/O); ignored for console logs
+    # @param slot_order `str` order in which the iterative and recursive algorithms pick
+    # the next word to fill: see the `method` argument in Wordgrid::find_incomplete()
+    # @param rng `numpy.random.Generator` | `None` random generator used in generation
+    # (to shuffle suggestions and pick random words); if `None`, a new generator (seeded by the OS)
+    # is created; see also the `seed` argument in generate()
     # @param kwargs `keyword args` additional args passed to crossword::Wordgrid constructor, like:
-    # `info`, `on_reset`, `on_clear`, `on_change`, `on_clear_word`, `on_putchar` etc.
+    # `info`, `on_reset`, `on_clear`, `on_change`, `on_clear_word`, `on_putchar`, `on_update` etc.
     def __init__(self, data=None, data_type='grid', wordsource=None, wordfilter=None, 
-                 pos='N', log='stdout', bufferedlog=False, **kwargs):
+                 pos='N', log='stdout', bufferedlog=False, loglevel=LOG_TRACE, asynclog=True,
+                 slot_order='most-complete', rng=None, **kwargs):
         ## `str` | `list` crossword grid source data type as used by crossword::Wordgrid constructor
         self.data = DEFAULT_GRID if (data is None and data_type == 'grid') else data
         ## `str` crossword grid source data type as used by crossword::Wordgrid constructor
@@ -1350,8 +1617,16 @@ class Crossword:
         self.pos = pos if (pos and pos != 'ALL') else None
         ## `bool` whether the log should be buffered (or written on disk only on destruction)
         self.bufferedlog = bufferedlog        
+        ## `bool` whether to write the log file in a background thread
+        self.asynclog = asynclog
+        ## `str` order of picking words to fill (see Wordgrid::find_incomplete())
+        self.slot_order = slot_order
+        ## `numpy.random.Generator` random generator used in generation
+        self.rng = rng if not rng is None else np.random.default_rng()
+        ## `GenMetrics` metrics of the last generation run (see generate())
+        self.metrics = GenMetrics()
         # initialize log stream (if set)
-        self.setlog(log)
+        self.setlog(log, loglevel)
         
     ## Destructor: flushes and closes log file (if present).
     def __del__(self):
@@ -1372,29 +1647,48 @@ class Crossword:
     #   * 'stderr': error console stream
     #   * file path: path to output (text) file
     #   * empty string or `None`: no logging will be made
+    # @param level `int` | `None` minimum level of messages to log (see crossword::LOG_INFO etc.);
+    # `None` to keep the current level
     # @see _log()
-    def setlog(self, log=''):
+    def setlog(self, log='', level=None):
         self._slog = log
+        if not level is None: 
+            self._loglevel = level
         self.closelog()
-        if log == 'stdout':
-            ## output stream (file) for debug messages
-            self.log = sys.stdout
-        elif log == 'stderr':
-            self.log = sys.stderr
-        elif log == '' or log is None:
-            self.log = None
-        else:
-            self.log = open(log, 'w', encoding=ENCODING, buffering=-1 if self.bufferedlog else 1)        
+        ## `utils::common::LogWriter` | `None` log writer for debug messages
+        self.log = LogWriter(log, self.bufferedlog, self.asynclog) if log else None
+        ## `int` minimum level of messages to log (crossword::LOG_OFF if logging is off):
+        # the generators check it before making the messages
+        self.loglevel = self._loglevel if self.log else LOG_OFF
             
-    ## Prints debug/log message to Crossword::log with optional line-ending char.
-    # @param what `str` debug/log message to print
+    ## @brief Writes a debug/log message to Crossword::log if its level is enabled.
+    # The message is made only if it is to be written: the arguments are formatted 
+    # into the message with `str.format()`, and a callable message is called 
+    # to make the text. In hot loops, check Crossword::loglevel before the call 
+    # to avoid evaluating the arguments.
+    # @param what `str` | `callable` message or message format string, or a callable
+    # returning the message
+    # @param args `positional args` arguments to format into the message
+    # @param level `int` message level (see crossword::LOG_INFO etc.)
     # @param end `str` optional line-ending
-    def _log(self, what, end='\n'):
+    def _log(self, what, *args, level=LOG_INFO, end='\n'):
+        if level < self.loglevel: return
+        t = timeit.default_timer()
+        if callable(what): 
+            what = what()
+        elif args: 
+            what = what.format(*args)
         try:
-            if self.log: print(what, file=self.log, end=end)
+            self.log.write(f"{what}{end}")
         except:
             self.setlog(self._slog)
-            if self.log: print(what, file=self.log, end=end)
+            if self.log: self.log.write(f"{what}{end}")
+        self.metrics.log_time += timeit.default_timer() - t
+
+    ## Makes a snapshot of the grid for the log (see _log()).
+    # @returns `str` the grid as tabular-formatted text
+    def _log_grid(self):
+        return f"\n{str(self.words)}\n"
             
     ## @brief Replaces the text representation of a given word.
     # See description of arguments in Wordgrid::change_word().
@@ -1433,10 +1727,12 @@ class Crossword:
         for wstr in self.used:
             print(wstr)
             
-    ## Flushes and closes Crossword::log if it points to a file.
+    ## Flushes and closes Crossword::log (console streams are only flushed).
     def closelog(self):
-        if getattr(self, 'log', None) and self.log != sys.stdout and self.log != sys.stderr:
+        if getattr(self, 'log', None):
             self.log.close()
+            self.log = None
+            self.loglevel = LOG_OFF
             
     ## Updates the Crossword::used list adding the completed (pre-set) words.
     def add_completed(self):
@@ -1453,6 +1749,8 @@ class Crossword:
     ## @brief Fetches suggestions for the given word from the datasets (Crossword::wordsource).
     # The method accounts for the corresponding rules / filters in Crossword::wordfilter
     # and screens off items found in Crossword::used.
+    # The suggestions are read from wordsrc::Wordsource::iter_fetch(), so the filters are 
+    # applied only until enough suggestions are found (see wordsrc::Wordsource::max_fetch).
     # @param word `str` word pattern to look for in the word source (Crossword::wordsource),
     # e.g. 'f_th__' (will fetch 'father')
     def suggest(self, word):
@@ -1464,7 +1762,11 @@ class Crossword:
             return (not_in_used and self.wordfilter(sug)) if self.wordfilter else not_in_used
         
         # get suggestions (list) from word source
-        return self.wordsource.fetch(word, BLANK, self.pos, filt)
+        t = timeit.default_timer()
+        suggestions = list(self.wordsource.iter_fetch(word, BLANK, self.pos, filt, rng=self.rng))
+        self.metrics.suggest_time += timeit.default_timer() - t
+        self.metrics.suggest_calls += 1
+        return suggestions
     
     ## @brief Creates a sequential generation path (list of words) forming a connected graph.
     # All words in path are connected through intersections.
@@ -1495,7 +1797,7 @@ class Crossword:
         # if start_word is None or path is empty, find the first incomplete word in CW
         # passing path and exclude lists to the search function to skip already added words
         if (start_word is None) or not path:
-            start_word = self.words.find_incomplete(method='most-complete', exclude=filter_out)
+            start_word = self.words.find_incomplete(method=self.slot_order, exclude=filter_out, rng=self.rng)
             
         # if not found, quit function (there are no more incomplete words in CW)
         if start_word is None or filter_out(start_word): 
@@ -1564,22 +1866,23 @@ class Crossword:
             self.make_path(start_word=None, path=path, word_filter=lambda w: w in exclude)
             # merge it into exclude (to pass into following generation cycles)
             exclude += path
-            # add path to paths, converting each element into a dict with 2 elements:
-            # 'w': the word in path; and 'sug': suggestions from word source
-            paths.append([{'w': w, 'sug': None} for w in path])
+            # add path to paths, converting each element into a dict with 3 elements:
+            # 'w': the word in path; 'sug': suggestions from word source;
+            # and 'trail': cells changed by placing the word (see Wordgrid::place_word()), None if not placed
+            paths.append([{'w': w, 'sug': None, 'trail': None} for w in path])
             # check timeout
             if self.timeout_happened(timeout): raise CWTimeoutError()
             
         #print('\n'.join(str(w) for w in exclude))
         
-        self._log(_("Created {} paths").format(len(paths)))
+        self._log(_("Created {} paths"), len(paths))
         
         # this list will contain Boolean generation results for each path (block of words)
         results = []
 
         # report progress
         if on_progress:
-            on_progress(self, self.words._word_count(self.words.is_word_complete), len(self.words.words))
+            on_progress(self, self.words.count_complete(), len(self.words.words))
         
         # loop for each path in paths (if CW is fully connected, there will be just one loop cycle)
         for p in paths:
@@ -1597,23 +1900,23 @@ class Crossword:
                 # check for stopping criteria
                 if stopcheck and stopcheck(): raise CWStopCheck()
                 
-                if self.log: 
-                    self._log(f"\n{str(self.words)}\n")                
-                    self._log(_("\nNext word = [{}]").format(self.words.print_word(p[i]['w'])))
+                if self.loglevel <= LOG_DEBUG: 
+                    self._log(self._log_grid, level=LOG_TRACE)
+                    self._log(_("\nNext word = [{}]"), self.words.print_word(p[i]['w']), level=LOG_DEBUG)
                     
                 # get string representation of next word in path
                 s_word = self.words.get_word_str(p[i]['w'])
                 
                 # skip word if it's already in USED list
                 if s_word in self.used: 
-                    self._log(_("Skipping [{}] (found in USED)...").format(s_word))
+                    if self.loglevel <= LOG_TRACE: self._log(_("Skipping [{}] (found in USED)..."), s_word, level=LOG_TRACE)
                     i += 1
                     continue
                 
                 # get new suggestions from word source if 'sug' is None
                 if p[i]['sug'] is None:                    
                     p[i]['sug'] = self.suggest(s_word) 
-                    self._log(_("Fetched {} suggestions for [{}]").format(len(p[i]['sug']), s_word))
+                    if self.loglevel <= LOG_DEBUG: self._log(_("Fetched {} suggestions for [{}]"), len(p[i]['sug']), s_word, level=LOG_DEBUG)
                     
                 # check timeout
                 if self.timeout_happened(timeout): raise CWTimeoutError()
@@ -1623,95 +1926,75 @@ class Crossword:
                 # if suggestions returned an empty list (means we can't go on with generation)
                 if len(p[i]['sug']) == 0:
                     
-                    self._log(_("No suggestions for [{}]!").format(s_word))
+                    if self.loglevel <= LOG_DEBUG: self._log(_("No suggestions for [{}]!"), s_word, level=LOG_DEBUG)
                     # reset 'sug' list to None (to possibly re-generate on next step)
                     p[i]['sug'] = None
-                    self._log(_("Clearing [{}]...").format(s_word), end='')
-                    # clear word forcibly, i.e. set ALL characters to BLANK
-                    # (this word is unusable as it is, so we must clear it thoroughly)
-                    # at the same time, discard word and its intersects from USED list
-                    self.clear_word(p[i]['w'], True)
-
-                    # report progress
-                    if on_progress:
-                        on_progress(self, self.words._word_count(self.words.is_word_complete), len(self.words.words))
                     
-                    # now we must look if we're already some steps forward through the path
-                    # or are at the first word, to see if we must go back and use some
-                    # other suggestions for previous words, and then re-generate the current one
+                    # now we must go back and use some other suggestions for previous words, 
+                    # and then re-generate the current one: the words we can go back to are those
+                    # placed in this path (the skipped ones are not ours to change)
+                    placed = [k for k in range(i) if not p[k]['trail'] is None]
                     
                     # if we CAN go back
-                    if i > 0:
+                    if placed:
+                        self.metrics.backtracks += 1
                         
-                        # determine all intersects of the current (failed) word --
-                        # we have to clear these intersects (aka 'parents'), or they will reproduce the
-                        # failed suggestion over and over again...
+                        # go back to the LAST intersect of the current (failed) word placed in the path --
+                        # the words placed after it don't cross the failed word, so changing them
+                        # would reproduce the failed pattern over and over again; 
+                        # if there are no intersects, go one step back
                         crosses = self.words.intersects_of(p[i]['w'], False)
-                        # if intersects are found
-                        if crosses:
-                            j = -1
-                            # loop through current path again to see which words are intersecting this one
-                            for k, wd in enumerate(p):
-                                # check timeout
-                                if self.timeout_happened(timeout): raise CWTimeoutError()
-                                # check for stopping criteria
-                                if stopcheck and stopcheck(): raise CWStopCheck()
-                                # don't search further than current (failed) word, since we haven't been there yet
-                                if k == i: break
-                                # if next word is an intersect...
-                                if wd['w'] in crosses:
-                                    # store FIRST intersect's index -- we'll revert path to it later
-                                    if j < 0: j = k
-                                    # drop word (intersect) from USED
-                                    self.used.discard(self.words.get_word_str(wd['w']))
-                                    self._log(_("Clearing [{}]...").format(self.words.print_word(wd['w'])), end='')
-                                    # clear it (SOFTLY!)
-                                    self.words.clear_word(wd['w'], False)  
-                                    self._log(f" --> [{self.words.get_word_str(wd['w'])}]")
-                                    # ...and reset its suggestions to None (need to re-generate later)
-                                    wd['sug'] = None    
-                            # reset path index to first intersect in path or one step back if no intersects were found in path
-                            i = j if j >= 0 else i - 1
-                            
-                        # if no intersects are found, reset path index to one step back
-                        else:
-                            i -= 1
+                        j = next((k for k in reversed(placed) if p[k]['w'] in crosses), placed[-1])
+                        
+                        # undo the placements back to the j-th word (inclusive) in reverse order,
+                        # restoring the grid cells as they were before the j-th word was placed
+                        for k in reversed(placed):
+                            if k < j: break
+                            if self.loglevel <= LOG_TRACE: self._log(_("Clearing [{}]..."), self.words.print_word(p[k]['w']), level=LOG_TRACE, end='')
+                            self.words.undo(p[k]['trail'])
+                            p[k]['trail'] = None
+                            if self.loglevel <= LOG_TRACE: self._log(" --> [{}]", self.words.get_word_str(p[k]['w']), level=LOG_TRACE)
+                            # the words after the j-th one will need new suggestions (their patterns change);
+                            # the j-th word keeps its remaining suggestions, which still match its restored pattern
+                            if k > j: p[k]['sug'] = None
+                        i = j
 
                         # report progress
                         if on_progress:
-                            on_progress(self, self.words._word_count(self.words.is_word_complete), len(self.words.words))
+                            on_progress(self, self.words.count_complete(), len(self.words.words))
                       
                         # go back to [i]-th path element (word) -- 
-                        # it will have been cleared by now, so we'll re-generate it and step forward as usual
+                        # it has been restored by now, so we'll try its next suggestion and step forward as usual
                         continue
                     
-                    # if we CANNOT go back (we're already or still at first word...)
+                    # if we CANNOT go back (nothing has been placed before the current word...)
                     else:
                         # set res to False, since we've failed to generate the current path
-                        self._log(_('Start node reached; unable to generate for path!'))
+                        self._log(_('Start node reached; unable to generate for path!'), level=LOG_DEBUG)
                         res = False
                         # break from current path, go to next one (if any)
                         break
-                
                 # otherwise, if suggestions are not empty
                 else:
                     # remove last suggestion from list and use it for current word
                     # (removing is necessary to be able to step back through or break from path
                     # when all the suggestions are exhausted)
                     sug_word = self.wordsource.pop_word(p[i]['sug'])
-                    self._log(_("Trying '{}' for [{}]...").format(sug_word, self.words.get_word_str(p[i]['w'])))
+                    if self.loglevel <= LOG_TRACE: self._log(_("Trying '{}' for [{}]..."), sug_word, self.words.get_word_str(p[i]['w']), level=LOG_TRACE)
                     # write suggestion to current word (store in word grid)
-                    # add new word to USED list (to mark as 'used' and 'visited')
-                    self.words.change_word(p[i]['w'], sug_word)
+                    # keeping the change trail to undo it on backtracking
+                    p[i]['trail'] = self.words.place_word(p[i]['w'], sug_word)
+                    self.metrics.nodes += 1
                     # increment path index to step forward to next word in path
                     i += 1
+                    if i > self.metrics.max_depth: self.metrics.max_depth = i
                     # report progress
                     if on_progress:
-                        on_progress(self, self.words._word_count(self.words.is_word_complete), len(self.words.words))
+                        on_progress(self, self.words.count_complete(), len(self.words.words))
                     
             # add generation result for current path to results list
             results.append(res)
-            self._log(_("\n\tCompleted path with result = {}").format(res))
+            self._log(_("\n\tCompleted path with result = {}"), res, level=LOG_DEBUG)
             
         self._log(_(f"\n\tCompleted CW!"))
         # return True if all paths have been generated successfully and False otherwise
@@ -1733,6 +2016,7 @@ class Crossword:
     # Prototype is:
     # ([Crossword] this object, `int` completed words count, `int` total words count) -> `None`
     # @returns `bool` `True` on success (all words in CW are filled) and `False` otherwise
+    # @see generate_stack() - the same algorithm without recursion (used by generate() for the 'recurse' method)
     def generate_recurse(self, start_word=None, recurse_level=0, timeout=None, stopcheck=None, on_progress=None):
         # check timeout
         if self.timeout_happened(timeout): raise CWTimeoutError()
@@ -1747,11 +2031,11 @@ class Crossword:
 
         # report progress
         if on_progress:
-            on_progress(self, self.words._word_count(self.words.is_word_complete), len(self.words.words))
+            on_progress(self, self.words.count_complete(), len(self.words.words))
         
         # find first incomplete word if start_word == None
         if start_word is None:
-            start_word = self.words.find_incomplete(exclude=lambda w: self.words.get_word_str(w) in self.used)
+            start_word = self.words.find_incomplete(method=self.slot_order, exclude=lambda w: self.words.get_word_str(w) in self.used, rng=self.rng)
             if start_word is None: return True
             
         # if CW is fully completed, clear USED and return True
@@ -1762,23 +2046,20 @@ class Crossword:
         # return True (success of generation cycle) if start_word is found in the USED list
         if s_word in self.used: return True
                        
-        self._log(_("{}New start word is: {}").format((LOG_INDENT * rec_level), self.words.print_word(start_word)))
+        if self.loglevel <= LOG_DEBUG: self._log(_("{}New start word is: {}"), LOG_INDENT * rec_level, self.words.print_word(start_word), level=LOG_DEBUG)
             
         # fetch list of suggested words for start_word
         suggested = self.suggest(s_word)
         # if nothing could be fetched return False
         if not suggested:
-            self._log(_("{}Unable to generate CW for word '{}'!").format((LOG_INDENT * rec_level), s_word))
+            if self.loglevel <= LOG_DEBUG: self._log(_("{}Unable to generate CW for word '{}'!"), LOG_INDENT * rec_level, s_word, level=LOG_DEBUG)
             return False
         
-        self._log(_("{}Fetched {} suggestions").format((LOG_INDENT * rec_level), len(suggested)))
+        if self.loglevel <= LOG_DEBUG: self._log(_("{}Fetched {} suggestions"), LOG_INDENT * rec_level, len(suggested), level=LOG_DEBUG)
         
         # success flag
         ok = True
         
-        # copy current word
-        old_start_word = s_word
-        
         # iterate over suggested words        
         for sugg_word in suggested:
             
@@ -1787,22 +2068,26 @@ class Crossword:
             # check for stopping criteria
             if stopcheck and stopcheck(): raise CWStopCheck()
             
-            self._log(_("{}Trying '{}' for '{}'...").format((LOG_INDENT * rec_level), sugg_word, s_word))
-            # replace start_word with next suggestion
-            self.words.change_word(start_word, sugg_word)
+            if self.loglevel <= LOG_TRACE: self._log(_("{}Trying '{}' for '{}'..."), LOG_INDENT * rec_level, sugg_word, s_word, level=LOG_TRACE)
+            # replace start_word with next suggestion (keeping the changed cells to restore them)
+            trail = self.words.place_word(start_word, sugg_word)
+            self.metrics.nodes += 1
+            if rec_level >= self.metrics.max_depth: self.metrics.max_depth = rec_level + 1
             # add it to USED list (for next suggest() and generate() calls)
             self.used.add(sugg_word)  
             
-            self._log(f"\n{str(self.words)}\n")
+            self._log(self._log_grid, level=LOG_TRACE)
             
             # find intersecting words (go for DFS algorithm), don't retrieve coordinates (just words)
             crosses = self.words.intersects_of(start_word, False)
             # if there are no intersects, return True (done current cycle)
             if not crosses: 
-                self._log(_("{}No crosses for '{}'").format((LOG_INDENT * rec_level), s_word))
+                if self.loglevel <= LOG_DEBUG: self._log(_("{}No crosses for '{}'"), LOG_INDENT * rec_level, s_word, level=LOG_DEBUG)
                 return True
             
-            self._log(_("{}Found {} crosses for '{}': {}").format((LOG_INDENT * rec_level), len(crosses), s_word, (repr([self.words.get_word_str(el) for el in crosses]))))
+            if self.loglevel <= LOG_TRACE: 
+                self._log(_("{}Found {} crosses for '{}': {}"), LOG_INDENT * rec_level, len(crosses), s_word, 
+                          repr([self.words.get_word_str(el) for el in crosses]), level=LOG_TRACE)
             
             # iterate over the intersecting words
             
@@ -1815,7 +2100,7 @@ class Crossword:
 
                 # skip already used words
                 if self.words.get_word_str(cross) in self.used:
-                    self._log(_("{}Skipping cross '{}'...").format((LOG_INDENT * rec_level), self.words.get_word_str(cross)))
+                    if self.loglevel <= LOG_TRACE: self._log(_("{}Skipping cross '{}'..."), LOG_INDENT * rec_level, self.words.get_word_str(cross), level=LOG_TRACE)
                     ok = True
                     continue
                                 
@@ -1827,10 +2112,10 @@ class Crossword:
                 rec_level -= 1
                                     
                 if res: 
-                    self._log(_("{}Generated for cross '{}'").format((LOG_INDENT * rec_level), self.words.get_word_str(cross)))
+                    if self.loglevel <= LOG_DEBUG: self._log(_("{}Generated for cross '{}'"), LOG_INDENT * rec_level, self.words.get_word_str(cross), level=LOG_DEBUG)
                     # report progress
                     if on_progress:
-                        on_progress(self, self.words._word_count(self.words.is_word_complete), len(self.words.words))
+                        on_progress(self, self.words.count_complete(), len(self.words.words))
                     # set OK to True on success (go to next intersect)
                     ok = True
                     # return True if CW is complete
@@ -1838,14 +2123,15 @@ class Crossword:
                     
                 else:
                     # if failed to generate, restore current word to previous (unfilled)
-                    self._log(_("{}Failed to generate for cross '{}', restoring grid...").format((LOG_INDENT * rec_level), self.words.get_word_str(cross)))
+                    if self.loglevel <= LOG_DEBUG: self._log(_("{}Failed to generate for cross '{}', restoring grid..."), LOG_INDENT * rec_level, self.words.get_word_str(cross), level=LOG_DEBUG)
+                    self.metrics.backtracks += 1
                     # discard the current (failed) intersect from USED
                     self.used.discard(self.words.get_word_str(cross))
                     # restore the old word (the one before diving into recursive generation)
-                    self.words.change_word(start_word, old_start_word)
+                    self.words.undo(trail)
                     # report progress
                     if on_progress:
-                        on_progress(self, self.words._word_count(self.words.is_word_complete), len(self.words.words))
+                        on_progress(self, self.words.count_complete(), len(self.words.words))
                     # reset OK to False
                     ok = False
                     # break from intersects loop, go to next suggestion for start_word...
@@ -1864,12 +2150,336 @@ class Crossword:
             return True if recurse_level > 0 else self.generate_recurse(None, 0, timeout, stopcheck, on_progress)
         
         # otherwise everything is sad...
-        self._log(_("{}Unable to generate CW for word '{}'!").format((LOG_INDENT * rec_level), str(start_word)))
+        if self.loglevel <= LOG_DEBUG: self._log(_("{}Unable to generate CW for word '{}'!"), LOG_INDENT * rec_level, str(start_word), level=LOG_DEBUG)
         # report progress
         if on_progress:
-            on_progress(self, self.words._word_count(self.words.is_word_complete), len(self.words.words))
+            on_progress(self, self.words.count_complete(), len(self.words.words))
         return False
     
+    ## @brief Generates crossword using the recursive algorithm with an explicit stack.
+    # This is the same algorithm as generate_recurse() (and it produces the same fills),
+    # but the recursive calls are replaced by frames pushed onto a list, so the generation
+    # depth is not limited by the Python recursion limit (large or sparse grids with thousands
+    # of words) and there is no function call overhead per node. Each frame keeps a trail
+    # of the grid cells changed by placing its current suggestion, so backtracking
+    # restores just those cells instead of rewriting the whole word.
+    # @param timeout `float` timeout in seconds after which time the generation 
+    # will be interrupted with a CWTimeoutError exception.
+    # `None` value (default) means no timeout check.
+    # @param stopcheck `callable` callback function that must return `True` 
+    # to stop the generation and `False` to continue.
+    # If `None` is passed, no stop check is performed.
+    # @param on_progress `callable` callback function to monitor currrent generation progress.
+    # Prototype is:
+    # ([Crossword] this object, `int` completed words count, `int` total words count) -> `None`
+    # @returns `bool` `True` on success (all words in CW are filled) and `False` otherwise
+    def generate_stack(self, timeout=None, stopcheck=None, on_progress=None):
+        # words must be a valid non-empty container
+        if getattr(self, 'words', None) is None:
+            raise CWError(_('Words collection is not initialized!')) 
+
+        words, used = self.words, self.used
+        # stack of frames (one per word being filled, as in the generate_recurse() calls):
+        # each element is a dict with the keys:
+        # 'w' = word, 'level' = stack level, 'old' = word text before filling, 
+        # 'sugg' = suggestions, 'si' = index of the next suggestion, 
+        # 'crosses' = intersecting words, 'ci' = index of the next intersect, 
+        # 'ok' = success flag, 'trail' = cells changed by placing the current suggestion (see Wordgrid::place_word())
+        stack = []
+        # next word to start from (a 'call') and its level: None = first incomplete word
+        start_word, level, call = None, 0, True
+        # result of the last finished frame (a 'return')
+        res = None
+
+        while True:
+            # check timeout
+            if self.timeout_happened(timeout): raise CWTimeoutError()
+            # check for stopping criteria
+            if stopcheck and stopcheck(): raise CWStopCheck()
+
+            if call:
+                call = False
+                # report progress
+                if on_progress:
+                    on_progress(self, words.count_complete(), len(words.words))
+                # find first incomplete word if start_word == None
+                if start_word is None:
+                    start_word = words.find_incomplete(method=self.slot_order, exclude=lambda w: words.get_word_str(w) in used, rng=self.rng)
+                s_word = words.get_word_str(start_word) if start_word else None
+                if start_word is None or s_word in used:
+                    res = True
+                else:
+                    if self.loglevel <= LOG_DEBUG: self._log(_("{}New start word is: {}"), LOG_INDENT * level, words.print_word(start_word), level=LOG_DEBUG)
+                    # fetch list of suggested words for start_word
+                    suggested = self.suggest(s_word)
+                    if not suggested:
+                        if self.loglevel <= LOG_DEBUG: self._log(_("{}Unable to generate CW for word '{}'!"), LOG_INDENT * level, s_word, level=LOG_DEBUG)
+                        res = False
+                    else:
+                        if self.loglevel <= LOG_DEBUG: self._log(_("{}Fetched {} suggestions"), LOG_INDENT * level, len(suggested), level=LOG_DEBUG)
+                        stack.append({'w': start_word, 'level': level, 'old': s_word, 'sugg': suggested, 'si': 0,
+                                      'crosses': [], 'ci': 0, 'ok': True, 'trail': []})
+                # returned at once: the generation is over if there's no frame to return to
+                if not res is None and not stack: return res
+            
+            frame = stack[-1]
+            w = frame['w']
+            rec_level = frame['level']
+
+            if not res is None:
+                # an intersect has been filled (or failed to)
+                cross = frame['crosses'][frame['ci']]
+                frame['ci'] += 1
+                if res:
+                    if self.loglevel <= LOG_DEBUG: self._log(_("{}Generated for cross '{}'"), LOG_INDENT * rec_level, words.get_word_str(cross), level=LOG_DEBUG)
+                    # report progress
+                    if on_progress:
+                        on_progress(self, words.count_complete(), len(words.words))
+                    frame['ok'] = True
+                else:
+                    # if failed to generate, restore current word to previous (unfilled)
+                    if self.loglevel <= LOG_DEBUG: self._log(_("{}Failed to generate for cross '{}', restoring grid..."), LOG_INDENT * rec_level, words.get_word_str(cross), level=LOG_DEBUG)
+                    self.metrics.backtracks += 1
+                    # discard the current (failed) intersect from USED
+                    used.discard(words.get_word_str(cross))
+                    # restore the cells changed by the current suggestion
+                    words.undo(frame['trail'])
+                    # report progress
+                    if on_progress:
+                        on_progress(self, words.count_complete(), len(words.words))
+                    frame['ok'] = False
+                    # skip the remaining intersects, go to next suggestion for start_word...
+                    frame['ci'] = len(frame['crosses'])
+                # stop if CW is complete
+                if res and len(words) == len(used):
+                    stack.pop()
+                    if not stack: return res
+                    continue
+                res = None
+
+            while True:
+                crosses = frame['crosses']
+                # fill the next intersect
+                while frame['ci'] < len(crosses):
+                    cross = crosses[frame['ci']]
+                    # skip already used words
+                    if not words.get_word_str(cross) in used:
+                        start_word, level, call = cross, rec_level + 1, True
+                        break
+                    if self.loglevel <= LOG_TRACE: self._log(_("{}Skipping cross '{}'..."), LOG_INDENT * rec_level, words.get_word_str(cross), level=LOG_TRACE)
+                    frame['ok'] = True
+                    frame['ci'] += 1
+                    # check timeout
+                    if self.timeout_happened(timeout): raise CWTimeoutError()
+                    # check for stopping criteria
+                    if stopcheck and stopcheck(): raise CWStopCheck()
+                if call: break
+
+                if crosses:
+                    # all intersects are processed
+                    frame['crosses'] = []
+                    # if we've succeeded, the current connected graph is complete
+                    if frame['ok']:
+                        stack.pop()
+                        # if we're on zero level, find next incomplete word and generate from there 
+                        # (solve new connected graph); otherwise, return True (step down the stack)
+                        if rec_level > 0:
+                            res = True
+                        else:
+                            start_word, level, call = None, 0, True
+                        break
+                    # otherwise, we're gonna try the next suggested word, so we'll discard the current (failed) one from USED
+                    used.discard(frame['sugg'][frame['si'] - 1])
+                    # check timeout
+                    if self.timeout_happened(timeout): raise CWTimeoutError()
+                    # check for stopping criteria
+                    if stopcheck and stopcheck(): raise CWStopCheck()
+
+                if frame['si'] == len(frame['sugg']):
+                    # suggestions are exhausted: everything is sad...
+                    if self.loglevel <= LOG_DEBUG: self._log(_("{}Unable to generate CW for word '{}'!"), LOG_INDENT * rec_level, str(w), level=LOG_DEBUG)
+                    # report progress
+                    if on_progress:
+                        on_progress(self, words.count_complete(), len(words.words))
+                    stack.pop()
+                    res = False
+                    break
+
+                # replace start_word with next suggestion
+                sugg_word = frame['sugg'][frame['si']]
+                frame['si'] += 1
+                if self.loglevel <= LOG_TRACE: self._log(_("{}Trying '{}' for '{}'..."), LOG_INDENT * rec_level, sugg_word, frame['old'], level=LOG_TRACE)
+                frame['trail'] = words.place_word(w, sugg_word)
+                self.metrics.nodes += 1
+                if rec_level >= self.metrics.max_depth: self.metrics.max_depth = rec_level + 1
+                # add it to USED list (for next suggest() and generate() calls)
+                used.add(sugg_word)
+
+                if self.loglevel <= LOG_TRACE: self._log(self._log_grid, level=LOG_TRACE)
+
+                # find intersecting words (go for DFS algorithm)
+                frame['crosses'] = words.intersects_of(w, False)
+                frame['ci'] = 0
+                # if there are no intersects, return True (done current frame)
+                if not frame['crosses']:
+                    if self.loglevel <= LOG_DEBUG: self._log(_("{}No crosses for '{}'"), LOG_INDENT * rec_level, frame['old'], level=LOG_DEBUG)
+                    stack.pop()
+                    res = True
+                    break
+                if self.loglevel <= LOG_TRACE: 
+                    self._log(_("{}Found {} crosses for '{}': {}"), LOG_INDENT * rec_level, len(frame['crosses']), frame['old'], 
+                              repr([words.get_word_str(el) for el in frame['crosses']]), level=LOG_TRACE)
+
+            # the generation is over if there's no frame to return to
+            if not res is None and not stack: return res
+
+    ## @brief Generates crossword using the constraint propagation algorithm.
+    # Each incomplete word (slot) keeps a domain - the list of its current suggestions.
+    # At each step, the slot with the fewest suggestions (the most constrained one) is filled next;
+    # ties are resolved in favor of slots with more intersects. After each placement, the domains
+    # of the crossing slots are re-fetched for their new patterns (forward checking), so a dead end
+    # is detected as soon as any crossing slot has no suggestions left. When all the suggestions 
+    # for a slot are exhausted, the algorithm jumps back to the latest slot that has constrained it
+    # (backjumping), rather than just to the previous one.
+    # @param timeout `float` timeout in seconds after which time the generation 
+    # will be interrupted with a CWTimeoutError exception.
+    # `None` value (default) means no timeout check.
+    # @param stopcheck `callable` callback function that must return `True` 
+    # to stop the generation and `False` to continue.
+    # If `None` is passed, no stop check is performed.
+    # @param on_progress `callable` callback function to monitor currrent generation progress.
+    # Prototype is:
+    # ([Crossword] this object, `int` completed words count, `int` total words count) -> `None`
+    # @returns `bool` `True` on success (all words in CW are filled) and `False` otherwise
+    def generate_csp(self, timeout=None, stopcheck=None, on_progress=None):
+        # words must be a valid non-empty container
+        if getattr(self, 'words', None) is None:
+            raise CWError(_('Words collection is not initialized!')) 
+
+        # slots (words) to fill
+        free = set(w for w in self.words.words if not self.words.is_word_complete(w))
+        # word order in grid (to break ties in the slot selection)
+        order = {w: i for i, w in enumerate(self.words.words)}
+        # domains (suggestions) of slots
+        domains = {}
+        for w in free:
+            domains[w] = self.suggest(self.words.get_word_str(w))
+            if not domains[w]:
+                self._log(_("Unable to generate CW for word '{}'!"), self.words.get_word_str(w))
+                return False
+            if self.timeout_happened(timeout): raise CWTimeoutError()
+            if stopcheck and stopcheck(): raise CWStopCheck()
+
+        # returns the filled slots constraining the given one
+        def constraints(w):
+            return set(cross for cross in self.words.intersects_of(w, False) if not cross in free)
+
+        # stack of filled slots: each element is a dict with the keys:
+        # 'w' = slot, 'cands' = remaining suggestions, 'old' = slot text before filling,
+        # 'sug' = the current suggestion, 'trail' = cells changed by placing 'sug' (see Wordgrid::place_word()),
+        # 'pruned' = domains of crossing slots before filling, 'conflicts' = filled slots to blame for failures,
+        # 'depth' = position on the stack (1-based, used to indent the log)
+        stack = []
+        frame = None
+        
+        while True:
+            # check timeout
+            if self.timeout_happened(timeout): raise CWTimeoutError()
+            # check for stopping criteria
+            if stopcheck and stopcheck(): raise CWStopCheck()
+
+            if frame is None:
+                # all slots are filled: success
+                if not free: 
+                    self._log(_("\n\tCompleted CW!"))
+                    return True
+                # pick the most constrained slot
+                w = min(free, key=lambda w: (len(domains[w]), -len(self.words.intersects_of(w, False)), order[w]))
+                frame = {'w': w, 'cands': domains[w][:], 'old': self.words.get_word_str(w), 
+                         'sug': None, 'trail': [], 'pruned': {}, 'conflicts': set(), 'depth': len(stack) + 1}
+                free.discard(w)
+                stack.append(frame)
+                if len(stack) > self.metrics.max_depth: self.metrics.max_depth = len(stack)
+                if self.loglevel <= LOG_DEBUG: self._log(_("{}New start word is: {}"), LOG_INDENT * len(stack), self.words.print_word(w), level=LOG_DEBUG)
+
+            if self._csp_fill(frame, free, domains, constraints, timeout, stopcheck):
+                frame = None
+                # report progress
+                if on_progress:
+                    on_progress(self, self.words.count_complete(), len(self.words.words))
+                continue
+
+            # suggestions exhausted: jump back to the latest slot in conflict with this one
+            conflicts = frame['conflicts'] | constraints(frame['w'])
+            stack.pop()
+            free.add(frame['w'])
+            while stack and not stack[-1]['w'] in conflicts:
+                self._csp_unfill(stack[-1], domains)
+                free.add(stack.pop()['w'])
+            if not stack:
+                self._log(_("Unable to generate CW for word '{}'!"), frame['old'])
+                return False
+            frame = stack[-1]
+            if self.loglevel <= LOG_DEBUG: self._log(_("{}Jumping back to '{}'..."), LOG_INDENT * len(stack), frame['sug'], level=LOG_DEBUG)
+            self._csp_unfill(frame, domains)
+            frame['conflicts'] |= conflicts - {frame['w']}
+            # report progress
+            if on_progress:
+                on_progress(self, self.words.count_complete(), len(self.words.words))
+
+    ## @brief Fills a slot with its next viable suggestion (used by generate_csp()).
+    # The suggestions are tried one by one, and each one is forward-checked:
+    # the domains of the crossing slots still to fill are re-fetched; if one of them is empty,
+    # the suggestion is rejected and the filled slots constraining that crossing slot are
+    # recorded as conflicts.
+    # @param frame `dict` slot state (see generate_csp())
+    # @param free `set` slots still to fill
+    # @param domains `dict` slot domains (suggestions)
+    # @param constraints `callable` returns the filled slots constraining a given slot
+    # @param timeout `float` generation timeout, see generate_csp()
+    # @param stopcheck `callable` stop check callback, see generate_csp()
+    # @returns `bool` `True` if the slot has been filled, `False` if the suggestions are exhausted
+    def _csp_fill(self, frame, free, domains, constraints, timeout=None, stopcheck=None):
+        w = frame['w']
+        crosses = [cross for cross in self.words.intersects_of(w, False) if cross in free]
+        while frame['cands']:
+            # check timeout
+            if self.timeout_happened(timeout): raise CWTimeoutError()
+            # check for stopping criteria
+            if stopcheck and stopcheck(): raise CWStopCheck()
+
+            sug = self.wordsource.pop_word(frame['cands'])
+            if sug in self.used: continue
+            if self.loglevel <= LOG_TRACE: self._log(_("{}Trying '{}' for '{}'..."), LOG_INDENT * frame['depth'], sug, frame['old'], level=LOG_TRACE)
+            frame['trail'] = self.words.place_word(w, sug)
+            self.metrics.nodes += 1
+            self.used.add(sug)
+            frame['sug'] = sug
+            frame['pruned'] = {}
+            ok = True
+            for cross in crosses:
+                frame['pruned'][cross] = domains[cross]
+                domains[cross] = self.suggest(self.words.get_word_str(cross))
+                if not domains[cross]:
+                    frame['conflicts'] |= constraints(cross) - {w}
+                    ok = False
+                    break
+            if ok: return True
+            self._csp_unfill(frame, domains)
+        return False
+
+    ## Reverts the slot filled by _csp_fill() along with the domains of its crossing slots.
+    # @param frame `dict` slot state (see generate_csp())
+    # @param domains `dict` slot domains (suggestions)
+    def _csp_unfill(self, frame, domains):
+        domains.update(frame['pruned'])
+        frame['pruned'] = {}
+        if frame['sug'] is None: return
+        self.metrics.backtracks += 1
+        self.used.discard(frame['sug'])
+        self.words.undo(frame['trail'])
+        frame['sug'] = None
+
     ## @brief Checks if the generation operation (or whatever) has timed out.
     # The method gets the elapsed time between the current timer and Crossword::time_start
     # and checks this value against its 'timeout' argument.
@@ -1878,10 +2488,11 @@ class Crossword:
     def timeout_happened(self, timeout=None):
         return ((timeit.default_timer() - self.time_start) >= timeout) if not timeout is None else False
     
-    ## Generates (fills) the crossword (grid) using the given generation method (iterative / recursive).
+    ## Generates (fills) the crossword (grid) using the given generation method (iterative / recursive / constraint propagation).
     # @param method `str`: generation method, one of:
     #     * 'iter': use the iterative algorithm
-    #     * 'recurse': use the recursive algorithm
+    #     * 'recurse': use the recursive algorithm (see generate_stack())
+    #     * 'csp': use the constraint propagation algorithm
     #     * `None` or empty string (default): use recursive algo if cw is fully blank and iter othwerwise
     # @param timeout `float`: terminate generation after the lapse of this many seconds;
     # if `None`, no timeout is set
@@ -1900,60 +2511,105 @@ class Crossword:
     # (see validate())
     # @param on_progress `callable`: callback function to monitor currrent generation progress:
     # see this argument in generate_recurse() and generate_iter()
-    # @returns `bool` `True` on successful generation and `False` on failure.
+    # @param seed `int` | `None`: if not `None`, Crossword::rng is re-created with this seed,
+    # so that generation with the same seed, grid and word sources is reproducible
+    # @param on_metrics `callable`: called at completion with the generation metrics; prototype is:
+    # on_metrics(metrics: GenMetrics) -> `None`
+    # @param progress_interval `float` | `None`: min interval between `on_progress` calls in seconds
+    # (e.g. 0.05 for 20 reports per second); the reports coming sooner are dropped, so each call
+    # delivers the latest progress. The first and the last reports are always delivered.
+    # `None` or 0 (default) = report every change.
+    # @returns `GenMetrics` generation metrics (also stored in Crossword::metrics), which
+    # evaluates to `True` on successful generation and `False` on failure.
     def generate(self, method=None, timeout=60.0, stopcheck=None, 
-                 onfinish=None, ontimeout=None, onstop=None, onerror=None, onvalidate=None, on_progress=None):
+                 onfinish=None, ontimeout=None, onstop=None, onerror=None, onvalidate=None, on_progress=None, 
+                 seed=None, on_metrics=None, progress_interval=None):
+        # reset metrics
+        self.metrics = metrics = GenMetrics(method or None, seed)
+        metrics.words = len(self.words.words)
         # check source
         if not self.wordsource:
             self._log(_('No valid word source for crossword generation!'))
             if onfinish: onfinish(0)
-            return False
+            if on_metrics: on_metrics(metrics)
+            return metrics
         
+        # time (and throttle) the progress callback
+        if on_progress:
+            progress_callback = on_progress
+            last_report = [None]
+            def on_progress(cw, complete, total, force=False):
+                t = timeit.default_timer()
+                if progress_interval and not force and not last_report[0] is None and \
+                        t - last_report[0] < progress_interval:
+                    return
+                last_report[0] = t
+                progress_callback(cw, complete, total)
+                metrics.callback_time += timeit.default_timer() - t
+        # word source cache stats before generation
+        cache_info = self.wordsource.cache_info() if hasattr(self.wordsource, 'cache_info') else None
+
         # mark start time to clock execution
         self.time_start = timeit.default_timer()
+        # seed the random generator
+        if not seed is None:
+            self.rng = np.random.default_rng(seed)
         # reset USED list
         self.reset_used()
-        self._log(f"{str(self.words)}\n\n")
+        self._log(lambda: f"{str(self.words)}\n\n")
+        # no grid callbacks during the search: Wordgrid::on_update is called once afterwards
+        self.words.suspend_callbacks()
         # generate CW using the specified method and store the result
         res = False
         try:
             # report progress
             if on_progress:
-                on_progress(self, self.words._word_count(self.words.is_word_complete), len(self.words.words))
+                on_progress(self, self.words.count_complete(), len(self.words.words))
 
             if method == 'iter':
                 self._log("USING ITERATIVE ALGORITHM...")
                 res = self.generate_iter(timeout=timeout, stopcheck=stopcheck, on_progress=on_progress) 
             elif method == 'recurse':
                 self._log("USING RECURSIVE ALGORITHM...")
-                res = self.generate_recurse(timeout=timeout, stopcheck=stopcheck, on_progress=on_progress)
+                res = self.generate_stack(timeout=timeout, stopcheck=stopcheck, on_progress=on_progress)
+            elif method == 'csp':
+                self._log("USING CONSTRAINT PROPAGATION ALGORITHM...")
+                res = self.generate_csp(timeout=timeout, stopcheck=stopcheck, on_progress=on_progress)
             elif not method:
                 self._log("AUTO SELECTING ALGORITHM...")
                 if self.words.count_incomplete() < len(self.words):
                     # cw has some completed words, use recursive ago
                     self._log("USING RECURSIVE ALGORITHM...")
-                    res = self.generate_recurse(timeout=timeout, stopcheck=stopcheck, on_progress=on_progress)
+                    metrics.method = 'recurse'
+                    res = self.generate_stack(timeout=timeout, stopcheck=stopcheck, on_progress=on_progress)
                 else:
                     # cw is fully blank, use iterative algo
                     self._log("USING ITERATIVE ALGORITHM...")
+                    metrics.method = 'iter'
                     res = self.generate_iter(timeout=timeout, stopcheck=stopcheck, on_progress=on_progress)
             else:
-                raise CWError(_("'method' argument ({}) is not valid! Must be one of: 'iter', 'recurse', or None / empty string.").format(repr(method)))
+                raise CWError(_("'method' argument ({}) is not valid! Must be one of: 'iter', 'recurse', 'csp', or None / empty string.").format(repr(method)))
         
         except CWTimeoutError:
-            self._log(_("TIMED OUT AT {} SEC!").format(timeout))
+            self._log(_("TIMED OUT AT {} SEC!"), timeout)
+            metrics.status = 'timeout'
             if ontimeout: ontimeout(timeout)
             
         except CWStopCheck:
             self._log(_(f"STOPPED!"))
+            metrics.status = 'stopped'
             if onstop: onstop()
             
         except (CWError, Exception) as err:
+            metrics.status = 'error'
             if onerror: onerror(err)
 
+        finally:
+            self.words.resume_callbacks()
+
         # report progress
         if on_progress:
-            on_progress(self, self.words._word_count(self.words.is_word_complete), len(self.words.words))
+            on_progress(self, self.words.count_complete(), len(self.words.words), True)
             
         # calculate elapsed time
         elapsed = timeit.default_timer() - self.time_start
@@ -1963,24 +2619,37 @@ class Crossword:
             bad_words = self.validate()
             if onvalidate: onvalidate(bad_words) 
 
-        if self.log: 
-            self._log(f"\n\n{str(self.words)}")
-            self._log(f"\n{self.words.print_words()}")
+        self._log(lambda: f"\n\n{str(self.words)}")
+        self._log(lambda: f"\n{self.words.print_words()}")
         
         # output results
-        self._log(_("GENERATION COMPLETED IN {:.1f} SEC.").format(elapsed))
+        self._log(_("GENERATION COMPLETED IN {:.1f} SEC."), elapsed)
         if onfinish: onfinish(elapsed)
-        return res
+
+        # fill in the metrics
+        metrics.success = bool(res)
+        if res: metrics.status = 'ok'
+        metrics.elapsed = elapsed
+        metrics.complete = self.words.count_complete()
+        if cache_info:
+            cache_info_end = self.wordsource.cache_info()
+            metrics.cache_hits = cache_info_end['hits'] - cache_info['hits']
+            metrics.cache_misses = cache_info_end['misses'] - cache_info['misses']
+        self._log(lambda: str(metrics))
+        if on_metrics: on_metrics(metrics)
+        return metrics
     
     ## Validates all completed words against the word list (checks they are all present).
     # @returns `list` | `None` list of unmatched words (those not found in Crossword::wordsource)
     # or `None` if all words were matched
     def validate(self):
-        # call word source's check_bad() function on all words in CW
-        lst_bad = list(filter(lambda w: not self.wordsource.check(w, self.pos, self.wordfilter), self.words.word_list()))
+        # check all words in CW at once with the word source's check_many()
+        words = self.words.word_list()
+        found = self.wordsource.check_many(words, self.pos, self.wordfilter)
+        lst_bad = [w for w, ok in zip(words, found) if not ok]
         # if lst_bad is not empty, it will contain words not found in the word source
         if lst_bad:
-            self._log(_("No database results for {}!").format(repr(lst_bad)))
+            self._log(_("No database results for {}!"), repr(lst_bad))
             return lst_bad
         else:
             self._log(_('CHECK OK'))
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+# Copyright: (c) 2020, Iskander Shafikov <s00mbre@gmail.com>
+# GNU General Public License v3.0+ (see LICENSE.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+## @package pycross.cwbatch
+# @brief Headless (console) batch crossword generation -- see main().
+#
+# The module uses only the GUI-independent modules (pycross::crossword, pycross::wordsrc
+# and pycross::sqlitedb), so it doesn't require Qt. Crosswords are generated in a pool
+# of worker processes; each generated crossword is saved to the output folder
+# and the results (timings and success rates) are written to a JSON summary file.
+#
+# Usage examples (run from the 'pycross' directory):
+# <pre>
+#   python cwbatch.py -n 100 --cols 15 --rows 15 --pattern 2 -a de -p ALL -o out
+#   python cwbatch.py -g grid1.txt grid2.xpf -n 10 -a assets/dic/english-words.20 -p ALL -f xpf ipuz
+#   python cwbatch.py -a '{"type": "db", "file": "fr", "shuffle": false}' -p ALL -w 4 -t 120
+#   python cwbatch.py --cols 15 --rows 15 --pattern 5 -a de -p ALL -m '' --portfolio 8
+# </pre>
+# With the '--portfolio' option, crosswords are generated one by one, each in several
+# parallel attempts (see pycross::portfolio); the first successful attempt wins.
+# Word sources (-a/--addsrc) are given either as JSON strings in the format of the
+# serialized sources stored in the app settings (see `pycross::forms::WordSrcDialog::__init__()`),
+# or as short names of the preinstalled SQLite DBs (e.g. 'de'), or as paths to
+# DB files (*.db) or text files (one word per line).
+# The words in the preinstalled DBs are not marked as nouns, so use '-p ALL' with them
+# (a warning is printed for the sources having no words of the given parts of speech).
+import os, sys, json, argparse, timeit, traceback
+import multiprocessing as mp
+from utils.globalvars import *
+
+# the core modules use the gettext '_()' function, so install it first
+switch_lang('')
+
+from crossword import Crossword, CWError
+from wordsrc import MultiWordsource, make_wordsource
+from portfolio import generate_portfolio, PORTFOLIO_METHODS
+
+# ******************************************************************************** #
+
+## `wordsrc::MultiWordsource` word source used by the current worker process (see init_worker())
+WORDSOURCE = None
+
+## Parses a word source specification given in the command line.
+# @param spec `str` word source: JSON-serialized source data, short DB name, or path to a DB / text file
+# @returns `dict` serialized source data as used by wordsrc::make_wordsource()
+def parse_source(spec):
+    if spec.lstrip().startswith('{'):
+        src = {'active': True, 'type': 'db', 'file': '', 'dbtype': 'sqlite', 'dbtables': SQL_TABLES,
+               'haspos': False, 'encoding': ENCODING, 'shuffle': True, 'delim': ' ', 'words': []}
+        src.update(json.loads(spec))
+        return src
+    if spec.lower() in LANG or os.path.splitext(spec)[1].lower() == '.db':
+        return {'type': 'db', 'file': spec}
+    return {'type': 'file', 'file': spec}
+
+## Initializes a worker process: creates the word sources.
+# DB connections cannot be shared by processes, so each worker makes its own sources.
+# @param sources `list` of `dict` serialized word sources (see parse_source())
+# @param max_fetch `int` max number of suggestions per word
+def init_worker(sources, max_fetch):
+    global WORDSOURCE
+    WORDSOURCE = MultiWordsource(max_fetch=max_fetch)
+    for src in sources:
+        wsrc = make_wordsource(src)
+        # unavailable sources are reported by check_sources()
+        if not wsrc is None: WORDSOURCE.add(wsrc)
+
+## Warns about the unavailable word sources and the sources having no words
+# of the given parts of speech (the jobs would fail with such sources).
+# @param sources `list` of `dict` serialized word sources (see parse_source())
+# @param pos `list` | `None` parts of speech (`None` = any)
+def check_sources(sources, pos):
+    for src in sources:
+        wsrc = make_wordsource(src)
+        if wsrc is None:
+            print(_("Word source '{}' is unavailable!").format(src.get('file', '')), file=sys.stderr)
+        elif pos and not wsrc.exists(pos=pos):
+            print(_("Word source '{}' has no words of the parts of speech {} (use '-p ALL' to use any words)!").format(
+                  src.get('file', ''), ' '.join(pos)), file=sys.stderr)
+
+## Generates a single crossword (runs in a worker process).
+# @param job `dict` job data: 'id' (`int` job number), 'name' (`str` crossword name),
+# 'data' and 'data_type' (grid source for crossword::Crossword), 'outdir', 'formats',
+# 'method', 'timeout', 'pos' and 'seed' (see main())
+# The filled crossword is validated against the word sources: crosswords with words missing
+# from the sources get the 'invalid' status and are not saved.
+# @returns `dict` job result: 'id', 'name', 'seed', 'success' (`bool`), 'status' (`str`),
+# 'time' (`float` generation time in seconds), 'files' (`list` saved files), 'error' (`str`),
+# 'metrics' (`dict` generation metrics, see crossword::GenMetrics::to_dict())
+def run_job(job):
+    result = {'id': job['id'], 'name': job['name'], 'seed': job['seed'], 'success': False, 'status': 'fail',
+              'time': 0.0, 'files': [], 'error': ''}
+    try:
+        cw = Crossword(data=job['data'], data_type=job['data_type'], wordsource=WORDSOURCE,
+                       pos=job['pos'], log=None)
+        t = timeit.default_timer()
+        res = cw.generate(method=job['method'], timeout=job['timeout'], seed=job['seed'],
+                          ontimeout=lambda timeout: result.update(status='timeout'),
+                          onerror=lambda err: result.update(status='error', error=str(err)))
+        result['time'] = timeit.default_timer() - t
+        result['metrics'] = res.to_dict()
+        if res:
+            # the generator may fill words missing from the sources (see portfolio::run_attempt())
+            bad_words = cw.validate()
+            if bad_words:
+                result['status'] = 'invalid'
+                result['error'] = _('Words not found in the word sources: {}').format(', '.join(bad_words))
+                return result
+            result['success'] = True
+            result['status'] = 'ok'
+            for fmt in job['formats']:
+                filename = os.path.join(job['outdir'], f"{job['name']}.{fmt}")
+                cw.words.to_file(filename, fmt)
+                result['files'].append(filename)
+    except Exception as err:
+        result['status'] = 'error'
+        result['error'] = traceback.format_exc() if DEBUGGING else str(err)
+    return result
+
+## Generates a single crossword in several parallel attempts (see portfolio::generate_portfolio()).
+# @param job `dict` job data (see run_job())
+# @param sources `list` of `dict` serialized word sources (see parse_source())
+# @param attempts `int` number of attempts
+# @param workers `int` max number of simultaneous processes
+# @param max_fetch `int` max number of suggestions per word
+# @returns `dict` job result (see run_job())
+def run_portfolio_job(job, sources, attempts, workers, max_fetch):
+    result = {'id': job['id'], 'name': job['name'], 'seed': job['seed'], 'success': False, 'status': 'fail',
+              'time': 0.0, 'files': [], 'error': ''}
+    try:
+        cw = Crossword(data=job['data'], data_type=job['data_type'], pos=job['pos'], log=None)
+        t = timeit.default_timer()
+        winner = generate_portfolio(cw, sources, attempts=attempts, workers=workers,
+                                    methods=[job['method']] if job['method'] else PORTFOLIO_METHODS,
+                                    timeout=job['timeout'], seed=job['seed'], max_fetch=max_fetch,
+                                    ontimeout=lambda timeout: result.update(status='timeout'),
+                                    onerror=lambda err: result.update(status='error', error=str(err)),
+                                    on_metrics=lambda metrics: result.update(metrics=metrics.to_dict()))
+        result['time'] = timeit.default_timer() - t
+        if winner:
+            result['success'] = True
+            result['status'] = 'ok'
+            result['attempt'] = {key: value for key, value in winner.items() if key != 'metrics'}
+            for fmt in job['formats']:
+                filename = os.path.join(job['outdir'], f"{job['name']}.{fmt}")
+                cw.words.to_file(filename, fmt)
+                result['files'].append(filename)
+    except Exception as err:
+        result['status'] = 'error'
+        result['error'] = traceback.format_exc() if DEBUGGING else str(err)
+    return result
+
+## Prints the result of a job.
+# @param res `dict` job result (see run_job())
+# @param num `int` number of jobs done
+# @param total `int` total number of jobs
+def print_result(res, num, total):
+    metrics = res.get('metrics', None)
+    counters = f", {metrics['nodes']} nodes, {metrics['backtracks']} backtracks" if metrics else ''
+    print(f"[{num}/{total}] {res['name']}: {res['status'].upper()} ({res['time']:.2f} sec{counters}) {res['error']}")
+
+## Makes the list of generation jobs from the parsed command-line arguments.
+# @param args `argparse.Namespace` parsed command-line arguments
+# @returns `list` of `dict` jobs (see run_job())
+def make_jobs(args):
+    if args.grid:
+        templates = []
+        for path in args.grid:
+            name = os.path.splitext(os.path.basename(path))[0]
+            if os.path.splitext(path)[1][1:].lower() in ('xpf', 'ipuz'):
+                templates.append((name, os.path.abspath(path), 'file'))
+            else:
+                with open(path, 'r', encoding=ENCODING, errors='replace') as file:
+                    templates.append((name, [l.rstrip('\r\n') for l in file if l.strip()], 'grid'))
+    else:
+        templates = [(f"cw{args.cols}x{args.rows}-{args.pattern}",
+                      Crossword.basic_grid(args.cols, args.rows, args.pattern), 'grid')]
+    jobs = []
+    for name, data, data_type in templates:
+        for i in range(args.count):
+            jobs.append({'id': len(jobs), 'name': f"{name}_{i + 1:04}", 'data': data, 'data_type': data_type,
+                         'outdir': args.outdir, 'formats': args.format, 'method': args.method or None,
+                         'timeout': args.timeout, 'pos': args.pos,
+                         'seed': None if args.seed is None else args.seed + len(jobs)})
+    return jobs
+
+# ******************************************************************************** #
+
+## Main function: parses command-line arguments and runs the batch generation.
+def main():
+    parser = argparse.ArgumentParser(description='Headless batch crossword generation')
+    parser.add_argument('-g', '--grid', nargs='*', help='Grid templates: text files (one grid row per line) or XPF / IPUZ files')
+    parser.add_argument('--cols', type=int, default=15, help='Number of columns (if no grid templates are given)')
+    parser.add_argument('--rows', type=int, default=15, help='Number of rows (if no grid templates are given)')
+    parser.add_argument('--pattern', type=int, default=1, choices=[1, 2, 3, 4, 5, 6], help='Pattern type (if no grid templates are given)')
+    parser.add_argument('-a', '--addsrc', default=[], action='append', help='Add word source (JSON, DB short name or file path)')
+    parser.add_argument('-n', '--count', type=int, default=1, help='Number of crosswords per grid template')
+    parser.add_argument('-m', '--method', default='recurse', choices=['', 'iter', 'recurse', 'csp'], help='Generation method (empty = guess; with --portfolio: combine all methods)')
+    parser.add_argument('-t', '--timeout', type=float, default=60.0, help='Generation timeout per crossword (seconds)')
+    parser.add_argument('-p', '--pos', default=['N'], nargs='*', help="Parts of speech to use, e.g. N V (ALL = any; use ALL for sources without POS data)")
+    parser.add_argument('--seed', type=int, default=None, help='Random seed (crossword N uses seed + N - 1) to reproduce the results; random if not set')
+    parser.add_argument('-x', '--maxfetch', type=int, default=MAX_RESULTS, help='Max number of suggestions per word')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help='Number of worker processes')
+    parser.add_argument('--portfolio', type=int, default=0, help='Number of parallel attempts per crossword (0 = no portfolio)')
+    parser.add_argument('-o', '--outdir', default='.', help='Output folder')
+    parser.add_argument('-f', '--format', default=['xpf'], nargs='+', choices=['xpf', 'ipuz'], help='Output file formats')
+    parser.add_argument('-s', '--summary', default='summary.json', help='Summary file name (in the output folder)')
+    args = parser.parse_args()
+
+    if not args.addsrc:
+        parser.error('at least one word source must be given (-a / --addsrc)')
+    sources = [parse_source(spec) for spec in args.addsrc]
+    if 'ALL' in args.pos: args.pos = None
+    check_sources(sources, args.pos)
+    os.makedirs(args.outdir, exist_ok=True)
+    jobs = make_jobs(args)
+    results = []
+    t = timeit.default_timer()
+    if args.portfolio > 0:
+        workers = max(1, min(args.workers or 1, args.portfolio))
+        print(_('Generating {} crosswords in {} attempts each ({} processes)...').format(len(jobs), args.portfolio, workers))
+        for job in jobs:
+            res = run_portfolio_job(job, sources, args.portfolio, workers, args.maxfetch)
+            results.append(res)
+            print_result(res, len(results), len(jobs))
+    else:
+        workers = max(1, min(args.workers or 1, len(jobs)))
+        print(_('Generating {} crosswords in {} processes...').format(len(jobs), workers))
+        with mp.Pool(workers, initializer=init_worker, initargs=(sources, args.maxfetch)) as pool:
+            for res in pool.imap_unordered(run_job, jobs):
+                results.append(res)
+                print_result(res, len(results), len(jobs))
+    elapsed = timeit.default_timer() - t
+
+    results.sort(key=lambda res: res['id'])
+    succeeded = [res for res in results if res['success']]
+    times = [res['time'] for res in results]
+    # total counters and timings of all runs
+    metrics = {key: sum(res['metrics'][key] for res in results if res.get('metrics'))
+               for key in ('nodes', 'backtracks', 'suggest_calls', 'suggest_time', 'cache_hits', 'cache_misses',
+                           'callback_time', 'log_time')}
+    summary = {'total': len(results), 'succeeded': len(succeeded),
+               'success_rate': len(succeeded) / len(results) if results else 0.0,
+               'elapsed': elapsed, 'workers': workers, 'portfolio': args.portfolio,
+               'method': args.method or None, 'timeout': args.timeout, 'seed': args.seed,
+               'time_mean': sum(times) / len(times) if times else 0.0,
+               'time_max': max(times, default=0.0),
+               'time_mean_success': sum(res['time'] for res in succeeded) / len(succeeded) if succeeded else 0.0,
+               'metrics': metrics, 'sources': sources, 'results': results}
+    summary_file = os.path.join(args.outdir, args.summary)
+    with open(summary_file, 'w', encoding=ENCODING) as outfile:
+        json.dump(summary, outfile, ensure_ascii=False, indent='\t')
+    print(_('Done: {} of {} crosswords generated in {:.1f} sec, summary saved to {}').format(
+          len(succeeded), len(results), elapsed, summary_file))
+    return 0 if succeeded else 1
+
+# ******************************************************************************** #
+
+## Program entry point.
+if __name__ == '__main__':
+    sys.exit(main())
@@ -36,181 +36,37 @@
 
 from utils.globalvars import *
 from utils.utils import Task, is_iterable
+from sqlitedb import *
 import sqlite3, os, re, codecs, requests, traceback
 from urllib.request import urlopen
 from PyQt5 import QtCore
 
 # ******************************************************************************** #
 
-## `str` newline symbol
-NEWLINE = '\n'
-## `str` SQL query to create default table structure
-SQL_CREATE_TABLES = \
-f"create table if not exists {SQL_TABLES['pos']['table']} ({NEWLINE}" \
-f"{SQL_TABLES['pos']['fid']} integer primary key autoincrement,{NEWLINE}" \
-f"{SQL_TABLES['pos']['fpos']} text not null,{NEWLINE}" \
-f"{SQL_TABLES['pos']['fposdesc']} text default '');{NEWLINE}" \
-f"create table if not exists {SQL_TABLES['words']['table']} ({NEWLINE}" \
-f"{SQL_TABLES['words']['fid']} integer primary key autoincrement,{NEWLINE}" \
-f"{SQL_TABLES['words']['fwords']} text not null,{NEWLINE}" \
-f"{SQL_TABLES['words']['fpos']} integer,{NEWLINE}" \
-f"foreign key ({SQL_TABLES['words']['fpos']}) references {SQL_TABLES['pos']['table']}({SQL_TABLES['pos']['fid']}) on delete set null on update no action);{NEWLINE}" \
-f"create unique index word_idx on {SQL_TABLES['words']['table']}({SQL_TABLES['words']['fwords']}, {SQL_TABLES['words']['fpos']});"
-## `str` SQL query to insert part of speech data
-SQL_INSERT_POS = \
-f"insert into {SQL_TABLES['pos']['table']}({SQL_TABLES['pos']['fpos']}, {SQL_TABLES['pos']['fposdesc']}) values (?, ?);"
-## `str` SQL query to insert words and part of speech data
-SQL_INSERT_WORD = \
-f"insert or replace into {SQL_TABLES['words']['table']} ({SQL_TABLES['words']['fwords']}, {SQL_TABLES['words']['fpos']}){NEWLINE}" \
-f"values('{BRACES}', (select {SQL_TABLES['pos']['fid']} from {SQL_TABLES['pos']['table']} where {SQL_TABLES['pos']['fpos']} = '{BRACES}'));"
-## `str` SQL query to clear words
-SQL_CLEAR_WORDS = f"delete from {SQL_TABLES['words']['table']};"
-## `str` SQL query to count entries (words)
-SQL_COUNT_WORDS = f"select count(*) from {SQL_TABLES['words']['table']};"
-## `str` SQL query to display all words
-SQL_GET_WORDS = f"select {SQL_TABLES['words']['table']}.{SQL_TABLES['words']['fid']}, " \
-f"{SQL_TABLES['words']['table']}.{SQL_TABLES['words']['fwords']}, " \
-f"{SQL_TABLES['pos']['table']}.{SQL_TABLES['pos']['fpos']}, " \
-f"{SQL_TABLES['pos']['table']}.{SQL_TABLES['pos']['fposdesc']} " \
-f"from {SQL_TABLES['words']['table']}{NEWLINE}" \
-f"join {SQL_TABLES['pos']['table']} on {SQL_TABLES['words']['table']}.{SQL_TABLES['words']['fpos']} = {SQL_TABLES['pos']['table']}.{SQL_TABLES['pos']['fid']};"
-## `str` SQL query to display all POS
-SQL_GET_POS = f"select * from {SQL_TABLES['pos']['table']};"
 ## `str` Hunspell dic repo URL
 HUNSPELL_REPO = 'https://raw.githubusercontent.com/wooorm/dictionaries/main'
 
 # ******************************************************************************** #
 
-## @brief SQLite database driver implementation wrapping the standard Python sqlite3 methods.
-# Some handy methods are added to connect / disconnect to / from the DB,
-# create / recreate the DB with the default set of tables (to use as a word source),
-# and import [Hunspell](https://hunspell.github.io/) dictionary data.
-class Sqlitedb:
-
-    ## Constructor initializes DB driver connection.
-    # @param dbname `str` path to database file (*.db) or an abbreviated language name
-    # for preinstalled DB files stored in 'assets/dic', e.g. 'en' (='assets/dic/en.db')
-    def __init__(self, dbname=None, fullpath=False, recreate=False, connect=True):
-        if dbname:
-            self.setpath(dbname, fullpath, recreate, connect)
-
-    ## Destructor disconnects from DB.
-    def __del__(self):
-        self.disconnect()
-
-    ## Initializes the path to the DB file and establishes a connection if required.
-    # @param dbname `str` path to database file (*.db) or an abbreviated language name -
-    # see init()
-    # @param fullpath `bool` `True` to indicate that the 'dbname' argument is the full file path
-    # (default = `False`)
-    # @param recreate `bool` `True` to recreate the database file with the default table structure
-    # (default = `False`).
-    # @warning If set to `True`, all data in the DB file (if present) will be lost!
-    # @param connect `bool` `True` (default) to attempt connecting to the DB immediately
-    # @returns `bool` `True` on success, `False` on failure
-    def setpath(self, dbname, fullpath=False, recreate=False, connect=True):
-        ## `str` full path to the DB
-        self.dbpath = os.path.abspath(dbname if fullpath else os.path.join(DICFOLDER, dbname + '.db')) \
-            if not dbname is None else None
-        #print(f'Set database path: {self.dbpath}')
-        if connect and self.dbpath:
-            if self.create_db(recreate):
-                return self.connect()
-            else:
-                return False
-        return True
-
-    ## Connects to the DB file (Sqlitedb::dbpath).
-    # @returns `bool` `True` on success, `False` on failure
-    def connect(self):
-        if not os.path.isfile(self.dbpath):
-            #print(f'Database path {self.dbpath} is unavailable!')
-            return False
-        try:
-            self.disconnect()
-            ## internal DB connection object (SQLite driver)
-            self.conn = sqlite3.connect(self.dbpath)
-            #print(f'Connected to database {self.dbpath}')
-            return True
-        except Exception as err:
-            #print(str(err))
-            self.disconnect()
-            return False
-        except:
-            self.disconnect()
-            return False
-
-    ## Disconnects from the currently open DB.
-    # @param commit_trailing `bool` `True` (default) to commit all pending changes
-    # to the DB before disconnecting
-    def disconnect(self, commit_trailing=True):
-        if getattr(self, 'conn', None):
-            try:
-                if commit_trailing: self.conn.commit()
-                self.conn.close()
-                #print(f'Disconnected from database {self.dbpath}')
-            except:
-                pass
-
-    ## Creates the DB in Sqlitedb::dbpath, optionally overwriting the existing file.
-    # @param overwrite `bool` True to overwrite the existing file (default = `False`)
-    # @warning If set to `True`, all data in the DB file (if present) will be lost!
-    # @returns `bool` `True` on success, `False` on failure
-    def create_db(self, overwrite=False):
-        if os.path.isfile(self.dbpath) and not overwrite: return True
-        try:
-            self.disconnect()
-            if os.path.isfile(self.dbpath):
-                os.remove(self.dbpath)
-            con = sqlite3.connect(':memory:')
-            con.executescript(f"attach database '{self.dbpath}' as words;")
-            con.close()
-            if self.create_tables():
-                #print(f'Created database: {self.dbpath}')
-                return True
-            return False
-
-        except Exception as err:
-            print(str(err))
-            self.disconnect()
-            return False
-
-        except:
-            self.disconnect()
-            return False
-
-    ## Creates the default table structure in the DB.
-    # @returns `bool` `True` on success, `False` on failure
-    # @see utils::globalvars::SQL_TABLES
-    def create_tables(self):
-        if not self.connect(): return False
-        try:
-            #print(SQL_CREATE_TABLES)
-            cur = self.conn.cursor()
-            cur.executescript(SQL_CREATE_TABLES)
-            self.conn.commit()
-            #print(SQL_INSERT_POS)
-            cur.executemany(SQL_INSERT_POS, POS)
-            self.conn.commit()
-            #print(f'Created objects for database: {self.dbpath}')
-            return True
-        except Exception as err:
-            print(_('DATABASE ERROR: {}').format(str(err)))
-            self.disconnect()
-            return False
-        except:
-            self.disconnect()
-            return False
-
-    ## Retrieves all words from the database.
-    # @returns `list` list of retrieved words as tuples: (ID, WORD, POS SHORT NAME, POS FULL NAME)
-    def get_words(self):
-        return self.conn.cursor().execute(SQL_GET_WORDS)
-
-    ## Retrieves all parts of speech from the database.
-    # @returns `list` list of POS as tuples: (ID, POS SHORT NAME, POS FULL NAME)
-    def get_pos(self):
-        return self.conn.cursor().execute(SQL_GET_POS)
+## @brief Upgrades an existing word source DB for fast word pattern lookups.
+# DBs created by older versions of the app (including the preinstalled ones)
+# lack the pattern lookup indexes (see sqlitedb::Sqlitedb::upgrade_schema()).
+# @param dbname `str` path to database file (*.db) or an abbreviated language name
+# for preinstalled DB files, e.g. 'de' (see sqlitedb::Sqlitedb::setpath())
+# @param tables `dict` DB table and field names for words and parts of speech - 
+# see utils::globalvars::SQL_TABLES (default names)
+# @returns `bool` `True` on success, `False` on failure (e.g. the DB file is not found)
+def upgrade_db(dbname, tables=SQL_TABLES):
+    fullpath = not dbname.lower() in LANG
+    if not os.path.isfile(dbname if fullpath else os.path.join(DICFOLDER, dbname + '.db')):
+        return False
+    db = Sqlitedb()
+    if not db.setpath(dbname, fullpath=fullpath, recreate=False, connect=True):
+        return False
+    try:
+        return db.upgrade_schema(tables)
+    finally:
+        db.disconnect()
 
 # ******************************************************************************** #
 
@@ -679,6 +535,8 @@ class HunspellImportTask(QtCore.QRunnable):
                 try:
                     db.conn.commit()
                     cur.close()
+                    # refresh the statistics of the pattern lookup indexes
+                    db.upgrade_schema()
                 except:
                     pass
                 else:
@@ -12,9 +12,9 @@ from distutils import version
 from utils.globalvars import *
 from utils.utils import *
 from utils.onlineservices import MWDict, YandexDict, GoogleSearch, Share
-from crossword import BLANK, CWInfo
+from crossword import BLANK, FILLER, FILLER2, CWInfo
 from guisettings import CWSettings
-from dbapi import HunspellImport, Sqlitedb
+from dbapi import HunspellImport, Sqlitedb, upgrade_db
 
 SHOWHELP = _('Show help')
 
@@ -634,6 +634,9 @@ class WordSrcDialog(BasicDialog):
         self.btn_dbedit.clicked.connect(self.on_btn_dbedit)
         href = os.path.join(DOCS_FOLDER, '3_9_2_1__database_sources.htm#id_9')
         self.btn_dbedit.setWhatsThis(f'<a href="{href}">{SHOWHELP}</a>')
+        self.btn_dboptimize = QtWidgets.QPushButton(QtGui.QIcon(f"{ICONFOLDER}/flash.png"), _('Optimize'), None)
+        self.btn_dboptimize.setToolTip(_('Add indexes to the database for faster word lookups'))
+        self.btn_dboptimize.clicked.connect(self.on_btn_dboptimize)
         self.layout_db.addRow(_('Path'), self.le_dbfile)
         self.layout_db.addRow(_('Type'), self.combo_dbtype)
         self.layout_db.addRow(_('User'), self.le_dbuser)
@@ -641,6 +644,7 @@ class WordSrcDialog(BasicDialog):
         self.layout_db.addRow(_('Tables'), self.layout_dbtables)
         self.layout_db.addRow(_('Shuffle'), self.chb_db_shuffle)
         self.layout_db.addRow(self.btn_dbedit)
+        self.layout_db.addRow(self.btn_dboptimize)
         self.page_db.setLayout(self.layout_db)
         self.stacked.addWidget(self.page_db)
 
@@ -884,6 +888,22 @@ class WordSrcDialog(BasicDialog):
         cmd = cmd.replace('<file>', os.path.abspath(self.src['file'] if not self.src['file'].lower() in LANG else os.path.join(DICFOLDER, self.src['file'] + '.db')))
         run_exe(f"{settings['exepath']} {cmd}", False, False, shell=True)
 
+    ## @brief Fired when WordSrcDialog::btn_dboptimize is clicked.
+    # Upgrades the DB for fast word pattern lookups (see dbapi::upgrade_db()).
+    @QtCore.pyqtSlot()
+    def on_btn_dboptimize(self):
+        if not self.validate():
+            return
+        QtWidgets.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            res = upgrade_db(self.src['file'], self.src['dbtables'])
+        finally:
+            QtWidgets.QApplication.restoreOverrideCursor()
+        if res:
+            MsgBox(_('Database optimized'), self)
+        else:
+            MsgBox(_('Unable to optimize database {}!').format(self.src['file']), self, _('Error'), 'error')
+
     ## @brief Fired when WordSrcDialog::btn_fileedit is clicked.
     # Launches the external text file editor
     # (if present in guisettings::CWSettings::settings['plugins']['thirdparty']['text']['exepath'])
@@ -3561,13 +3581,29 @@ class SettingsDialog(BasicDialog):
         self.layout_generation = QtWidgets.QFormLayout()
         self.layout_generation.setSpacing(10)
         self.combo_gen_method = QtWidgets.QComboBox()
-        self.combo_gen_method.addItems([_('Guess'), _('Iterative'), _('Recursive')])
+        self.combo_gen_method.addItems([_('Guess'), _('Iterative'), _('Recursive'), _('Constraint propagation')])
         self.combo_gen_method.setEditable(False)
         self.combo_gen_method.setCurrentIndex(0)
         self.spin_gen_timeout = QtWidgets.QDoubleSpinBox()
         self.spin_gen_timeout.setRange(0.0, 10000.0)
         self.spin_gen_timeout.setValue(60.0)
         self.spin_gen_timeout.setSuffix(_(' sec.'))
+        self.spin_gen_workers = QtWidgets.QSpinBox()
+        self.spin_gen_workers.setRange(1, 64)
+        self.spin_gen_workers.setValue(1)
+        self.spin_gen_workers.setToolTip(_('Number of generation attempts run in parallel processes (the first successful one wins)'))
+        self.spin_gen_progress_rate = QtWidgets.QSpinBox()
+        self.spin_gen_progress_rate.setRange(0, 100)
+        self.spin_gen_progress_rate.setValue(20)
+        self.spin_gen_progress_rate.setSuffix(_(' / sec.'))
+        self.spin_gen_progress_rate.setSpecialValueText(_('Unlimited'))
+        self.spin_gen_progress_rate.setToolTip(_('Max number of generation progress updates per second'))
+        self.chb_gen_live_preview = QtWidgets.QCheckBox()
+        self.chb_gen_live_preview.setChecked(False)
+        self.chb_gen_live_preview.setToolTip(_('Show the words in the grid while the crossword is being generated'))
+        self.chb_gen_separate_process = QtWidgets.QCheckBox()
+        self.chb_gen_separate_process.setChecked(False)
+        self.chb_gen_separate_process.setToolTip(_('Generate in a separate process even with a single attempt (keeps the app responsive and stops generation at once)'))
         self.combo_log = QtWidgets.QComboBox()
         self.combo_log.addItems([_('No log'), _('Console'), _('File...')])
         self.combo_log.setEditable(True)
@@ -3576,6 +3612,10 @@ class SettingsDialog(BasicDialog):
 
         self.layout_generation.addRow(_('Method'), self.combo_gen_method)
         self.layout_generation.addRow(_('Timeout'), self.spin_gen_timeout)
+        self.layout_generation.addRow(_('Parallel attempts'), self.spin_gen_workers)
+        self.layout_generation.addRow(_('Progress updates'), self.spin_gen_progress_rate)
+        self.layout_generation.addRow(_('Live preview'), self.chb_gen_live_preview)
+        self.layout_generation.addRow(_('Separate process'), self.chb_gen_separate_process)
         self.layout_generation.addRow(_('Log'), self.combo_log)
 
         self.page_generation.setLayout(self.layout_generation)
@@ -4464,6 +4504,12 @@ class SettingsDialog(BasicDialog):
 
         # timeout
         settings['cw_settings']['timeout'] = self.spin_gen_timeout.value()
+        # parallel attempts
+        settings['cw_settings']['workers'] = self.spin_gen_workers.value()
+        # progress updates
+        settings['cw_settings']['progress_rate'] = self.spin_gen_progress_rate.value()
+        settings['cw_settings']['live_preview'] = self.chb_gen_live_preview.isChecked()
+        settings['cw_settings']['separate_process'] = self.chb_gen_separate_process.isChecked()
 
         # method
         method = self.combo_gen_method.currentIndex()
@@ -4471,8 +4517,10 @@ class SettingsDialog(BasicDialog):
             settings['cw_settings']['method'] = None
         elif method == 1:
             settings['cw_settings']['method'] = 'iter'
-        else:
+        elif method == 2:
             settings['cw_settings']['method'] = 'recurse'
+        else:
+            settings['cw_settings']['method'] = 'csp'
 
         # pos
         pos = []
@@ -4993,6 +5041,12 @@ class SettingsDialog(BasicDialog):
         if page is None or page == _('Generation'):
             # timeout
             self._set_spin_value_safe(self.spin_gen_timeout, settings['cw_settings']['timeout'])
+            # parallel attempts
+            self._set_spin_value_safe(self.spin_gen_workers, settings['cw_settings']['workers'])
+            # progress updates
+            self._set_spin_value_safe(self.spin_gen_progress_rate, settings['cw_settings']['progress_rate'])
+            self.chb_gen_live_preview.setChecked(settings['cw_settings']['live_preview'])
+            self.chb_gen_separate_process.setChecked(settings['cw_settings']['separate_process'])
             # method
             meth = settings['cw_settings']['method']
             if not meth:
@@ -5001,6 +5055,8 @@ class SettingsDialog(BasicDialog):
                 self.combo_gen_method.setCurrentIndex(1)
             elif meth == 'recurse':
                 self.combo_gen_method.setCurrentIndex(2)
+            elif meth == 'csp':
+                self.combo_gen_method.setCurrentIndex(3)
             # log
             log = settings['cw_settings']['log']
             if not log:
@@ -5876,12 +5932,444 @@ class SettingsDialog(BasicDialog):
 # *****          CwTable
 # ******************************************************************************** #
 
-## @brief Crossword grid class (based on `QtWidgets.QTableWidget`).
+## data role of the raw grid character (crossword::BLANK, crossword::FILLER etc.) in CwGridModel
+CW_CHAR_ROLE = QtCore.Qt.UserRole + 1
+## data role of the word number shown in a cell (`int` or `None`) in CwGridModel
+CW_NUMBER_ROLE = QtCore.Qt.UserRole + 2
+## data role of the cell format key in CWSettings::settings['cell_format'] 
+# ('NORMAL', 'HILITE', 'BLANK', 'FILLER' or 'FILLER2') in CwGridModel
+CW_STYLE_ROLE = QtCore.Qt.UserRole + 3
+
+## @brief Table model over a crossword grid (crossword::Wordgrid).
+# The model doesn't store any cell data: the characters, word numbers and cell
+# format keys are read from the grid on request, so only the cells shown by the view
+# are ever looked at. Call update_cells() after changing the grid characters
+# and set_grid() after changing the grid structure (or replacing the grid).
+# @warning The grid is read from the GUI thread whenever the view repaints, so it must not be
+# changed from another thread while it is shown: show a snapshot of its characters
+# with set_preview() instead (as gui::MainWindow does during generation).
+class CwGridModel(QtCore.QAbstractTableModel):
+
+    ## Constructor.
+    # @param parent `QtCore.QObject` parent object
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        ## `crossword::Wordgrid` | `None` the crossword grid
+        self.words = None
+        ## `crossword::Word` | `None` the highlighted (current) word
+        self.hilite = None
+        ## `bool` whether the grid is in edit mode (all cells are selectable)
+        self.edit_mode = False
+        ## `list` | `None` snapshot of the grid characters shown instead of the grid 
+        # (live preview of the generation, see set_preview())
+        self.preview = None
+
+    ## Sets (or resets) the crossword grid shown by the model.
+    # @param words `crossword::Wordgrid` | `None` the crossword grid
+    def set_grid(self, words):
+        self.beginResetModel()
+        self.words = words
+        self.hilite = None
+        self.preview = None
+        self.endResetModel()
+
+    ## @brief Shows a snapshot of the grid characters instead of the grid itself.
+    # Used to preview the grid while it is being filled in another thread:
+    # the view paints the snapshot and doesn't read the grid being changed.
+    # @param chars `list` | `str` | `None` snapshot of crossword::Wordgrid::chars (must be of the same size);
+    # `None` to show the grid again
+    def set_preview(self, chars):
+        if chars is None and self.preview is None: return
+        self.preview = chars
+        self.update_cells()
+
+    ## Notifies the views that the cells have changed (to repaint them).
+    # @param coords `iterable` | `None` grid coordinates (`2-tuple` column, row) of the changed cells;
+    # `None` means all cells
+    def update_cells(self, coords=None):
+        if self.words is None: return
+        if coords is None:
+            self.dataChanged.emit(self.index(0, 0), self.index(self.words.height - 1, self.words.width - 1))
+            return
+        for col, row in coords:
+            index = self.index(row, col)
+            self.dataChanged.emit(index, index)
+
+    ## @brief Sets the highlighted word and repaints only the cells whose highlighting has changed.
+    # The cells of the previous and the new highlighted word are updated with one
+    # `dataChanged` signal per word (a word is a single row or column span).
+    # @param word `crossword::Word` | `None` the new highlighted word
+    def set_hilite(self, word):
+        old_word = self.hilite
+        self.hilite = word
+        if self.words is None or old_word is word: return
+        for w in (old_word, word):
+            if not w: continue
+            top_left = self.index(w.start[1], w.start[0])
+            bottom_right = self.index(w.end[1], w.end[0])
+            if top_left.isValid() and bottom_right.isValid():
+                self.dataChanged.emit(top_left, bottom_right)
+
+    ## Gets the cell format key of a cell.
+    # @param row `int` cell row
+    # @param col `int` cell column
+    # @returns `str` key in CWSettings::settings['cell_format']
+    def style_key(self, row, col):
+        ch = (self.preview or self.words.chars)[row * self.words.width + col]
+        if ch == FILLER: return 'FILLER'
+        if ch == FILLER2: return 'FILLER2'
+        if self.hilite and self.hilite.does_cross((col, row)): return 'HILITE'
+        return 'BLANK' if ch == BLANK else 'NORMAL'
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if (self.words is None or parent.isValid()) else self.words.height
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if (self.words is None or parent.isValid()) else self.words.width
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if self.words is None or not index.isValid(): return None
+        row, col = index.row(), index.column()
+        if role == QtCore.Qt.DisplayRole:
+            ch = (self.preview or self.words.chars)[row * self.words.width + col]
+            if ch == BLANK: return ''
+            return ch.lower() if CWSettings.settings['grid_style']['char_case'] == 'lower' else ch.upper()
+        if role == CW_CHAR_ROLE:
+            return (self.preview or self.words.chars)[row * self.words.width + col]
+        if role == CW_NUMBER_ROLE:
+            words = self.words.starts.get((col, row), None)
+            if not words: return None
+            w = words['h'] or words['v']
+            return w.num if w else None
+        if role == CW_STYLE_ROLE:
+            return self.style_key(row, col)
+        return None
+
+    def flags(self, index):
+        if self.words is None or not index.isValid(): return QtCore.Qt.NoItemFlags
+        if self.edit_mode: return QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled
+        return QtCore.Qt.ItemFlags(CWSettings.settings['cell_format'][self.style_key(index.row(), index.column())]['flags'])
+
+## @brief Cache of the brushes, pens, fonts and word number glyphs used to paint the crossword grid.
+# The painting objects are made from CWSettings::settings['cell_format'] and 
+# CWSettings::settings['grid_style'] once per grid scale and kept until these settings change,
+# so neither the grid view (CwCellDelegate) nor the image / print export (gui::MainWindow::_paint_cwgrid)
+# has to create them for every cell. Use get() to retrieve the styles for a given scale.
+class CwRenderCache:
+
+    ## `dict` grid scale -> `dict` styles (see make_styles())
+    _cache = {}
+    ## `str` settings the cached styles were made from
+    _settings_key = None
+
+    ## @returns `str` key identifying the current grid format settings 
+    # (all the cell formats and grid styles except the scale)
+    @staticmethod
+    def settings_key():
+        grid_style = {k: v for k, v in CWSettings.settings['grid_style'].items() if k != 'scale'}
+        return repr((CWSettings.settings['cell_format'], grid_style))
+
+    ## Gets the cached styles for a given scale, (re)making them if the settings have changed.
+    # @param scale `float` grid scale in percent (fonts of the cell letters are scaled,
+    # word number fonts are not)
+    # @returns `dict` styles (see make_styles())
+    @classmethod
+    def get(cls, scale=100):
+        key = cls.settings_key()
+        if key != cls._settings_key:
+            cls._cache.clear()
+            cls._settings_key = key
+        styles = cls._cache.get(scale, None)
+        if styles is None:
+            styles = cls.make_styles(scale)
+            cls._cache[scale] = styles
+        return styles
+
+    ## Drops all cached styles (they will be remade on the next call to get()).
+    @classmethod
+    def clear(cls):
+        cls._cache.clear()
+        cls._settings_key = None
+
+    ## Makes the styles from the current settings.
+    # @param scale `float` grid scale in percent
+    # @returns `dict` styles:
+    #   * 'cells': `dict` cell format key ('NORMAL', 'HILITE', 'BLANK', 'FILLER', 'FILLER2') ->
+    #       `dict` with 'brush' (background), 'pen' (letter), 'font' (letter) and 'align' (letter alignment)
+    #   * 'numbers': `dict` with 'pen', 'font' and 'glyphs' (`dict` number -> `QtGui.QStaticText`,
+    #       filled by glyph()); `None` if the word numbers are hidden
+    #   * 'line': `QtGui.QPen` grid line pen
+    @staticmethod
+    def make_styles(scale=100):
+        cells = {}
+        for k, fmt in CWSettings.settings['cell_format'].items():
+            cells[k] = {'brush': QtGui.QBrush(QtGui.QColor.fromRgba(fmt['bg_color']), fmt['bg_pattern']),
+                        'pen': QtGui.QPen(QtGui.QBrush(QtGui.QColor.fromRgba(fmt['fg_color']), fmt['fg_pattern']), 1),
+                        'font': make_font(fmt['font_name'], max(1, round(fmt['font_size'] * scale / 100.)), fmt['font_weight'], fmt['font_italic']),
+                        'align': QtCore.Qt.Alignment(fmt['align'])}
+        grid_style = CWSettings.settings['grid_style']
+        num_settings = grid_style['numbers']
+        numbers = {'pen': QtGui.QPen(QtGui.QColor.fromRgba(num_settings['color'])),
+                   'font': make_font(num_settings['font_name'], num_settings['font_size'], 
+                                     num_settings['font_weight'], num_settings['font_italic']),
+                   'glyphs': {}} if num_settings['show'] else None
+        line = QtGui.QPen(QtGui.QBrush(QtGui.QColor.fromRgba(grid_style['line_color'])), 
+                          grid_style['line_width'], grid_style['line'])
+        return {'cells': cells, 'numbers': numbers, 'line': line}
+
+    ## @brief Gets the prepared static text of a word number.
+    # The glyphs are laid out once per number and font and then just drawn
+    # with `QtGui.QPainter.drawStaticText()`.
+    # @param styles `dict` styles returned by get()
+    # @param num `int` word number
+    # @returns `QtGui.QStaticText` | `None` the number glyph (`None` if the numbers are hidden)
+    @staticmethod
+    def glyph(styles, num):
+        numbers = styles['numbers']
+        if not numbers: return None
+        st = numbers['glyphs'].get(num, None)
+        if st is None:
+            st = QtGui.QStaticText(str(num))
+            st.setTextFormat(QtCore.Qt.PlainText)
+            st.prepare(QtGui.QTransform(), numbers['font'])
+            numbers['glyphs'][num] = st
+        return st
+
+    ## @brief Paints a crossword grid by a `QtGui.QPainter` object, constrained by cliprect (`QtCore.QRectF`).
+    # Used to export the grid to images and to print it (gui::MainWindow::_paint_cwgrid).
+    # @param painter `QtGui.QPainter` the painter object
+    # @param words `crossword::Wordgrid` the crossword grid
+    # @param cliprect `QtCore.Qt.QRectF` clip rectangle inside which the painting will be made
+    # @param clear_cw `bool` whether to paint the grid without the letters
+    # @param styles `dict` | `None` styles to paint with (see make_styles()); `None` = cached styles for scale 100.
+    # Pass styles made by make_styles() when painting outside the GUI thread.
+    # If the painter has a clip region, only the grid rows crossing it are painted.
+    @classmethod
+    def paint_grid(cls, painter, words, cliprect=None, clear_cw=True, styles=None):
+
+        # if cliprect is not set, use the entire painter's viewport
+        if not cliprect: cliprect = painter.viewport()
+
+        # brushes, pens, fonts and number glyphs (unscaled)
+        if styles is None: styles = cls.get()
+        cell_styles = styles['cells']
+        num_style = styles['numbers']
+        gridline_width = CWSettings.settings['grid_style']['line_width']
+        # surrounding (FILLER2) cells have neither background nor border
+        no_brush = QtGui.QBrush(QtCore.Qt.NoBrush)
+        no_pen = QtGui.QPen(QtCore.Qt.NoPen)
+        upper_case = CWSettings.settings['grid_style']['char_case'] == 'upper'
+        # number of rows and columns
+        cols = words.width
+        rows = words.height
+        # calculate cell size
+        cell_w = int((cliprect.width() + gridline_width) / cols + 2 * gridline_width)
+        cell_h = int((cliprect.height() + gridline_width) / rows + 2 * gridline_width)
+        cell_sz = min(cell_w, cell_h)
+        # vertical offset (start = cliprect top position)
+        v_offset = cliprect.top()
+        # painted area (e.g. a strip of a large image): rows outside it are skipped
+        paint_rect = painter.clipBoundingRect() if painter.hasClipping() else None
+
+        # for each row...
+        for r in range(rows):
+            if paint_rect:
+                if v_offset > paint_rect.bottom(): break
+                if v_offset + cell_sz < paint_rect.top():
+                    v_offset += cell_sz - 2 * gridline_width
+                    continue
+            # horizontal offset (start = cliprect left position)
+            h_offset = cliprect.left()
+            # for each column...
+            for c in range(cols):
+                # get cell character from underlying cw grid
+                ch = words.chars[r * words.width + c]
+
+                # pick corresponding style for cell: normal, blocked (FILLER), 
+                # surrounding (FILLER2) or blank
+                if ch == FILLER:
+                    style = cell_styles['FILLER']
+                elif ch == FILLER2:
+                    style = cell_styles['FILLER2']
+                elif ch == BLANK:
+                    style = cell_styles['BLANK']
+                else:
+                    style = cell_styles['NORMAL']
+
+                # draw cell rect (accounting for border width)
+                cell_rect = QtCore.QRectF(h_offset + gridline_width, v_offset + gridline_width,
+                                          cell_sz - 2 * gridline_width, cell_sz - 2 * gridline_width)
+                painter.setPen(no_pen if ch == FILLER2 else styles['line'])
+                painter.setBrush(no_brush if ch == FILLER2 else style['brush'])
+                painter.drawRect(cell_rect)
+
+                # draw word number (if configured to show in settings)
+                if num_style:
+                    # get words starting with that coordinate
+                    start_words = words.starts.get((c, r), None)
+                    # use either the Across or the Down word (whichever is found)
+                    w = (start_words['h'] or start_words['v']) if start_words else None
+                    if w:
+                        glyph = cls.glyph(styles, w.num)
+                        glyph_sz = glyph.size()
+                        painter.setPen(num_style['pen'])
+                        painter.setFont(num_style['font'])
+                        # draw centered in top-left quarter of the cell
+                        painter.drawStaticText(QtCore.QPointF(cell_rect.x() + (cell_rect.width() / 2 - glyph_sz.width()) / 2,
+                                                              cell_rect.y() + (cell_rect.height() / 2 - glyph_sz.height()) / 2), glyph)
+
+                # draw text (letter) if that's a normal cell (not blank or filler)
+                if not clear_cw and ch != BLANK and ch != FILLER and ch != FILLER2:
+                    painter.setPen(style['pen'])
+                    painter.setFont(style['font'])
+                    painter.drawText(cell_rect.toRect(), style['align'], ch.upper() if upper_case else ch.lower())
+
+                # increment h_offset (next column)
+                h_offset += cell_sz - 2 * gridline_width
+
+            # increment v_offset (next row)
+            v_offset += cell_sz - 2 * gridline_width
+
+    ## @brief Exports a crossword grid to a raster image file, painting it in horizontal strips.
+    # Each strip is painted into a separate image and passed to utils::utils::ImageStripWriter,
+    # so for the streamed formats (PNG, BMP) the memory used is bounded by the strip size rather than
+    # the full image size. The function is safe to call from a worker thread: it makes its own
+    # painting styles and uses no widgets.
+    # @param words `crossword::Wordgrid` the crossword grid (must not be changed while exporting)
+    # @param filepath `str` output file path (JPG, PNG, TIFF, BMP)
+    # @param size `QtCore.QSize` image size in pixels
+    # @param clear_cw `bool` whether to paint the grid without the letters
+    # @param dpi `int` image resolution saved in the image metadata
+    # @param quality `int` output quality (0 - 100) for JPG / TIFF, -1 = default
+    # @param strip_height `int` height of the painted strips in pixels
+    # @param on_progress `callable` | `None` progress callback, args: `int` rows done, `int` rows total
+    # @param stopcheck `callable` | `None` function returning `True` to cancel the export
+    # @returns `bool` `True` if the image has been saved, `False` if the export has been cancelled
+    # (the incomplete file is removed)
+    @classmethod
+    def export_image(cls, words, filepath, size, clear_cw=True, dpi=72, quality=-1, strip_height=256,
+                     on_progress=None, stopcheck=None):
+        width, height = size.width(), size.height()
+        writer = ImageStripWriter(filepath, width, height, dpi, quality)
+        styles = cls.make_styles()
+        full_rect = QtCore.QRectF(0, 0, width, height)
+        strip = QtGui.QImage(width, min(strip_height, height), QtGui.QImage.Format_ARGB32_Premultiplied)
+        done = False
+        try:
+            for top in range(0, height, strip_height):
+                if stopcheck and stopcheck(): return False
+                strip.fill(QtCore.Qt.transparent if writer.alpha else QtCore.Qt.white)
+                painter = QtGui.QPainter(strip)
+                painter.translate(0, -top)
+                painter.setClipRect(QtCore.QRectF(0, top, width, strip.height()))
+                cls.paint_grid(painter, words, full_rect, clear_cw, styles)
+                painter.end()
+                writer.write(strip)
+                if on_progress: on_progress(min(top + strip_height, height), height)
+            done = True
+        finally:
+            done = writer.close(not done)
+        return done
+
+## @brief Item delegate painting the crossword grid cells (see CwTable).
+# The cells are painted directly with the brushes, pens, fonts and number glyphs
+# taken from CwRenderCache; update_styles() picks them for the current settings and scale
+# (on settings change or zoom), they are not made for every cell.
+class CwCellDelegate(QtWidgets.QStyledItemDelegate):
+
+    ## Constructor.
+    # @param parent `QtCore.QObject` parent object
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        ## `dict` cached styles (see CwRenderCache::make_styles())
+        self.styles = None
+        self.update_styles()
+
+    ## Picks the cell styles for the current settings from CwRenderCache.
+    # @param scale `float` | `None` grid scale in percent (to scale the fonts);
+    # `None` = CWSettings::settings['grid_style']['scale']
+    # @param force `bool` remake the cached styles even if the settings haven't changed
+    def update_styles(self, scale=None, force=False):
+        if scale is None: scale = CWSettings.settings['grid_style']['scale']
+        if force: CwRenderCache.clear()
+        self.styles = CwRenderCache.get(scale)
+
+    def paint(self, painter, option, index):
+        style = self.styles['cells'].get(index.data(CW_STYLE_ROLE), None)
+        if not style: return
+        rect = option.rect
+        selected = bool(option.state & QtWidgets.QStyle.State_Selected)
+        painter.save()
+        painter.fillRect(rect, option.palette.highlight() if selected else style['brush'])
+        # word number in the top-left corner of the cell
+        num = index.data(CW_NUMBER_ROLE) if self.styles['numbers'] else None
+        if num:
+            painter.setPen(self.styles['numbers']['pen'])
+            painter.setFont(self.styles['numbers']['font'])
+            painter.drawStaticText(rect.x() + 1, rect.y(), CwRenderCache.glyph(self.styles, num))
+        text = index.data(QtCore.Qt.DisplayRole)
+        if text:
+            painter.setPen(QtGui.QPen(option.palette.highlightedText(), 1) if selected else style['pen'])
+            painter.setFont(style['font'])
+            painter.drawText(rect, style['align'], text)
+        painter.restore()
+
+## @brief A cell of CwTable.
+# A lightweight reference to a grid cell (by its row and column) providing
+# the `QtWidgets.QTableWidgetItem`-like interface used by the main window.
+# Cells referring to the same position compare equal.
+class CwCell:
+
+    __slots__ = ('table', '_row', '_col')
+
+    ## Constructor.
+    # @param table `CwTable` the grid
+    # @param row `int` cell row
+    # @param col `int` cell column
+    def __init__(self, table, row, col):
+        ## `CwTable` the grid
+        self.table = table
+        self._row = row
+        self._col = col
+
+    ## @returns `int` cell row
+    def row(self):
+        return self._row
+
+    ## @returns `int` cell column
+    def column(self):
+        return self._col
+
+    ## @returns `str` cell text (empty for blank cells)
+    def text(self):
+        return self.table.model().data(self.table.model().index(self._row, self._col)) or ''
+
+    ## @returns `QtCore.QModelIndex` the model index of the cell
+    def index(self):
+        return self.table.model().index(self._row, self._col)
+
+    def __eq__(self, other):
+        return isinstance(other, CwCell) and self._row == other._row and self._col == other._col
+
+    def __hash__(self):
+        return hash((self._row, self._col))
+
+    def __repr__(self):
+        return f"CwCell({self._row}, {self._col})"
+
+## @brief Crossword grid class (based on `QtWidgets.QTableView`).
+# The grid shows a CwGridModel painted by CwCellDelegate. 
 # Custom implementation handles key events (like Del, Backspace, etc.),
-# mouse click events and the resize event.
-class CwTable(QtWidgets.QTableWidget):
+# mouse click events and the resize event. Cells are accessed as CwCell objects
+# via a subset of the `QtWidgets.QTableWidget` interface (item(), currentItem(), 
+# selectedItems() etc.).
+class CwTable(QtWidgets.QTableView):
 
     resized = QtCore.pyqtSignal(int, int, int, int)
+    ## cell clicked signal (passes the clicked CwCell)
+    itemClicked = QtCore.pyqtSignal(object)
+    ## current cell changed signal (passes the current and previous CwCell or `None`)
+    currentItemChanged = QtCore.pyqtSignal(object, object)
 
     ## Constructor.
     # @param on_key `callable` callback for key release event
@@ -5892,6 +6380,71 @@ class CwTable(QtWidgets.QTableWidget):
         ## Callback for mouse release event (deselect cells)
         self.on_deselect = on_deselect
         super().__init__(parent)
+        self.setModel(CwGridModel(self))
+        self.setItemDelegate(CwCellDelegate(self))
+        self.clicked.connect(self.on_clicked)
+        self.selectionModel().currentChanged.connect(self.on_current_changed)
+
+    ## Sets (or resets) the crossword grid shown in the table.
+    # @param words `crossword::Wordgrid` | `None` the crossword grid
+    def set_grid(self, words):
+        self.model().set_grid(words)
+
+    ## @returns `CwCell` | `None` the cell of a model index (`None` if the index is invalid)
+    def cell(self, index):
+        return CwCell(self, index.row(), index.column()) if index.isValid() else None
+
+    ## @returns `CwCell` | `None` the cell in a given row and column (`None` if out of range)
+    def item(self, row, col):
+        return self.cell(self.model().index(row, col))
+
+    ## @returns `CwCell` | `None` the current cell
+    def currentItem(self):
+        return self.cell(self.currentIndex())
+
+    ## Makes a given cell current.
+    # @param cell `CwCell` | `None` the cell; `None` to unset the current cell
+    def setCurrentItem(self, cell):
+        self.setCurrentIndex(cell.index() if cell else QtCore.QModelIndex())
+
+    ## Makes the cell in a given row and column current.
+    def setCurrentCell(self, row, col):
+        self.setCurrentIndex(self.model().index(row, col))
+
+    ## @returns `int` row of the current cell (-1 if there's no current cell)
+    def currentRow(self):
+        return self.currentIndex().row()
+
+    ## @returns `int` column of the current cell (-1 if there's no current cell)
+    def currentColumn(self):
+        return self.currentIndex().column()
+
+    ## @returns `list` of `CwCell` the selected cells
+    def selectedItems(self):
+        return [self.cell(index) for index in self.selectedIndexes()]
+
+    ## @returns `CwCell` | `None` the cell at a given point in the viewport
+    def itemAt(self, point):
+        return self.cell(self.indexAt(point))
+
+    ## @returns `int` number of rows in grid
+    def rowCount(self):
+        return self.model().rowCount()
+
+    ## @returns `int` number of columns in grid
+    def columnCount(self):
+        return self.model().columnCount()
+
+    ## Emits CwTable::itemClicked when a cell is clicked.
+    @QtCore.pyqtSlot(QtCore.QModelIndex)
+    def on_clicked(self, index):
+        cell = self.cell(index)
+        if cell: self.itemClicked.emit(cell)
+
+    ## Emits CwTable::currentItemChanged when the current cell changes.
+    @QtCore.pyqtSlot(QtCore.QModelIndex, QtCore.QModelIndex)
+    def on_current_changed(self, current, previous):
+        self.currentItemChanged.emit(self.cell(current), self.cell(previous))
 
     ## Disable keyboard search functionality to enable cell editing by keyboard.
     def keyboardSearch(self, search):
@@ -19,12 +19,13 @@ from utils.pluginmanager import PxPluginManager
 from utils.pluginbase import PxPluginGeneral
 from guisettings import CWSettings
 from dbapi import Sqlitedb
-from forms import (MsgBox, LoadCwDialog, CwTable, ClickableLabel, CrosswordMenu,
+from forms import (MsgBox, LoadCwDialog, CwTable, CwCell, CwRenderCache, ClickableLabel, CrosswordMenu,
                     SettingsDialog, WordSuggestDialog, PrintPreviewDialog,
                     CwInfoDialog, DefLookupDialog, ReflectGridDialog, AboutDialog,
                     ShareDialog, KloudlessAuthDialog)
-from crossword import Word, Crossword, CWError, FILLER, FILLER2, BLANK
-from wordsrc import DBWordsource, TextWordsource, TextfileWordsource, MultiWordsource
+from crossword import Word, Wordgrid, Crossword, CWError, FILLER, FILLER2, BLANK
+from wordsrc import DBWordsource, TextWordsource, TextfileWordsource, MultiWordsource, make_wordsource, make_wordfilter
+from portfolio import generate_portfolio, PORTFOLIO_METHODS, PORTFOLIO_ORDERS
 
 SHOWHELP = _('Show help')
 
@@ -40,15 +41,21 @@ class GenThread(QThreadStump):
     sig_validate = QtCore.pyqtSignal('PyQt_PyObject')
     ## `QtCore.pyqtSignal` On-progress (generation) signal
     sig_progress = QtCore.pyqtSignal('PyQt_PyObject', int, int)
+    ## `QtCore.pyqtSignal` Generation metrics signal
+    sig_metrics = QtCore.pyqtSignal('PyQt_PyObject')
+    ## `QtCore.pyqtSignal` Live preview signal (snapshot of the grid characters)
+    sig_preview = QtCore.pyqtSignal('PyQt_PyObject')
 
     ## Initializes signals binding them to callbacks passed to constructor
     def __init__(self, on_gen_timeout=None, on_gen_stopped=None, on_gen_validate=None, on_gen_progress=None,
-                 on_start=None, on_finish=None, on_run=None, on_error=None):
+                 on_gen_metrics=None, on_gen_preview=None, on_start=None, on_finish=None, on_run=None, on_error=None):
         super().__init__(on_start=on_start, on_finish=on_finish, on_run=on_run, on_error=on_error)
         if on_gen_timeout: self.sig_timeout.connect(on_gen_timeout)
         if on_gen_stopped: self.sig_stopped.connect(on_gen_stopped)
         if on_gen_validate: self.sig_validate.connect(on_gen_validate)
         if on_gen_progress: self.sig_progress.connect(on_gen_progress)
+        if on_gen_metrics: self.sig_metrics.connect(on_gen_metrics)
+        if on_gen_preview: self.sig_preview.connect(on_gen_preview)
 
 # ******************************************************************************** #
 
@@ -85,6 +92,20 @@ class ShareThread(QThreadStump):
 
 # ******************************************************************************** #
 
+## Crossword image export thread class
+class ExportThread(QThreadStump):
+    ## `QtCore.pyqtSignal` On-progress (export) signal: rows done, rows total
+    sig_progress = QtCore.pyqtSignal(int, int)
+
+    ## Initializes signals binding them to callbacks passed to constructor
+    def __init__(self, on_progress=None, on_start=None, on_finish=None, on_run=None, on_error=None):
+        super().__init__(on_start=on_start, on_finish=on_finish, on_run=on_run, on_error=on_error)
+        if on_progress: self.sig_progress.connect(on_progress)
+        ## `dict` | `None` parameters and result of the current export job (see MainWindow::export_cw())
+        self.job = None
+
+# ******************************************************************************** #
+
 ## The application's main GUI window
 class MainWindow(QtWidgets.QMainWindow):
 
@@ -101,7 +122,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.cw_modified = True
         ## `Word` currently selected word in grid
         self.current_word = None
-        ## `QtWidgets.QTableWidgetItem` last pressed cell in cw grid
+        ## `forms::CwCell` last pressed cell in cw grid
         self.last_pressed_item = None
         ## `utils::onlineservices::Share` object
         self.sharer = None
@@ -118,6 +139,7 @@ class MainWindow(QtWidgets.QMainWindow):
         ## `GenThread` cw generation worker thread
         self.gen_thread = GenThread(on_gen_timeout=self.on_gen_timeout, on_gen_stopped=self.on_gen_stop,
                                     on_gen_validate=self.on_gen_validate, on_gen_progress=self.on_gen_progress,
+                                    on_gen_metrics=self.on_gen_metrics, on_gen_preview=self.on_gen_preview,
                                     on_start=self.on_generate_start, on_finish=self.on_generate_finish,
                                     on_run=self.generate_cw_worker, on_error=self.on_gen_error)
         ## `ShareThread` sharer worker thread
@@ -128,8 +150,13 @@ class MainWindow(QtWidgets.QMainWindow):
             on_start=self.on_share_start, on_finish=self.on_share_finish, on_run=self.on_share_run,
             on_error=self.on_share_error)
 
+        ## `ExportThread` image export worker thread
+        self.export_thread = ExportThread(on_progress=self.on_export_progress,
+            on_start=self.on_export_start, on_finish=self.on_export_finish,
+            on_run=self.export_cw_worker, on_error=self.on_export_error)
+
         ## `list` thread list to keep track of all spawned threads
-        self.threads = ['gen_thread', 'share_thread']
+        self.threads = ['gen_thread', 'share_thread', 'export_thread']
         # create window elements
         self.initUI(not kwargs.get('empty', False))
         self.setAcceptDrops(True)
@@ -915,12 +942,9 @@ class MainWindow(QtWidgets.QMainWindow):
                 self.l_cw_scale.setText(f"{int(scale_factor)}%")
 
             cell_sz = int(CWSettings.settings['grid_style']['cell_size'] * scale_factor / 100.)
-
-            for i in range(self.twCw.columnCount()):
-                self.twCw.setColumnWidth(i, cell_sz)
-                for j in range(self.twCw.rowCount()):
-                    if i == 0:
-                        self.twCw.setRowHeight(j, cell_sz)
+            # default section size applies to all sections at once (no per-row/column loop)
+            self.twCw.horizontalHeader().setDefaultSectionSize(cell_sz)
+            self.twCw.verticalHeader().setDefaultSectionSize(cell_sz)
 
         if not save_history:
             do_(None)
@@ -952,6 +976,7 @@ class MainWindow(QtWidgets.QMainWindow):
         gen_interrupted = self.gen_thread.isInterruptionRequested() if getattr(self, 'gen_thread', None) else False
         share_running = self.share_thread.isRunning() if getattr(self, 'share_thread', None) else False
         share_interrupted = self.share_thread.isInterruptionRequested() if getattr(self, 'share_thread', None) else False
+        export_running = self.export_thread.isRunning() if getattr(self, 'export_thread', None) else False
         self.act_new.setEnabled(not gen_running and not share_running)
         self.act_open.setEnabled(not gen_running and not share_running)
         self.act_save.setEnabled(b_cw and not gen_running and (self.cw_modified or not self.cw_file))
@@ -968,8 +993,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.act_delrow.setEnabled(b_cw and not gen_running and not share_running and self.act_edit.isChecked() and self.twCw.currentRow() >= 0)
         self.act_reflect.setEnabled(b_cw and not gen_running and not share_running and self.act_edit.isChecked())
         self.act_gen.setEnabled(b_cw and not gen_running and not share_running and bool(self.wordsrc))
-        if not gen_running and not share_running: self.act_stop.setChecked(False)
-        self.act_stop.setVisible(b_cw and (gen_running and not gen_interrupted) or (share_running and not share_interrupted))
+        if not gen_running and not share_running and not export_running: self.act_stop.setChecked(False)
+        self.act_stop.setVisible(b_cw and (gen_running and not gen_interrupted) or (share_running and not share_interrupted) or export_running)
         self.act_clear.setEnabled(b_cw and not gen_running and not share_running)
         self.act_clear_wd.setEnabled(b_cw and not gen_running and not share_running)
         self.act_erase_wd.setEnabled(b_cw and not gen_running and not share_running)
@@ -997,26 +1022,13 @@ class MainWindow(QtWidgets.QMainWindow):
         # MultiWordsource.order is by default 'prefer-last', so just append sources
         for src in CWSettings.settings['wordsrc']['sources']:
             if not src['active']: continue
-            if src['type'] == 'db':
-                if src['dbtype'].lower() == 'sqlite':
-                    db = Sqlitedb()
-                    if not db.setpath(src['file'], fullpath=(not src['file'].lower() in LANG), recreate=False, connect=True):
-                        self._log(_("DB path {} unavailable!").format(src['file']))
-                        continue
-                    self.wordsrc.add(DBWordsource(src['dbtables'], db, shuffle=src['shuffle']))
-
-            elif src['type'] == 'file':
-                self.wordsrc.add(TextfileWordsource(src['file'], enc=src['encoding'], delimiter=src['delim'], shuffle=src['shuffle']))
-
-            elif src['type'] == 'list' and src['words']:
-                words = []
-                if src['haspos']:
-                    for w in src['words']:
-                        w = w.split(src['delim'])
-                        words.append((w[0], tuple(w[1:]) if len(w) > 1 else None))
-                else:
-                    words = src['words']
-                self.wordsrc.add(TextWordsource(words, shuffle=src['shuffle']))
+            wsrc = make_wordsource(src)
+            if not wsrc is None:
+                self.wordsrc.add(wsrc)
+                if isinstance(wsrc, DBWordsource) and not wsrc.indexed:
+                    self._log(_("DB {} has no word lookup indexes: optimize it in the word source settings for faster generation").format(src['file']))
+            elif src['type'] == 'db' and src['dbtype'].lower() == 'sqlite':
+                self._log(_("DB path {} unavailable!").format(src['file']))
 
     ## Updates cw data and view.
     # @param rescale `bool` whether rescaling the grid is required
@@ -1080,7 +1092,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self.cw = None
 
     ## Checks if a given cw grid cell is found in a given Word instance.
-    def _item_in_word(self, cell_item: QtWidgets.QTableWidgetItem, word: Word):
+    def _item_in_word(self, cell_item: CwCell, word: Word):
         return word.does_cross((cell_item.column(), cell_item.row()))
 
     ## Loads the crossword (MainWindow::cw) from a given file.
@@ -1151,9 +1163,7 @@ class MainWindow(QtWidgets.QMainWindow):
             self.last_pressed_item = None
             self.current_word = None
             self.cw_modified = False
-            self.twCw.clear()
-            self.twCw.setRowCount(0)
-            self.twCw.setColumnCount(0)
+            self.twCw.set_grid(None)
             self.update_clues_model()
             self.update_actions()
 
@@ -1362,48 +1372,25 @@ class MainWindow(QtWidgets.QMainWindow):
         except:
             return
 
-    ## Updates the internal formatting (colors, fonts) in the crossword grid for a given cell.
-    # @param cell_item `QtWidgets.QTableWidgetItem` the cell that must be formatted
-    @pluggable('general')
-    def set_cell_formatting(self, cell_item: QtWidgets.QTableWidgetItem):
-
-        def format_cell(cell_item, dic_format):
-            cell_item.setBackground(QtGui.QBrush(QtGui.QColor.fromRgba(dic_format['bg_color']), dic_format['bg_pattern']))
-            cell_item.setForeground(QtGui.QBrush(QtGui.QColor.fromRgba(dic_format['fg_color']), dic_format['fg_pattern']))
-            if self.act_edit.isChecked():
-                cell_item.setFlags(QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsEnabled)
-            else:
-                cell_item.setFlags(QtCore.Qt.ItemFlags(dic_format['flags']))
-            font = make_font(dic_format['font_name'], dic_format['font_size'] * (CWSettings.settings['grid_style']['scale'] / 100.), dic_format['font_weight'], dic_format['font_italic'])
-            cell_item.setFont(font)
-            cell_item.setTextAlignment(QtCore.Qt.Alignment(dic_format['align']))
-
-        if self.current_word and self._item_in_word(cell_item, self.current_word):
-            # hilite
-            format_cell(cell_item, CWSettings.settings['cell_format']['HILITE'])
-        else:
-            ch = cell_item.text()
-            k = 'NORMAL'
-            if ch == '' or ch == BLANK:
-                k = 'BLANK'
-            elif ch == FILLER:
-                k = 'FILLER'
-            elif ch == FILLER2:
-                k = 'FILLER2'
-            format_cell(cell_item, CWSettings.settings['cell_format'][k])
-
-    ## Updates the internal formatting (colors, fonts) of the crossword grid.
+    ## @brief Updates the internal formatting (colors, fonts) of the crossword grid.
+    # The cell styles are made once by the grid delegate (forms::CwCellDelegate)
+    # and the grid is repainted (only the visible cells are actually painted).
     @pluggable('general')
     def reformat_cells(self):
-        rows = self.twCw.rowCount()
-        cols = self.twCw.columnCount()
-        for r in range(rows):
-            for c in range(cols):
-                cell_item = self.twCw.item(r, c)
-                if cell_item:
-                    self.set_cell_formatting(cell_item)
+        model = self.twCw.model()
+        model.hilite = self.current_word
+        model.edit_mode = self.act_edit.isChecked()
+        self.twCw.itemDelegate().update_styles()
+        model.update_cells()
         self.twCw.show()
 
+    ## Updates the highlighted cells in the crossword grid after MainWindow::current_word has changed.
+    # Unlike MainWindow::reformat_cells() only the cells of the previous and the new
+    # current word are repainted.
+    @pluggable('general')
+    def update_hilite(self):
+        self.twCw.model().set_hilite(self.current_word)
+
     ## @brief Updates (fills) the crossword grid from the internal crossword::Crossword object (self.cw).
     # This function resizes, fills the grid, updates the cell formatting and updates (fills)
     # the clues table.
@@ -1419,17 +1406,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.current_word = None
         curr_cell = (self.twCw.currentRow(), self.twCw.currentColumn())
         old_gridsize = (self.twCw.rowCount(), self.twCw.columnCount())
-        self.twCw.clear()
-        self.twCw.setRowCount(self.cw.words.height)
-        self.twCw.setColumnCount(self.cw.words.width)
         self.cw.reset_used()
-        for row in range(self.cw.words.height):
-            for col in range(self.cw.words.width):
-                coord = (col, row)
-                words = self.cw.words.find_by_coord(coord)
-                w = words['h'] or words['v']
-                ch = self.cw.words.get_char(coord)
-                self.twCw.setItem(row, col, self.make_cell_item('' if ch == BLANK else ch, w.num if w else ''))
+        self.twCw.set_grid(self.cw.words)
         self.update_current_word()
         self.reformat_cells()
         self.update_clues_model()
@@ -1440,33 +1418,6 @@ class MainWindow(QtWidgets.QMainWindow):
         self.cw_modified = True
         self.update_actions()
 
-    ## Creates a crossword cell item (`QtWidgets.QTableWidgetItem`) with given text and number.
-    # @param text `str` the cell text (1 character)
-    # @param icon_text `str` the text of the number caption (default = empty)
-    # @returns `QtWidgets.QTableWidgetItem` cell object that can be inserted into MainWindow::twCw
-    @pluggable('general')
-    def make_cell_item(self, text, icon_text=''):
-        text = text.lower() if CWSettings.settings['grid_style']['char_case'] == 'lower' else text.upper()
-        if not icon_text or not CWSettings.settings['grid_style']['numbers']['show']:
-            return QtWidgets.QTableWidgetItem(text)
-        pixmap = QtGui.QPixmap(15, 15)
-        pixmap.fill(QtGui.QColor(QtCore.Qt.transparent))
-        icon = QtGui.QIcon()
-        painter = QtGui.QPainter()
-        if painter.begin(pixmap):
-            painter.setBackgroundMode(QtCore.Qt.TransparentMode)
-            #painter.setCompositionMode(QtGui.QPainter.CompositionMode_Clear)
-            font = make_font(CWSettings.settings['grid_style']['numbers']['font_name'],
-                             CWSettings.settings['grid_style']['numbers']['font_size'],
-                             CWSettings.settings['grid_style']['numbers']['font_weight'],
-                             CWSettings.settings['grid_style']['numbers']['font_italic'])
-            painter.setFont(font)
-            painter.setPen(QtGui.QPen(QtGui.QColor.fromRgba(CWSettings.settings['grid_style']['numbers']['color'])))
-            painter.drawStaticText(0, 0, QtGui.QStaticText(str(icon_text)))
-            painter.end()
-            icon = QtGui.QIcon(pixmap)
-        return QtWidgets.QTableWidgetItem(icon, text)
-
     ## Updates the core settings of MainWindow::cw (internal crossword::Crossword instance) from CWSettings::settings.
     @pluggable('general')
     def update_cw_params(self):
@@ -1476,12 +1427,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.cw.pos = CWSettings.settings['cw_settings']['pos']
         self.cw.setlog(CWSettings.settings['cw_settings']['log'])
         # excluded filter
-        self.cw.wordfilter = None
-        if CWSettings.settings['wordsrc']['excluded']['words']:
-            if CWSettings.settings['wordsrc']['excluded']['regex']:
-                self.cw.wordfilter = lambda w: not any(re.fullmatch(pattern, w, re.I) for pattern in CWSettings.settings['wordsrc']['excluded']['words'])
-            else:
-                self.cw.wordfilter = lambda w: not any(w.lower() == pattern.lower() for pattern in CWSettings.settings['wordsrc']['excluded']['words'])
+        self.cw.wordfilter = make_wordfilter(CWSettings.settings['wordsrc']['excluded']['words'],
+                                             CWSettings.settings['wordsrc']['excluded']['regex'])
 
     ## Helper method that returns the localized column names for the Clues panel.
     def _localize_colname(self, name):
@@ -1915,7 +1862,11 @@ class MainWindow(QtWidgets.QMainWindow):
     def on_generate_start(self):
         self.cw.words.update_word_strings()
         self.saved_cw = copy.deepcopy(self.cw.words.words)
+        # the grid is changed by the generation thread: show its snapshot until the generation
+        # is finished (the live preview replaces the snapshot, see on_gen_preview())
+        self.twCw.model().set_preview(list(self.cw.words.chars))
 
+        self.statusbar.clearMessage()
         self.statusbar_pbar.reset()
         self.statusbar_pbar.setFormat('%p%')
         self.statusbar_pbar.show()
@@ -1925,6 +1876,7 @@ class MainWindow(QtWidgets.QMainWindow):
     @pluggable('general')
     @QtCore.pyqtSlot()
     def on_generate_finish(self):
+        self.twCw.model().set_preview(None)
         self.statusbar_pbar.hide()
         self.statusbar_pbar.reset()
         self.cw.words.update_word_strings()
@@ -1979,33 +1931,77 @@ class MainWindow(QtWidgets.QMainWindow):
     @pluggable('general')
     @QtCore.pyqtSlot('PyQt_PyObject', int, int)
     def on_gen_progress(self, cw_, complete_, total_):
-        perc = complete_ * 100.0 / total_
+        perc = int(complete_ * 100 / total_) if total_ else 0
         self.statusbar_pbar.setValue(perc)
         self.statusbar_pbar.setFormat(f"%v% - {complete_} / {total_}")
 
+    ## Slot fires when the cw generator has completed and reports the generation metrics.
+    # Shows the metrics summary in the status bar.
+    # @param metrics_ `crossword::GenMetrics` the generation metrics
+    @pluggable('general')
+    @QtCore.pyqtSlot('PyQt_PyObject')
+    def on_gen_metrics(self, metrics_):
+        self.statusbar.showMessage(str(metrics_))
+
+    ## Slot fires to show the live preview of the generated grid (see GenThread::sig_preview).
+    # @param chars_ `list` | `str` snapshot of the grid characters (crossword::Wordgrid::chars)
+    @pluggable('general')
+    @QtCore.pyqtSlot('PyQt_PyObject')
+    def on_gen_preview(self, chars_):
+        self.twCw.model().set_preview(chars_)
+
     ## Main worker function for the cw generation thread (MainWindow::gen_thread).
-    # Generates (fills) the current crossword (MainWindow::cw)
+    # Generates (fills) the current crossword (MainWindow::cw). If more than one
+    # parallel attempt is set in the settings, or generation in a separate process is on,
+    # the attempts are run in child processes (see portfolio::generate_portfolio()):
+    # the word sources are re-created there from their settings and the Stop action
+    # terminates the processes.
     @pluggable('general')
     def generate_cw_worker(self):
         method = ''
         timeout = 0.0
+        workers = 1
         self.gen_thread.lock()
         try:
             self.update_wordsrc()
             self.update_cw_params()
             method = CWSettings.settings['cw_settings']['method']
             timeout = CWSettings.settings['cw_settings']['timeout']
+            workers = CWSettings.settings['cw_settings']['workers']
+            progress_rate = CWSettings.settings['cw_settings']['progress_rate']
+            live_preview = CWSettings.settings['cw_settings']['live_preview']
+            separate_process = CWSettings.settings['cw_settings']['separate_process']
+            sources = [copy.deepcopy(src) for src in CWSettings.settings['wordsrc']['sources'] if src['active']]
+            excluded = copy.deepcopy(CWSettings.settings['wordsrc']['excluded'])
         finally:
             self.gen_thread.unlock()
 
-        self.cw.generate(method=method,
-                        timeout=timeout,
-                        stopcheck=self.act_stop.isChecked,
-                        ontimeout=lambda timeout_: self.gen_thread.sig_timeout.emit(timeout_),
-                        onstop=lambda: self.gen_thread.sig_stopped.emit(),
-                        onerror=lambda err_: self.gen_thread.sig_error.emit(self.gen_thread, str(err_)),
-                        onvalidate=lambda bad_: self.gen_thread.sig_validate.emit(bad_),
-                        on_progress=lambda cw_, complete_, total_: self.gen_thread.sig_progress.emit(cw_, complete_, total_))
+        # progress reports are throttled by the generator, so the preview snapshots
+        # (copies of the grid characters) are made at most progress_rate times per second
+        def on_progress(cw_, complete_, total_):
+            self.gen_thread.sig_progress.emit(cw_, complete_, total_)
+            if live_preview: self.gen_thread.sig_preview.emit(list(cw_.words.chars))
+
+        callbacks = dict(stopcheck=self.act_stop.isChecked,
+                         ontimeout=lambda timeout_: self.gen_thread.sig_timeout.emit(timeout_),
+                         onstop=lambda: self.gen_thread.sig_stopped.emit(),
+                         onerror=lambda err_: self.gen_thread.sig_error.emit(self.gen_thread, str(err_)),
+                         onvalidate=lambda bad_: self.gen_thread.sig_validate.emit(bad_),
+                         on_progress=on_progress,
+                         on_metrics=lambda metrics_: self.gen_thread.sig_metrics.emit(metrics_),
+                         progress_interval=(1.0 / progress_rate) if progress_rate else None)
+
+        if workers > 1 or separate_process:
+            # a single attempt uses the same method and slot order as the in-process generation
+            generate_portfolio(self.cw, sources, workers=workers, 
+                               methods=[method] if (method or workers == 1) else PORTFOLIO_METHODS,
+                               orders=[self.cw.slot_order] if workers == 1 else PORTFOLIO_ORDERS,
+                               timeout=timeout, max_fetch=CWSettings.settings['wordsrc']['maxres'],
+                               excluded=excluded,
+                               on_preview=(lambda cw_, chars_: self.gen_thread.sig_preview.emit(chars_)) if live_preview else None,
+                               **callbacks)
+        else:
+            self.cw.generate(method=method, timeout=timeout, **callbacks)
 
     ## Util function to save or export current crossword to a given file and file type.
     # @param filepath `str` the full path to the file where the cw must be saved.
@@ -2014,7 +2010,9 @@ class MainWindow(QtWidgets.QMainWindow):
     # If not set (`None`), the app will attempt to infer it from the filepath extension.
     # Otherwise, it can be a string representing the file filter - see _get_filetype() - CWSAVE_FILTERS,
     # or an integer representing the index of the filter in _get_filetype() - CWSAVE_FILTERS
-    def _save_cw(self, filepath=None, file_type=None):
+    # @param background `bool` whether raster images are exported in the background
+    # (see MainWindow::export_cw()); the file may not yet exist when this method returns
+    def _save_cw(self, filepath=None, file_type=None, background=False):
         def _guess_filetype(filepath):
             if not filepath: return -1
             ext = os.path.splitext(filepath)[1][1:].lower()
@@ -2064,7 +2062,9 @@ class MainWindow(QtWidgets.QMainWindow):
 
             elif file_type in (3, 4, 5, 6, 7):
                 # image (svg, jpg, bmp, tif, tiff, png)
-                self.export_cw(filepath)
+                if not self.export_cw(filepath, background=background): return None
+                # raster images exported in the background are checked by on_export_finish()
+                if background and file_type != 7: return (filepath, file_type)
 
             else:
                 # just grid
@@ -2084,11 +2084,12 @@ class MainWindow(QtWidgets.QMainWindow):
     # @see Description in _save_cw()
     @pluggable('general')
     def save_cw(self, filepath=None, file_type=None):
-        res = self._save_cw(filepath, file_type)
+        res = self._save_cw(filepath, file_type, True)
         if not res: return False
         if filepath is None:
             filepath = self.cw_file
-        if res[1] in (3, 4, 5, 6, 7) and CWSettings.settings['export']['openfile']:
+        # raster images exported in the background are opened by on_export_finish()
+        if res[1] == 7 and CWSettings.settings['export']['openfile']:
             run_exe(filepath if getosname() == 'Windows' else f'xdg-open "{filepath}"', True, False, shell=True)
 
         self.cw_file = os.path.abspath(res[0])
@@ -2097,21 +2098,28 @@ class MainWindow(QtWidgets.QMainWindow):
         return True
 
     ## @brief Exports crossword grid to image file.
-    # The following formats are supported: JPG, PNG, TIFF, BMP (raster), SVG (vector)
+    # The following formats are supported: JPG, PNG, TIFF, BMP (raster), SVG (vector).
+    # Raster images are painted in strips by forms::CwRenderCache::export_image(), which streams
+    # PNG and BMP images to file strip by strip. If `background` is `True`, this is done
+    # in the export thread (MainWindow::export_thread) on a snapshot of the grid, showing
+    # the progress in the status bar; the export can be cancelled with MainWindow::act_stop.
     # @param filepath `str` the destination file path
     # @param scale `float` output image scale factor
+    # @param background `bool` whether to export raster images in the background
+    # @returns `bool` `True` if the image has been exported (or the export has started),
+    # `False` if another export is still running
     @pluggable('general')
-    def export_cw(self, filepath, scale=1.0):
+    def export_cw(self, filepath, scale=1.0, background=False):
         # settings
         export_settings = CWSettings.settings['export']
 
         # deselect words
         self.twCw.clearSelection()
         self.current_word = None
-        self.reformat_cells()
+        self.update_hilite()
 
         scale_factor = export_settings['img_resolution'] / 25.4 * export_settings['mm_per_cell']
-        cw_size = QtCore.QSize(self.twCw.columnCount() * scale_factor, self.twCw.rowCount() * scale_factor)
+        cw_size = QtCore.QSize(int(self.cw.words.width * scale_factor), int(self.cw.words.height * scale_factor))
 
         ext = os.path.splitext(filepath)[1][1:].lower()
         if ext == 'svg':
@@ -2130,12 +2138,78 @@ class MainWindow(QtWidgets.QMainWindow):
 
         elif ext in ('jpg', 'jpeg', 'png', 'tif', 'tiff', 'bmp'):
             # image
-            img = QtGui.QImage(cw_size, QtGui.QImage.Format_ARGB32)
-            painter = QtGui.QPainter()
-            if painter.begin(img):
-                self._paint_cwgrid(painter, QtCore.QRectF(img.rect()), export_settings['clear_cw'])
-                painter.end()
-                img.save(filepath, quality=export_settings['img_output_quality'])
+            if not background:
+                CwRenderCache.export_image(self.cw.words, filepath, cw_size, export_settings['clear_cw'],
+                                           export_settings['img_resolution'], export_settings['img_output_quality'])
+                return True
+            if self.export_thread.isRunning():
+                MsgBox(_('Please wait until the current image export finishes.'), self, _('Export'), 'warn')
+                return False
+            # the grid may be edited while the image is being exported, so export a copy
+            self.export_thread.job = {'words': Wordgrid(self.cw.words.tostr()), 'filepath': filepath, 'size': cw_size,
+                                      'clear_cw': export_settings['clear_cw'], 'dpi': export_settings['img_resolution'],
+                                      'quality': export_settings['img_output_quality'],
+                                      'openfile': export_settings['openfile'], 'done': False, 'error': None}
+            self.export_thread.start()
+
+        return True
+
+    ## Main worker function for the image export thread (MainWindow::export_thread).
+    # Exports the grid snapshot from ExportThread::job to file.
+    @pluggable('general')
+    def export_cw_worker(self):
+        job = self.export_thread.job
+        job['done'] = CwRenderCache.export_image(job['words'], job['filepath'], job['size'], job['clear_cw'],
+                                                 job['dpi'], job['quality'],
+                                                 on_progress=lambda done_, total_: self.export_thread.sig_progress.emit(done_, total_),
+                                                 stopcheck=lambda: self.act_stop.isChecked() or self.export_thread.isInterruptionRequested())
+
+    ## Slot fires when the image export thread (MainWindow::export_thread) starts up.
+    @pluggable('general')
+    @QtCore.pyqtSlot()
+    def on_export_start(self):
+        self.statusbar.showMessage(_("Exporting to '{}'...").format(self.export_thread.job['filepath']))
+        self.statusbar_pbar.reset()
+        self.statusbar_pbar.setFormat('%p%')
+        self.statusbar_pbar.show()
+        self.update_actions()
+
+    ## Slot fires when the image export thread (MainWindow::export_thread) has completed or has been cancelled.
+    # Opens the exported image if set in the settings.
+    @pluggable('general')
+    @QtCore.pyqtSlot()
+    def on_export_finish(self):
+        self.statusbar_pbar.hide()
+        self.statusbar_pbar.reset()
+        job = self.export_thread.job
+        if job and job['done'] and os.path.isfile(job['filepath']):
+            self.statusbar.showMessage(_("Exported to '{}'").format(job['filepath']))
+            if job['openfile']:
+                run_exe(job['filepath'] if getosname() == 'Windows' else f'xdg-open "{job["filepath"]}"', True, False, shell=True)
+        elif job and job['error']:
+            self.statusbar.showMessage(_('Export failed'))
+        else:
+            self.statusbar.showMessage(_('Export cancelled'))
+        self.export_thread.job = None
+        self.update_actions()
+
+    ## Slot fires when the image export thread (MainWindow::export_thread) has encountered an error.
+    # The error is recorded in ExportThread::job for on_export_finish(), which fires next.
+    # @param thread `QtCore.QThread` the export thread object (ExportThread)
+    # @param err `str` the error message
+    @pluggable('general')
+    @QtCore.pyqtSlot(QtCore.QThread, str)
+    def on_export_error(self, thread, err):
+        if self.export_thread.job: self.export_thread.job['error'] = err
+        MsgBox(_("Export failed with error:{}{}").format(NEWLINE, err), self, _('Error'), 'error')
+
+    ## Slot fires to show progress of the image export thread (MainWindow::export_thread).
+    # @param done_ `int` number of image rows painted
+    # @param total_ `int` image height
+    @pluggable('general')
+    @QtCore.pyqtSlot(int, int)
+    def on_export_progress(self, done_, total_):
+        self.statusbar_pbar.setValue(int(done_ * 100 / total_))
 
     ## Prints current crossword (and optionally clues) to file or printer.
     # @param pdf_file `str` | `None` path to PDF file or `None` to print to a physical printer
@@ -2147,7 +2221,7 @@ class MainWindow(QtWidgets.QMainWindow):
         # deselect words
         self.twCw.clearSelection()
         self.current_word = None
-        self.reformat_cells()
+        self.update_hilite()
 
         printer = QtPrintSupport.QPrinter(QtPrintSupport.QPrinter.HighResolution)
         printer.setOutputFormat(QtPrintSupport.QPrinter.PdfFormat if pdf_file else QtPrintSupport.QPrinter.NativeFormat)
@@ -2419,92 +2493,7 @@ class MainWindow(QtWidgets.QMainWindow):
     # (words will be restored after the painting has finished)
     def _paint_cwgrid(self, painter, cliprect=None, clear_cw=True):
 
-        # if cliprect is not set, use the entire painter's viewport
-        if not cliprect: cliprect = painter.viewport()
-
-        # shortcuts for number and gridline settings
-        num_settings = CWSettings.settings['grid_style']['numbers']
-        gridline_width = CWSettings.settings['grid_style']['line_width']
-        # number of rows and columns
-        cols = self.twCw.columnCount()
-        rows = self.twCw.rowCount()
-        # calculate cell size
-        cell_w = int((cliprect.width() + gridline_width) / cols + 2 * gridline_width)
-        cell_h = int((cliprect.height() + gridline_width) / rows + 2 * gridline_width)
-        cell_sz = min(cell_w, cell_h)
-        # vertical offset (start = cliprect top position)
-        v_offset = cliprect.top()
-
-        # for each row...
-        for r in range(rows):
-            # horizontal offset (start = cliprect left position)
-            h_offset = cliprect.left()
-            # for each column...
-            for c in range(cols):
-                # cell coordinate tuple (col, row)
-                coord = (c, r)
-                # get cell character from underlying cw grid
-                ch = self.cw.words.get_char(coord)
-
-                # get words starting with that coordinate
-                words = self.cw.words.find_by_coord(coord)
-                # use either the Across or the Down word (whichever is found)
-                w = words['h'] or words['v']
-                # cell format settings -- for a normal cell...
-                dic_format = CWSettings.settings['cell_format']['NORMAL']
-                if ch == FILLER:
-                    # ...for a blocked (FILLER) cell...
-                    dic_format = CWSettings.settings['cell_format']['FILLER']
-                elif ch == FILLER2:
-                    # ...for a surrounding (FILLER2) cell...
-                    dic_format = CWSettings.settings['cell_format']['FILLER2'].copy()
-                    dic_format.update({'bg_pattern': QtCore.Qt.NoBrush})
-                elif ch == BLANK:
-                    # ...for a blank cell...
-                    dic_format = CWSettings.settings['cell_format']['BLANK']
-
-                # pick corresponding brush, pen and font for cell
-                brush_cell = QtGui.QBrush(QtGui.QColor.fromRgba(dic_format['bg_color']), dic_format['bg_pattern'])
-                brush_cell_border = QtGui.QBrush(QtGui.QColor.fromRgba(CWSettings.settings['grid_style']['line_color']))
-                if ch != FILLER2:
-                    pen_cell = QtGui.QPen(brush_cell_border, gridline_width,
-                                      CWSettings.settings['grid_style']['line'])
-                else:
-                    pen_cell = QtGui.QPen(QtCore.Qt.NoPen)
-                font_cell = make_font(dic_format['font_name'], dic_format['font_size'],
-                                      dic_format['font_weight'], dic_format['font_italic'])
-                pen_cell_font = QtGui.QPen(QtGui.QColor.fromRgba(dic_format['fg_color']))
-
-                # draw cell rect (accounting for border width)
-                cell_rect = QtCore.QRectF(h_offset + gridline_width, v_offset + gridline_width,
-                                          cell_sz - 2 * gridline_width, cell_sz - 2 * gridline_width)
-                painter.setPen(pen_cell)
-                painter.setBrush(brush_cell)
-                painter.drawRect(cell_rect)
-
-                # draw word number (if configured to show in settings)
-                if num_settings['show'] and not w is None:
-                    pen_num_font = QtGui.QPen(QtGui.QColor.fromRgba(num_settings['color']))
-                    font_num = make_font(num_settings['font_name'], num_settings['font_size'],
-                                         num_settings['font_weight'], num_settings['font_italic'])
-                    painter.setPen(pen_num_font)
-                    painter.setFont(font_num)
-                    # draw in top-left quarter of the cell
-                    painter.drawText(cell_rect.x(), cell_rect.y(), cell_rect.width() // 2, cell_rect.height() // 2,
-                                    QtCore.Qt.AlignCenter, str(w.num))
-
-                # draw text (letter) if that's a normal cell (not blank or filler)
-                if not clear_cw and ch != BLANK and ch != FILLER and ch != FILLER2:
-                    ch = ch.upper() if CWSettings.settings['grid_style']['char_case'] == 'upper' else ch.lower()
-                    painter.setPen(pen_cell_font)
-                    painter.setFont(font_cell)
-                    painter.drawText(cell_rect.toRect(), dic_format['align'], ch)
-
-                # increment h_offset (next column)
-                h_offset += cell_sz - 2 * gridline_width
-
-            # increment v_offset (next row)
-            v_offset += cell_sz - 2 * gridline_width
+        CwRenderCache.paint_grid(painter, self.cw.words, cliprect, clear_cw)
 
     ## Updates the required GUI settings in the settings file before the application quits
     # (to restore them upon next startup).
@@ -2848,7 +2837,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
     ## @brief Changes the cw grid using a key and modifiers as pressed on the keyboard.
     # This helper method is internally called by MainWindow::on_cw_key().
-    # @param cell_item `QtWidgets.QTableWidgetItem` the currently selected grid cell
+    # @param cell_item `forms::CwCell` the currently selected grid cell
     # @param key `int` the pressed key
     # @param text `str` translated character string (single character)
     # @param modifiers `flags` set of keyboard modifiers (Ctrl, Shift, Alt)
@@ -2887,7 +2876,7 @@ class MainWindow(QtWidgets.QMainWindow):
                         self.update_cw_grid()
                     return
                 else:
-                    cell_item.setText('')
+                    self.twCw.model().update_cells([coord])
                     if fix_changes:
                         self.cw.reset_used()
                         self.update_clue_replies(coord)
@@ -2909,12 +2898,12 @@ class MainWindow(QtWidgets.QMainWindow):
                 if next_item and not next_item.text() in (FILLER, FILLER2):
                     self.twCw.setCurrentItem(next_item)
                 else:
-                    self.reformat_cells()
+                    self.update_hilite()
 
         elif key == QtCore.Qt.Key_Space and fix_changes and not multiselect:
             # flip current word
             self.update_current_word('flip')
-            self.reformat_cells()
+            self.update_hilite()
 
         else:
 
@@ -2944,7 +2933,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 return
             else:
                 txt = txt.lower() if CWSettings.settings['grid_style']['char_case'] == 'lower' else txt.upper()
-                cell_item.setText('' if txt == BLANK else txt)
+                self.twCw.model().update_cells([coord])
                 if fix_changes:
                     if is_filler:
                         self.cw.words.reset()
@@ -2959,7 +2948,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 if next_item and not next_item.text() in (FILLER, FILLER2):
                     self.twCw.setCurrentItem(next_item)
                 else:
-                    self.reformat_cells()
+                    self.update_hilite()
 
     # ----- SLOTS ----- #
 
@@ -3018,7 +3007,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.twCw.selectionModel().clear()
         self.current_word = None
         self.last_pressed_item = None
-        self.reformat_cells()
+        self.update_hilite()
         self.update_actions()
 
     ## Fires when the application is about to update.
@@ -3483,6 +3472,7 @@ class MainWindow(QtWidgets.QMainWindow):
         if not hasattr(self, 'gen_thread') or self.gen_thread is None:
             self.gen_thread = GenThread(on_gen_timeout=self.on_gen_timeout, on_gen_stopped=self.on_gen_stop,
                                     on_gen_validate=self.on_gen_validate, on_gen_progress=self.on_gen_progress,
+                                    on_gen_metrics=self.on_gen_metrics, on_gen_preview=self.on_gen_preview,
                                     on_start=self.on_generate_start, on_finish=self.on_generate_finish,
                                     on_run=self.generate_cw_worker, on_error=self.on_gen_error)
         self.gen_thread.start()
@@ -3524,8 +3514,9 @@ class MainWindow(QtWidgets.QMainWindow):
                 if not item.text() in (FILLER, FILLER2):
                     self.twCw.setCurrentItem(item)
                     break
-            self.reformat_cells()
-            self.update_actions()
+        # cell flags depend on the edit mode
+        self.reformat_cells()
+        self.update_actions()
 
     ## @brief Slot for MainWindow::act_view_showtoolbar: shows or hides the main toolbar.
     @pluggable('general')
@@ -3931,30 +3922,30 @@ class MainWindow(QtWidgets.QMainWindow):
         self.scale_cw(value)
 
     ## @brief Fires when a new cw grid cell is focused.
-    # @param current `QtWidgets.QTableWidgetItem` the currently focused cell
-    # @param previous `QtWidgets.QTableWidgetItem` the previously focused cell
+    # @param current `forms::CwCell` the currently focused cell
+    # @param previous `forms::CwCell` the previously focused cell
     @pluggable('general')
-    @QtCore.pyqtSlot(QtWidgets.QTableWidgetItem, QtWidgets.QTableWidgetItem)
+    @QtCore.pyqtSlot(object, object)
     def on_cw_current_item_changed(self, current, previous):
         if self.act_edit.isChecked():
             self.last_pressed_item = current
             self.update_actions()
             return
         self.update_current_word('flip' if self.last_pressed_item==current else 'current')
-        self.reformat_cells()
+        self.update_hilite()
         self.last_pressed_item = current
 
     ## @brief Fires when a cw grid cell is clicked (pressed).
-    # @param item `QtWidgets.QTableWidgetItem` the pressed cell
+    # @param item `forms::CwCell` the pressed cell
     @pluggable('general')
-    @QtCore.pyqtSlot(QtWidgets.QTableWidgetItem)
+    @QtCore.pyqtSlot(object)
     def on_cw_item_clicked(self, item):
         if self.act_edit.isChecked():
             self.update_actions()
             return
         if self.twCw.currentItem() == item:
             self.update_current_word('flip' if self.last_pressed_item==item else 'current')
-            self.reformat_cells()
+            self.update_hilite()
             self.last_pressed_item = item
 
     ## @brief Fires when the custom context meny is requested on the crossword grid.
@@ -26,7 +26,8 @@ class CWSettings:
                             'act_suggest', 'act_lookup', 'act_editclue', 'SEP', 'act_wsrc', 'act_info',
                             'act_stats', 'act_print', 'SEP', 'act_config', 'act_update', 'act_help', 'act_whatsthis']
         },
-    'cw_settings': {'timeout': 60.0, 'method': 'recurse', 'pos': 'N', 'log': None},
+    'cw_settings': {'timeout': 60.0, 'method': 'recurse', 'pos': 'N', 'log': None, 'workers': 1,
+                    'progress_rate': 20, 'live_preview': False, 'separate_process': False},
     'grid_style': {'scale': 100, 'show': True, 'line': QtCore.Qt.SolidLine, 'header': False,
                   'cell_size': 50.0, 'line_color': QtGui.QColor(QtCore.Qt.gray).rgba(),
                   'line_width': 1,
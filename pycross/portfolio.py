@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+# Copyright: (c) 2020, Iskander Shafikov <s00mbre@gmail.com>
+# GNU General Public License v3.0+ (see LICENSE.txt or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+## @package pycross.portfolio
+# @brief Parallel multi-start (portfolio) crossword generation -- see generate_portfolio().
+#
+# Backtracking time depends heavily on the order in which words and suggestions are tried:
+# the same grid may be filled in a couple of seconds or not at all within the timeout.
+# The portfolio runs several independent generation attempts on the same grid in separate
+# processes, each with its own random seed, generation method and word (slot) order.
+# The first successful attempt wins and the others are cancelled.
+#
+# The module doesn't use Qt, so it can be used both by the GUI (see
+# `pycross::gui::MainWindow::generate_cw_worker()`) and by the console tools
+# (see pycross::cwbatch).
+import timeit, traceback, queue
+import multiprocessing as mp
+import numpy as np
+from utils.globalvars import *
+
+# the core modules use the gettext '_()' function: install it if not installed yet
+# (e.g. in worker processes)
+switch_lang('')
+
+from crossword import Crossword, CWError, GenMetrics
+from wordsrc import MultiWordsource, make_wordsource, make_wordfilter
+
+## `tuple` generation methods tried by default (see crossword::Crossword::generate())
+PORTFOLIO_METHODS = ('recurse', 'csp', 'iter')
+## `tuple` word (slot) orders tried by default (see crossword::Wordgrid::find_incomplete())
+PORTFOLIO_ORDERS = ('most-complete', 'random', 'first-incomplete')
+
+# ******************************************************************************** #
+
+## @brief Makes the settings of the portfolio attempts.
+# The methods and slot orders are combined in turn, so that the first attempts differ as much as possible;
+# each attempt gets its own random seed.
+# @param attempts `int` number of attempts
+# @param methods `iterable` generation methods to combine (see crossword::Crossword::generate())
+# @param orders `iterable` slot orders to combine (see crossword::Wordgrid::find_incomplete())
+# @param seed `int` | `None` base random seed (`None` = random)
+# @returns `list` of `dict` attempt settings: 'id', 'method', 'slot_order', 'seed'
+def make_attempts(attempts, methods=PORTFOLIO_METHODS, orders=PORTFOLIO_ORDERS, seed=None):
+    methods = list(methods)
+    orders = list(orders)
+    seeds = np.random.SeedSequence(seed).generate_state(attempts)
+    return [{'id': i, 'method': methods[i % len(methods)],
+             'slot_order': orders[(i // len(methods)) % len(orders)],
+             'seed': int(seeds[i])} for i in range(attempts)]
+
+## @brief Runs a single generation attempt (in a worker process).
+# The progress and result messages are put to `messages` as tuples:
+#   * ('progress', `int` attempt id, `int` completed words count, `int` total words count,
+# `str` | `None` grid characters (crossword::Wordgrid::chars) if 'preview' is set in `params`)
+#   * ('result', `int` attempt id, `str` status, `list` | `None` filled grid rows, `float` elapsed seconds, `str` error,
+# `dict` | `None` generation metrics, see crossword::GenMetrics::to_dict())
+#
+# Status is one of: 'ok', 'fail', 'timeout', 'stopped', 'invalid' (filled with words
+# missing from the word sources), 'error' (including no available word sources).
+# The unavailable word sources are reported in the error string.
+# @param attempt `dict` attempt settings (see make_attempts())
+# @param rows `list` of `str` grid rows
+# @param sources `list` of `dict` serialized word sources (see wordsrc::make_wordsource())
+# @param params `dict` common generation parameters: 'pos', 'excluded', 'max_fetch', 'timeout', 'progress_interval',
+# 'preview'
+# @param messages `multiprocessing.Queue` message queue
+# @param stop `multiprocessing.Event` event set by the parent process to stop the attempt
+def run_attempt(attempt, rows, sources, params, messages, stop):
+    status = ['fail']
+    error = ''
+    filled = None
+    metrics = None
+    t = timeit.default_timer()
+    try:
+        wordsource = MultiWordsource(max_fetch=params['max_fetch'])
+        unavailable = []
+        for src in sources:
+            wsrc = make_wordsource(src)
+            if wsrc is None:
+                unavailable.append(src.get('file', '') or src.get('name', ''))
+            else:
+                wordsource.add(wsrc)
+        if unavailable:
+            error = _("Word sources unavailable: {}").format(', '.join(unavailable))
+        if not len(wordsource):
+            raise CWError(error or _('No word sources!'))
+        excluded = params.get('excluded', None) or {}
+        cw = Crossword(data=rows, data_type='grid', wordsource=wordsource,
+                       wordfilter=make_wordfilter(excluded.get('words', []), excluded.get('regex', False)),
+                       pos=params['pos'], log=None, slot_order=attempt['slot_order'])
+        last = [-1]
+        errors = []
+        preview = params.get('preview', False)
+        def on_progress(cw_, complete_, total_):
+            # the preview changes with each word tried, so it is sent on every (throttled) report
+            if complete_ != last[0] or preview:
+                last[0] = complete_
+                messages.put(('progress', attempt['id'], complete_, total_,
+                              ''.join(cw_.words.chars) if preview else None))
+        def on_error(err_):
+            status[0] = 'error'
+            errors.append(str(err_))
+        res = cw.generate(method=attempt['method'], timeout=params['timeout'], stopcheck=stop.is_set, seed=attempt['seed'],
+                          ontimeout=lambda timeout_: status.__setitem__(0, 'timeout'),
+                          onstop=lambda: status.__setitem__(0, 'stopped'),
+                          onerror=on_error, on_progress=on_progress, progress_interval=params.get('progress_interval', None))
+        error = '; '.join(([error] if error else []) + errors)
+        metrics = res.to_dict()
+        if res:
+            if cw.validate():
+                status[0] = 'invalid'
+            else:
+                status[0] = 'ok'
+                filled = cw.words.tostr().split('\n')
+    except Exception as err:
+        status[0] = 'error'
+        error = traceback.format_exc() if DEBUGGING else str(err)
+    messages.put(('result', attempt['id'], status[0], filled, timeit.default_timer() - t, error, metrics))
+
+# ******************************************************************************** #
+
+## @brief Generates (fills) the crossword running several attempts in parallel processes.
+# The word sources cannot be shared between processes (e.g. DB connections),
+# so each attempt creates its own sources from their serialized data.
+# The attempts are run in up to `workers` processes at a time; when an attempt
+# succeeds, the others are cancelled and the filled words are put into the crossword grid.
+# The callbacks are the same as in crossword::Crossword::generate(), so the function
+# can be used in its stead.
+# @param cw `crossword::Crossword` the crossword to fill; its part-of-speech filter is used
+# by the attempts and its word source (if set) is used to validate the result
+# @param sources `list` of `dict` serialized word sources (see wordsrc::make_wordsource())
+# @param attempts `int` number of attempts; if `None`, equals `workers`
+# @param workers `int` max number of simultaneous processes; if `None`, equals the number of CPUs
+# @param methods `iterable` generation methods to combine (see make_attempts())
+# @param orders `iterable` slot orders to combine (see make_attempts())
+# @param timeout `float` overall timeout in seconds; each attempt is given the time left;
+# `None` means no timeout
+# @param seed `int` | `None` base random seed of the attempts (`None` = random)
+# @param max_fetch `int` max number of suggestions per word
+# @param excluded `dict` | `None` excluded words: {'words': `list`, 'regex': `bool`}
+# (see wordsrc::make_wordfilter())
+# @param stopcheck `callable` see crossword::Crossword::generate()
+# @param onfinish `callable` see crossword::Crossword::generate()
+# @param ontimeout `callable` see crossword::Crossword::generate()
+# @param onstop `callable` see crossword::Crossword::generate()
+# @param onerror `callable` see crossword::Crossword::generate(); called if all the attempts have failed with errors
+# @param onvalidate `callable` see crossword::Crossword::generate()
+# @param on_progress `callable` see crossword::Crossword::generate();
+# the progress reported is that of the most advanced attempt
+# @param on_metrics `callable` see crossword::Crossword::generate(); the metrics are those
+# of the successful attempt, with the overall elapsed time
+# @param progress_interval `float` | `None` min interval between progress reports in seconds,
+# both in the attempts and in `on_progress` (see crossword::Crossword::generate())
+# @param on_preview `callable` called with the grid characters of the most advanced attempt
+# (at most once per progress_interval); prototype is:
+# on_preview(cw: crossword::Crossword, chars: str) -> `None`,
+# where `chars` is a string of the same layout as crossword::Wordgrid::chars
+# @param on_attempt `callable` called when an attempt has finished; prototype is:
+# on_attempt(attempt: dict, status: str, elapsed: float, error: str) -> `None`,
+# where `attempt` is the attempt settings (see make_attempts()) and `status` is its status (see run_attempt())
+# @returns `dict` | `None` settings of the successful attempt (see make_attempts()) with its
+# metrics under the 'metrics' key (see crossword::GenMetrics::to_dict()), or `None` on failure
+def generate_portfolio(cw, sources, attempts=None, workers=None, methods=PORTFOLIO_METHODS, orders=PORTFOLIO_ORDERS,
+                       timeout=60.0, seed=None, max_fetch=MAX_RESULTS, excluded=None, stopcheck=None,
+                       onfinish=None, ontimeout=None, onstop=None, onerror=None, onvalidate=None,
+                       on_progress=None, on_metrics=None, on_attempt=None, progress_interval=None, on_preview=None):
+    workers = max(1, workers or mp.cpu_count())
+    attempts = make_attempts(attempts or workers, methods, orders, seed)
+    rows = cw.words.tostr().split('\n')
+    total = len(cw.words.words)
+    params = {'pos': cw.pos, 'excluded': excluded, 'max_fetch': max_fetch, 'timeout': timeout,
+              'progress_interval': progress_interval, 'preview': bool(on_preview)}
+    cw._log(_("RUNNING {} ATTEMPTS IN {} PROCESSES..."), len(attempts), min(workers, len(attempts)))
+
+    # 'spawn' is safe to use from a thread (e.g. in the GUI) on all platforms
+    ctx = mp.get_context('spawn')
+    messages = ctx.Queue()
+    stop = ctx.Event()
+    pending = list(attempts)
+    running = {}
+    progress = {}
+    best = 0
+    # last reported progress and its time
+    reported = [None, None]
+    # latest preview of the most advanced attempt (None = delivered)
+    preview = [None]
+    winner = None
+    filled = None
+    errors = []
+    stopped = False
+    timed_out = False
+    time_start = timeit.default_timer()
+
+    # reports the best progress and the preview (at most once per progress_interval)
+    def report_progress():
+        changed = on_progress and best != reported[0]
+        if not changed and preview[0] is None: return
+        t = timeit.default_timer()
+        if progress_interval and not reported[1] is None and t - reported[1] < progress_interval: return
+        reported[:] = [best, t]
+        if changed: on_progress(cw, best, total)
+        if not preview[0] is None:
+            if on_preview: on_preview(cw, preview[0])
+            preview[0] = None
+
+    if on_progress: on_progress(cw, cw.words.count_complete(), total)
+    try:
+        while pending or running:
+            elapsed = timeit.default_timer() - time_start
+            if stopcheck and stopcheck():
+                stopped = True
+                break
+            if not timeout is None and elapsed >= timeout:
+                timed_out = True
+                break
+            # start new attempts
+            while pending and len(running) < workers:
+                attempt = pending.pop(0)
+                params['timeout'] = None if timeout is None else max(timeout - elapsed, 0.0)
+                proc = ctx.Process(target=run_attempt, args=(attempt, rows, sources, params, messages, stop), daemon=True)
+                proc.start()
+                running[attempt['id']] = (attempt, proc)
+            # process messages
+            try:
+                msg = messages.get(timeout=0.1)
+            except queue.Empty:
+                # deliver the progress dropped by the throttling
+                report_progress()
+                # check for crashed processes
+                for i, (attempt, proc) in list(running.items()):
+                    if proc.exitcode:
+                        del running[i]
+                        errors.append(_('Process exited with code {}').format(proc.exitcode))
+                        if on_attempt: on_attempt(attempt, 'error', 0.0, errors[-1])
+                continue
+            if msg[0] == 'progress':
+                progress[msg[1]] = msg[2]
+                if msg[2] >= best and not msg[4] is None:
+                    preview[0] = msg[4]
+                if msg[2] > best or not preview[0] is None:
+                    best = max(best, msg[2])
+                    report_progress()
+            elif msg[0] == 'result' and msg[1] in running:
+                attempt, proc = running.pop(msg[1])
+                proc.join()
+                status, rows_, elapsed_, error_, metrics_ = msg[2:]
+                cw._log(_("Attempt {} ({}, {}): {} in {:.1f} sec. {}"), 
+                        attempt['id'], attempt['method'], attempt['slot_order'], status.upper(), elapsed_, error_)
+                if on_attempt: on_attempt(attempt, status, elapsed_, error_)
+                if status == 'ok':
+                    winner = dict(attempt, metrics=metrics_)
+                    filled = rows_
+                    break
+                if status == 'error': errors.append(error_)
+                progress.pop(msg[1], None)
+                best = max(progress.values(), default=0)
+
+    finally:
+        # cancel the remaining attempts
+        stop.set()
+        for attempt, proc in running.values():
+            proc.terminate()
+        for attempt, proc in running.values():
+            proc.join()
+        messages.close()
+
+    if filled:
+        # put the words of the winning attempt into the grid
+        for w in cw.words.words:
+            cw.words.change_word(w, ''.join(filled[y][x] for x, y in w.coords))
+        cw.reset_used()
+    elif stopped:
+        cw._log(_("STOPPED!"))
+        if onstop: onstop()
+    elif timed_out:
+        cw._log(_("TIMED OUT AT {} SEC!"), timeout)
+        if ontimeout: ontimeout(timeout)
+    elif errors and len(errors) == len(attempts):
+        if onerror: onerror(CWError(errors[0]))
+
+    if on_progress: on_progress(cw, cw.words.count_complete(), total)
+    elapsed = timeit.default_timer() - time_start
+
+    # validate the words (the attempts have validated them against their own sources)
+    if filled:
+        bad_words = cw.validate() if cw.wordsource else None
+        if onvalidate: onvalidate(bad_words)
+
+    cw._log(_("GENERATION COMPLETED IN {:.1f} SEC."), elapsed)
+    if onfinish: onfinish(elapsed)
+
+    # metrics of the winning attempt
+    metrics = GenMetrics.from_dict(winner['metrics']) if winner else GenMetrics()
+    metrics.elapsed = elapsed
+    if not winner:
+        metrics.status = 'stopped' if stopped else ('timeout' if timed_out else ('error' if errors else 'fail'))
+        metrics.words = total
+        metrics.complete = cw.words.count_complete()
+    cw.metrics = metrics
+    if on_metrics: on_metrics(metrics)
+    return winner
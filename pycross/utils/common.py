@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+# Copyright: (c) 2020, Iskander Shafikov <s00mbre@gmail.com>
+# GNU General Public License v3.0+ (see LICENSE or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+## @package utils.common
+# @brief Utility functions that don't depend on Qt. 
+# 
+# The functions are used by the GUI-independent modules (pycross::crossword, pycross::wordsrc
+# and pycross::sqlitedb) and re-exported by ::utils.utils along with the Qt utilities.
+import os, sys, subprocess, traceback, uuid, tempfile, platform, shutil, threading, queue, atexit, weakref
+from datetime import datetime, time
+from .globalvars import *
+
+# ---------------------------- COMMON ---------------------------- #
+
+## Checks if a given object is iterable (i.e. contains elements like an array).
+# @param obj the object to check
+# @returns `bool` True if the object is iterable (array-like) and False otherwise
+def is_iterable(obj):
+    if isinstance(obj, str): return False
+    try:
+        _ = iter(obj)
+        return True
+    except:
+        return False
+
+## Gets the current OS (platform) name.
+# @returns `str` platform name, e.g. 'Windows' or 'Linux'
+def getosname():
+    return platform.system()
+
+## Generates a random UUID (alphanumeric string).
+# @returns `str` UUID compliant to RFC 4122
+# @see [Python docs](https://docs.python.org/3.8/library/uuid.html)
+def generate_uuid():
+    return uuid.uuid4().hex
+
+## Copies a file into another location.
+# @param path_from `str` the original file to copy
+# @param path_to `str` the new file path or directory to copy the file to
+# @returns `str` the path to the newly created (copied) file
+def copy_file(path_from, path_to):
+    return shutil.copy(path_from, path_to)
+
+## Iterates the files and folder in a given folder, performing some operations
+# on the found files / folders.
+# @param root_path `str` the starting (root) directory path to start searching from
+# @param abs_path `bool` if `True` (default), the given root path will be made absolute
+# (relative to the current working directory); if `False`, it will be left as it is
+# @param recurse `bool` whether to recurse into the found subdirectories (default = `True`)
+# @param dir_process_function `callable` callback function for found subdirectories.
+# The callback takes a single argument - the full directory path.
+# @param file_process_function `callable` callback function for found files.
+# The callback takes a single argument - the full file path.
+# @param file_types `iterable` collection of file extensions (without the leading dot)
+# that will be respected when a file is found; if `None` (default), no file type
+# filtering will be done.
+def walk_dir(root_path, abs_path=True, recurse=True, dir_process_function=None,
+             file_process_function=None, file_types=None):
+    if abs_path:
+        root_path = os.path.abspath(root_path)
+    for (d, dirs, files) in os.walk(root_path):
+        if dir_process_function:
+            for d_ in dirs:
+                dir_process_function(os.path.join(d, d_))
+        if file_process_function:
+            for f in files:
+                ext = os.path.splitext(f)[1][1:].lower()
+                if (not file_types) or (ext in file_types):
+                    file_process_function(os.path.join(d, f))
+        if not recurse: break
+
+## Runs an executable and optionally returns the result.
+# @param args `list` | `str` arguments passed to the executable (a list of args or a single string)
+# @param external `bool` whether the executable must be called as an external (detached) process;
+# this basically means that the process will be created _asynchronously_, not blocking the
+# main application process to wait for the result; if `False` (default), the executable
+# will be called _synchronously_, waiting for the result and blocking the main process
+# @param capture_output `bool` whether the console output of the executable must be captured
+# @param stdout `file-like` file / stream to channel the STDOUT and STDERR streams to;
+# the default value is subprocess.PIPE, meaning that the output will be returned by the method
+# @param encoding `str` the string encoding to use for the executable's output (default = UTF8)
+# @param timeout `float` number of seconds to wait until timeout
+# (default = `None`, i.e. wait infinitely)
+# @param shell `bool` whether the executable must be called via the system shell (default = `False`)
+# @param kwargs `keyword arguments` additional keyword arguments passed to subprocess.Popen
+# @returns `subprocess.CompletedProcess` completed process results, see [Python docs](https://docs.python.org/3.8/library/subprocess.html?highlight=subprocess#subprocess.CompletedProcess)
+def run_exe(args, external=False, capture_output=True, stdout=subprocess.PIPE, encoding=ENCODING,
+            timeout=None, shell=False, **kwargs):
+    try:
+        osname = platform.system()
+        if external:
+            if osname == 'Windows':
+                creationflags=subprocess.CREATE_NO_WINDOW | subprocess.DETACHED_PROCESS
+                return subprocess.Popen(args,
+                    creationflags=creationflags,
+                    stdout=stdout if capture_output else None,
+                    stderr=subprocess.STDOUT if capture_output else None,
+                    encoding=encoding, shell=shell, **kwargs)
+            else:
+                return subprocess.Popen('nohup ' + (args if isinstance(args, str) else ' '.join(args)),
+                    stdout=stdout if capture_output else None,
+                    stderr=subprocess.STDOUT if capture_output else None,
+                    encoding=encoding, shell=shell, preexec_fn=os.setpgrp,
+                    **kwargs)
+        else:
+            return subprocess.run(args,
+                capture_output=capture_output,
+                encoding=encoding,
+                timeout=timeout, shell=shell, **kwargs)
+    except Exception as err:
+        traceback.print_exc(limit=None)
+        raise
+
+## Converts a Python `datetime` object to a string.
+# @param dt `datetime` Python datetime object representing a date and/or time;
+# if `None` (default), the current date and time will be taken
+# @param strformat `str` format string compliant to the [Python datetime formatting](https://docs.python.org/3.8/library/datetime.html?highlight=datetime#strftime-strptime-behavior)
+# @returns `str` string representation of the date / time
+def datetime_to_str(dt=None, strformat='%Y-%m-%d %H-%M-%S'):
+    if dt is None: dt = datetime.now()
+    return dt.strftime(strformat)
+
+## Converts a timestamp (Unix time) to a string.
+# @param ts `float` timestamp, i.e. number of seconds since epoch (Unix time)
+# if `None` (default), the current timestamp will be taken
+# @param strformat `str` format string compliant to the [Python datetime formatting](https://docs.python.org/3.8/library/datetime.html?highlight=datetime#strftime-strptime-behavior)
+# @returns `str` string representation of the timestamp
+def timestamp_to_str(ts=None, strformat='%Y-%m-%d %H-%M-%S'):
+    if ts is None: ts = time.time()
+    return datetime_to_str(datetime.fromtimestamp(ts), strformat)
+
+## Converts a string to a Python `datetime` object.
+# @param text `str` datetime string to convert
+# @param strformat `str` format string compliant to the [Python datetime formatting](https://docs.python.org/3.8/library/datetime.html?highlight=datetime#strftime-strptime-behavior)
+# @returns `datetime` Python datetime object
+def str_to_datetime(text, strformat='%Y-%m-%d %H-%M-%S'):
+    return datetime.strptime(text, strformat)
+
+## Converts a string to a timestamp (Unix time).
+# @param text `str` datetime string to convert
+# @param strformat `str` format string compliant to the [Python datetime formatting](https://docs.python.org/3.8/library/datetime.html?highlight=datetime#strftime-strptime-behavior)
+# @returns `float` timestamp, i.e. number of seconds since epoch (Unix time)
+def str_to_timestamp(text, strformat='%Y-%m-%d %H-%M-%S'):
+    return str_to_datetime(text, strformat).timestamp()
+
+## Gets the path to the Temp directory on the system.
+# @returns `str` full path to the system Temp directory
+def get_tempdir():
+    return os.path.abspath(tempfile.gettempdir())
+
+## Returns a human-formatted file size as a string,
+# e.g. "1Mi" (1 megabyte), "15GBi" (15 gigabytes) etc.
+# @param value `float` the file size value to convert
+# @param suffix `str` the size suffix, default = 'B' (bytes)
+# @returns `str` string representation of the file size
+def bytes_human(value, suffix='B'):
+    for unit in ['', 'K', 'M', 'G', 'T', 'P', 'E', 'Z']:
+        if abs(value) < 1024.0:
+            return f"{value:3.1f}{unit}{suffix}"
+        value /= 1024.0
+    return f"{value:.1f}Y{suffix}"
+
+# ---------------------------- LOGGING ---------------------------- #
+
+# asynchronous log writers still open: closed at exit to write out the queued messages
+_LOGWRITERS = weakref.WeakSet()
+atexit.register(lambda: [writer.close() for writer in list(_LOGWRITERS)])
+
+## @brief Text log writer: writes messages to the console or a text file.
+# In asynchronous mode, messages are put to a queue and written to the file
+# by a background thread, so the caller never waits for disk I/O.
+class LogWriter:
+
+    ## Opens the log target.
+    # @param target `str` log target: 'stdout', 'stderr' or file path
+    # @param buffered `bool` whether the file should be block-buffered (`True`) or line-buffered (`False`)
+    # @param threaded `bool` whether to write the file in a background thread
+    # (ignored for the console streams)
+    def __init__(self, target='stdout', buffered=False, threaded=False):
+        ## `str` log target: 'stdout', 'stderr' or file path
+        self.target = target
+        if target == 'stdout':
+            ## output stream
+            self.stream = sys.stdout
+        elif target == 'stderr':
+            self.stream = sys.stderr
+        else:
+            self.stream = open(target, 'w', encoding=ENCODING, buffering=-1 if (buffered or threaded) else 1)
+        ## `queue.SimpleQueue` | `None` message queue used in asynchronous mode
+        self.queue = None
+        ## `threading.Thread` | `None` background writer thread used in asynchronous mode
+        self.thread = None
+        if threaded and not self.isconsole():
+            self.queue = queue.SimpleQueue()
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+            _LOGWRITERS.add(self)
+
+    ## Checks if the log target is a console stream.
+    # @returns `bool` `True` for 'stdout' and 'stderr'
+    def isconsole(self):
+        return self.target in ('stdout', 'stderr')
+
+    ## Writes a message.
+    # @param text `str` the message text (with line ending)
+    def write(self, text):
+        if self.queue:
+            self.queue.put(text)
+        elif self.stream:
+            self.stream.write(text)
+
+    ## Background thread function: writes queued messages until `None` is received.
+    def _run(self):
+        while True:
+            text = self.queue.get()
+            if text is None: break
+            # write out whatever else has been queued in one go
+            texts = [text]
+            while not self.queue.empty():
+                text = self.queue.get()
+                if text is None: break
+                texts.append(text)
+            self.stream.write(''.join(texts))
+            if text is None: break
+        self.stream.flush()
+
+    ## Flushes the pending messages and closes the log file (console streams are only flushed).
+    def close(self):
+        if self.thread:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+            self.queue = None
+        if self.stream:
+            if self.isconsole():
+                self.stream.flush()
+            else:
+                self.stream.close()
+            self.stream = None
@@ -8,164 +8,17 @@
 # 
 # The utilities include file operations, OS and system
 # queries, multithreading and some Qt GUI methods.
-import sys, os, subprocess, traceback, uuid
+import sys, os, subprocess, traceback, uuid, struct, zlib
 import tempfile, platform, re, json, shutil, inspect, builtins
 import jedi
 from datetime import datetime, time
 from functools import wraps
 from .globalvars import *
+from .common import *
 from PyQt5 import QtGui, QtCore, QtWidgets
 
 # ---------------------------- COMMON ---------------------------- #
 
-## Checks if a given object is iterable (i.e. contains elements like an array).
-# @param obj the object to check
-# @returns `bool` True if the object is iterable (array-like) and False otherwise
-def is_iterable(obj):
-    if isinstance(obj, str): return False
-    try:
-        _ = iter(obj)
-        return True
-    except:
-        return False
-
-## Gets the current OS (platform) name.
-# @returns `str` platform name, e.g. 'Windows' or 'Linux'
-def getosname():
-    return platform.system()
-
-## Generates a random UUID (alphanumeric string).
-# @returns `str` UUID compliant to RFC 4122
-# @see [Python docs](https://docs.python.org/3.8/library/uuid.html)
-def generate_uuid():
-    return uuid.uuid4().hex
-
-## Copies a file into another location.
-# @param path_from `str` the original file to copy
-# @param path_to `str` the new file path or directory to copy the file to
-# @returns `str` the path to the newly created (copied) file
-def copy_file(path_from, path_to):
-    return shutil.copy(path_from, path_to)
-
-## Iterates the files and folder in a given folder, performing some operations
-# on the found files / folders.
-# @param root_path `str` the starting (root) directory path to start searching from
-# @param abs_path `bool` if `True` (default), the given root path will be made absolute
-# (relative to the current working directory); if `False`, it will be left as it is
-# @param recurse `bool` whether to recurse into the found subdirectories (default = `True`)
-# @param dir_process_function `callable` callback function for found subdirectories.
-# The callback takes a single argument - the full directory path.
-# @param file_process_function `callable` callback function for found files.
-# The callback takes a single argument - the full file path.
-# @param file_types `iterable` collection of file extensions (without the leading dot)
-# that will be respected when a file is found; if `None` (default), no file type
-# filtering will be done.
-def walk_dir(root_path, abs_path=True, recurse=True, dir_process_function=None,
-             file_process_function=None, file_types=None):
-    if abs_path:
-        root_path = os.path.abspath(root_path)
-    for (d, dirs, files) in os.walk(root_path):
-        if dir_process_function:
-            for d_ in dirs:
-                dir_process_function(os.path.join(d, d_))
-        if file_process_function:
-            for f in files:
-                ext = os.path.splitext(f)[1][1:].lower()
-                if (not file_types) or (ext in file_types):
-                    file_process_function(os.path.join(d, f))
-        if not recurse: break
-
-## Runs an executable and optionally returns the result.
-# @param args `list` | `str` arguments passed to the executable (a list of args or a single string)
-# @param external `bool` whether the executable must be called as an external (detached) process;
-# this basically means that the process will be created _asynchronously_, not blocking the
-# main application process to wait for the result; if `False` (default), the executable
-# will be called _synchronously_, waiting for the result and blocking the main process
-# @param capture_output `bool` whether the console output of the executable must be captured
-# @param stdout `file-like` file / stream to channel the STDOUT and STDERR streams to;
-# the default value is subprocess.PIPE, meaning that the output will be returned by the method
-# @param encoding `str` the string encoding to use for the executable's output (default = UTF8)
-# @param timeout `float` number of seconds to wait until timeout
-# (default = `None`, i.e. wait infinitely)
-# @param shell `bool` whether the executable must be called via the system shell (default = `False`)
-# @param kwargs `keyword arguments` additional keyword arguments passed to subprocess.Popen
-# @returns `subprocess.CompletedProcess` completed process results, see [Python docs](https://docs.python.org/3.8/library/subprocess.html?highlight=subprocess#subprocess.CompletedProcess)
-def run_exe(args, external=False, capture_output=True, stdout=subprocess.PIPE, encoding=ENCODING,
-            timeout=None, shell=False, **kwargs):
-    try:
-        osname = platform.system()
-        if external:
-            if osname == 'Windows':
-                creationflags=subprocess.CREATE_NO_WINDOW | subprocess.DETACHED_PROCESS
-                return subprocess.Popen(args,
-                    creationflags=creationflags,
-                    stdout=stdout if capture_output else None,
-                    stderr=subprocess.STDOUT if capture_output else None,
-                    encoding=encoding, shell=shell, **kwargs)
-            else:
-                return subprocess.Popen('nohup ' + (args if isinstance(args, str) else ' '.join(args)),
-                    stdout=stdout if capture_output else None,
-                    stderr=subprocess.STDOUT if capture_output else None,
-                    encoding=encoding, shell=shell, preexec_fn=os.setpgrp,
-                    **kwargs)
-        else:
-            return subprocess.run(args,
-                capture_output=capture_output,
-                encoding=encoding,
-                timeout=timeout, shell=shell, **kwargs)
-    except Exception as err:
-        traceback.print_exc(limit=None)
-        raise
-
-## Converts a Python `datetime` object to a string.
-# @param dt `datetime` Python datetime object representing a date and/or time;
-# if `None` (default), the current date and time will be taken
-# @param strformat `str` format string compliant to the [Python datetime formatting](https://docs.python.org/3.8/library/datetime.html?highlight=datetime#strftime-strptime-behavior)
-# @returns `str` string representation of the date / time
-def datetime_to_str(dt=None, strformat='%Y-%m-%d %H-%M-%S'):
-    if dt is None: dt = datetime.now()
-    return dt.strftime(strformat)
-
-## Converts a timestamp (Unix time) to a string.
-# @param ts `float` timestamp, i.e. number of seconds since epoch (Unix time)
-# if `None` (default), the current timestamp will be taken
-# @param strformat `str` format string compliant to the [Python datetime formatting](https://docs.python.org/3.8/library/datetime.html?highlight=datetime#strftime-strptime-behavior)
-# @returns `str` string representation of the timestamp
-def timestamp_to_str(ts=None, strformat='%Y-%m-%d %H-%M-%S'):
-    if ts is None: ts = time.time()
-    return datetime_to_str(datetime.fromtimestamp(ts), strformat)
-
-## Converts a string to a Python `datetime` object.
-# @param text `str` datetime string to convert
-# @param strformat `str` format string compliant to the [Python datetime formatting](https://docs.python.org/3.8/library/datetime.html?highlight=datetime#strftime-strptime-behavior)
-# @returns `datetime` Python datetime object
-def str_to_datetime(text, strformat='%Y-%m-%d %H-%M-%S'):
-    return datetime.strptime(text, strformat)
-
-## Converts a string to a timestamp (Unix time).
-# @param text `str` datetime string to convert
-# @param strformat `str` format string compliant to the [Python datetime formatting](https://docs.python.org/3.8/library/datetime.html?highlight=datetime#strftime-strptime-behavior)
-# @returns `float` timestamp, i.e. number of seconds since epoch (Unix time)
-def str_to_timestamp(text, strformat='%Y-%m-%d %H-%M-%S'):
-    return str_to_datetime(text, strformat).timestamp()
-
-## Gets the path to the Temp directory on the system.
-# @returns `str` full path to the system Temp directory
-def get_tempdir():
-    return os.path.abspath(tempfile.gettempdir())
-
-## Returns a human-formatted file size as a string,
-# e.g. "1Mi" (1 megabyte), "15GBi" (15 gigabytes) etc.
-# @param value `float` the file size value to convert
-# @param suffix `str` the size suffix, default = 'B' (bytes)
-# @returns `str` string representation of the file size
-def bytes_human(value, suffix='B'):
-    for unit in ['', 'K', 'M', 'G', 'T', 'P', 'E', 'Z']:
-        if abs(value) < 1024.0:
-            return f"{value:3.1f}{unit}{suffix}"
-        value /= 1024.0
-    return f"{value:.1f}Y{suffix}"
-
 ## Restarts this app.
 # @param closefunction `callable` function to close down the app (e.g. gui::MainWindow::on_act_exit)
 def restart_app(closefunction):
@@ -593,6 +446,116 @@ class Task(QtCore.QRunnable):
 
 # ------------------------------------------------------------------------ #
 
+## @brief Writes a raster image to file strip by strip (horizontal bands, top to bottom).
+# PNG and BMP images are streamed: each strip is encoded and written as soon as it is
+# passed to write(), so only one strip is kept in memory. Other formats (JPG, TIFF)
+# are assembled in a full-size `QtGui.QImage` and saved by close().
+class ImageStripWriter:
+
+    ## Formats (file extensions) that are streamed to file
+    STREAMED = ('png', 'bmp')
+
+    ## Constructor: opens the output file and writes the image header.
+    # @param filepath `str` output file path (the format is guessed from the extension)
+    # @param width `int` image width in pixels
+    # @param height `int` image height in pixels
+    # @param dpi `int` image resolution (dots per inch) saved in the image metadata
+    # @param quality `int` output quality (0 - 100) for non-streamed formats, -1 = default
+    def __init__(self, filepath, width, height, dpi=72, quality=-1):
+        ## `str` output file path
+        self.filepath = filepath
+        ## `str` output format (lowercase extension)
+        self.fmt = os.path.splitext(filepath)[1][1:].lower()
+        ## `int` image width in pixels
+        self.width = width
+        ## `int` image height in pixels
+        self.height = height
+        ## `int` image resolution
+        self.dpi = dpi
+        ## `int` output quality for non-streamed formats
+        self.quality = quality
+        ## `int` number of rows written so far
+        self.rows = 0
+        ## `bool` whether the image format supports transparency
+        self.alpha = self.fmt not in ('bmp', 'jpg', 'jpeg')
+        self._file = None
+        self._image = None
+        self._zip = None
+        if self.fmt == 'png':
+            self._file = open(filepath, 'wb')
+            self._file.write(b'\x89PNG\r\n\x1a\n')
+            # 8-bit RGBA, no interlacing
+            self._png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+            dpm = int(round(dpi / 0.0254))
+            self._png_chunk(b'pHYs', struct.pack('>IIB', dpm, dpm, 1))
+            self._zip = zlib.compressobj(6)
+        elif self.fmt == 'bmp':
+            # 24-bit top-down bitmap (negative height); rows are padded to 4 bytes
+            row_size = (width * 3 + 3) & ~3
+            dpm = int(round(dpi / 0.0254))
+            self._file = open(filepath, 'wb')
+            self._file.write(struct.pack('<2sIHHI', b'BM', 54 + row_size * height, 0, 0, 54))
+            self._file.write(struct.pack('<IiiHHIIiiII', 40, width, -height, 1, 24, 0, row_size * height, dpm, dpm, 0, 0))
+        else:
+            self._image = QtGui.QImage(width, height, QtGui.QImage.Format_ARGB32)
+            dpm = int(round(dpi / 0.0254))
+            self._image.setDotsPerMeterX(dpm)
+            self._image.setDotsPerMeterY(dpm)
+
+    def _png_chunk(self, tag, data):
+        self._file.write(struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+    ## Writes the next strip of the image.
+    # @param strip `QtGui.QImage` the strip (its width must be equal to the image width);
+    # rows beyond the image height are ignored
+    def write(self, strip):
+        h = min(strip.height(), self.height - self.rows)
+        if h <= 0: return
+        if self.fmt == 'png':
+            strip = strip.convertToFormat(QtGui.QImage.Format_RGBA8888)
+            bpl = strip.bytesPerLine()
+            data = strip.constBits().asstring(bpl * h)
+            row_len = self.width * 4
+            # filter type 0 (none) for every row
+            raw = b''.join(b'\x00' + data[i * bpl:i * bpl + row_len] for i in range(h))
+            self._write_idat(self._zip.compress(raw))
+        elif self.fmt == 'bmp':
+            strip = strip.convertToFormat(QtGui.QImage.Format_RGB888).rgbSwapped()
+            bpl = strip.bytesPerLine()
+            self._file.write(strip.constBits().asstring(bpl * h))
+        else:
+            painter = QtGui.QPainter(self._image)
+            painter.setCompositionMode(QtGui.QPainter.CompositionMode_Source)
+            painter.drawImage(0, self.rows, strip, 0, 0, self.width, h)
+            painter.end()
+        self.rows += h
+
+    def _write_idat(self, data):
+        if data: self._png_chunk(b'IDAT', data)
+
+    ## Finishes writing the image and closes the file.
+    # @param discard `bool` `True` to delete the (incomplete) output file instead
+    # @returns `bool` `True` if the image was saved
+    def close(self, discard=False):
+        ok = not discard
+        try:
+            if self._file:
+                if ok and self.fmt == 'png':
+                    self._write_idat(self._zip.flush())
+                    self._png_chunk(b'IEND', b'')
+                self._file.close()
+            elif ok:
+                ok = self._image.save(self.filepath, quality=self.quality)
+        finally:
+            self._file = None
+            self._image = None
+            self._zip = None
+        if not ok and os.path.isfile(self.filepath):
+            os.remove(self.filepath)
+        return ok
+
+# ------------------------------------------------------------------------ #
+
 ## Constructs a `QtGui.QFont` object from given font parameters.
 # @param family `str` font familty name, e.g. 'Arial'
 # @param size `int` font size in points or pixels (default = -1: default size)
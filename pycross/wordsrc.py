@@ -12,8 +12,16 @@
 #   * TextfileWordsource - file-based source
 #   * MultiWordsource - combined word source container that can store any number of individual sources
 from utils.globalvars import *
-from utils.utils import is_iterable
+from utils.common import is_iterable
+from sqlitedb import Sqlitedb
 import re, csv, numpy as np, itertools
+from collections import OrderedDict
+
+## prime modulus of the rowid hash used to shuffle DB results (see DBWordsource::iter_fetch());
+# must be greater than the max rowid
+DB_SHUFFLE_PRIME = 2147483647
+## max number of words looked up in one query by DBWordsource::check_many()
+DB_CHECK_CHUNK = 500
 # ******************************************************************************** #
 
 ## Base class for word source objects. Provides core methods for fetching, shuffling,
@@ -24,11 +32,15 @@ class Wordsource:
     # @param max_fetch `int` maximum number of suggestions returned from the word source
     # (None means no limit on suggestions, which may be time/resource consuming!)
     # @param shuffle `bool` if `True`, fetched words will be shuffled
-    def __init__(self, max_fetch=None, shuffle=True):
+    # @param rng `numpy.random.Generator` | `None` random generator used to shuffle the words
+    # if none is passed to fetch(); if `None`, a new generator is created (seeded by the OS)
+    def __init__(self, max_fetch=None, shuffle=True, rng=None):
         ## `int` maximum number of suggestions returned from the word source
         self.max_fetch = max_fetch
         ## `bool` if `True`, fetched words will be shuffled
         self.shuffle_words = shuffle
+        ## `numpy.random.Generator` default random generator used to shuffle the words
+        self.rng = rng if not rng is None else np.random.default_rng()
         ## `bool` if `True`, this word source will be used; otherwise it will be ignored
         self.active = True
         
@@ -47,14 +59,28 @@ class Wordsource:
         
     ## Shuffles the results randomly.
     # @param suggestions `list` list of suggested words `str`
+    # @param rng `numpy.random.Generator` | `None` random generator to use;
+    # if `None`, Wordsource::rng is used
     # @returns `list` randomly shuffled list of suggested words 
     # or the original list if Wordsource::shuffle_words == `False`
-    def shuffle(self, suggestions):
+    def shuffle(self, suggestions, rng=None):
         if not suggestions: return []
         if self.shuffle_words:
-            np.random.seed()
-            np.random.shuffle(suggestions)
+            (self.rng if rng is None else rng).shuffle(suggestions)
         return suggestions
+
+    ## @brief Gets the order in which to go through a list of results.
+    # Unlike shuffle(), this doesn't touch the results themselves, so they can be
+    # read (and filtered) lazily in this order until enough words are found.
+    # @param n `int` number of results
+    # @param shuffle `bool` `True` to get a random order (if Wordsource::shuffle_words is `True`)
+    # @param rng `numpy.random.Generator` | `None` random generator to use;
+    # if `None`, Wordsource::rng is used
+    # @returns `iterable` of `int` the result indices in the order to go through them
+    def sample_order(self, n, shuffle=True, rng=None):
+        if shuffle and self.shuffle_words and n > 1:
+            return (self.rng if rng is None else rng).permutation(n).tolist()
+        return range(n)
     
     ## Fetches suggestions (as a `list` of strings) for a given word pattern (mask).
     # @param word `str` | `None` the word pattern to find suggestions for, e.g. 'f th  '
@@ -72,10 +98,41 @@ class Wordsource:
     # If `None` (default), no filtering will be performed.
     # @param shuffle `bool` `True` (default) to shuffle the results randomly
     # @param truncate `bool` `True` (default) to truncate the results by Wordsource::max_fetch
+    # @param rng `numpy.random.Generator` | `None` random generator used to shuffle the results;
+    # if `None` (default), Wordsource::rng is used. Pass the same generator (seeded with the same value)
+    # to get the same results in the same order.
     # @returns `list` list of strings - the words matching the given pattern
-    def fetch(self, word=None, blank=' ', pos=None, filter_func=None, shuffle=True, truncate=True):
+    def fetch(self, word=None, blank=' ', pos=None, filter_func=None, shuffle=True, truncate=True, rng=None):
         if not self.isvalid() or not self.active: return []
         return []
+
+    ## @brief Yields suggestions for a given word pattern (mask) one by one.
+    # The results are the same as those of fetch(), but derived classes produce them lazily:
+    # the words are filtered only until Wordsource::max_fetch of them are found (if `truncate` is `True`),
+    # and the random order is sampled rather than made by shuffling all the matching words.
+    # @see fetch() for description of the arguments
+    # @returns `generator` of `str` the words matching the given pattern
+    def iter_fetch(self, word=None, blank=' ', pos=None, filter_func=None, shuffle=True, truncate=True, rng=None):
+        yield from self.fetch(word, blank, pos, filter_func, shuffle, truncate, rng)
+    
+    ## @brief Counts the words matching a given pattern (mask).
+    # The result is the length of the untruncated fetch() results, but derived classes
+    # compute it without making the list of words where they can.
+    # @param word `str` | `None` the word pattern, e.g. 'f th  ' - see fetch()
+    # @param blank `str` placeholder character for unknown (blank) letters (default = whitespace)
+    # @param pos `str` | `iterable` | `None` part(s) of speech to include - see fetch()
+    # @param filter_func `callable` filtering callback function to exclude words - see fetch()
+    # @returns `int` number of matching words
+    def count(self, word=None, blank=' ', pos=None, filter_func=None):
+        if not self.isvalid() or not self.active: return 0
+        return len(self.fetch(word, blank, pos, filter_func, shuffle=False, truncate=False))
+
+    ## @brief Checks if any word matches a given pattern (mask).
+    # Derived classes stop at the first matching word rather than making the list of all the words.
+    # @see count() for description of the arguments
+    # @returns `bool` `True` if at least one word matches the pattern, `False` otherwise
+    def exists(self, word=None, blank=' ', pos=None, filter_func=None):
+        return self.count(word, blank, pos, filter_func) > 0
     
     ## Checks if a given word or word pattern is found in the word source.
     # @param word `str` the word (pattern) to find, e.g. 'f ther' or 'father'
@@ -86,7 +143,17 @@ class Wordsource:
     # @returns `bool` `True` if the given word (pattern) can be found in the source, `False` otherwise
     def check(self, word, pos=None, filter_func=None):
         if not self.isvalid() or not self.active: return True
-        return bool(self.fetch(word, pos=pos, filter_func=filter_func, shuffle=False, truncate=False))
+        return self.exists(word, pos=pos, filter_func=filter_func)
+
+    ## @brief Checks a collection of words at once (e.g. all the words of a finished grid).
+    # Derived classes answer this in one go (a single DB query or hash lookups) 
+    # instead of calling check() for each word.
+    # @param words `iterable` of `str` the words to find, e.g. ['father', 'mother']
+    # @param pos `str` | `iterable` | `None` part(s) of speech - see fetch()
+    # @param filter_func `callable` filtering callback function to exclude words - see fetch()
+    # @returns `list` of `bool` check() results for each word in `words`
+    def check_many(self, words, pos=None, filter_func=None):
+        return [self.check(w, pos, filter_func) for w in words]
     
     ## Retrieves the last suggestion (word) from the list of suggestions, removing
     # that word from the original results.
@@ -132,6 +199,9 @@ class DBWordsource(Wordsource):
         self.diconnect_on_destroy = diconnect_on_destroy
         ## low-level DB cursor object
         self.cur = None
+        ## `bool` `True` if the DB has the pattern lookup indexes -
+        # see dbapi::Sqlitedb::upgrade_schema()
+        self.indexed = self.db.is_indexed(self.tables)
         super().__init__(max_fetch, shuffle)
         
     ## Destructor: disconnects from database if DBWordsource::diconnect_on_destroy == `True`
@@ -148,9 +218,10 @@ class DBWordsource(Wordsource):
             
     ## Executes an SQL query.
     # @param sql `str` SQL query string
+    # @param params `iterable` values for the query parameters ('?' placeholders) in `sql`
     # @returns `DB cursor` DB cursor object that has executed the SQL query
     # @exception Exception failed DB connection
-    def _execsql(self, sql):
+    def _execsql(self, sql, params=()):
         if self.cur: self.cur.close()   
         if not self.conn:
             if not self.db.connect():
@@ -158,41 +229,152 @@ class DBWordsource(Wordsource):
             self.conn = self.db.conn or None
         self.cur = self.conn.cursor()
         try:
-            self.cur.execute(sql)
+            self.cur.execute(sql, params)
             return self.cur
         except:
             return None
-    
-    ## Fetches results from the current SQLite DB.
-    def fetch(self, word=None, blank=' ', pos=None, filter_func=None, shuffle=True, truncate=True):
-        if not self.isvalid() or not self.active: return []
-        conj = '\nwhere' if word is None else '\nand'    
-        sql = f"select {self.tables['words']['table']}.{self.tables['words']['fwords']} from {self.tables['words']['table']}"
-        bpos = False
+
+    ## @brief Makes a parameterized SQL query to select words by a pattern and parts of speech.
+    # If the DB has been upgraded with dbapi::Sqlitedb::upgrade_schema(), the pattern
+    # is expressed as conditions on the word length and the known letters, e.g. 'c_t__' gives
+    # @code
+    # length(word) = 5 and substr(word, 1, 1) = 'c' and substr(word, 3, 1) = 't'
+    # @endcode
+    # which are resolved by the length / letter indexes. Otherwise, a plain LIKE condition is used.
+    # The letter positions are embedded in the SQL text (to match the indexed expressions),
+    # while the letters, length and parts of speech are passed as parameters, so the
+    # compiled statements are reused by the DB driver for all patterns of the same shape.
+    # @param word `str` | `None` the word pattern - see fetch()
+    # @param blank `str` placeholder character for unknown (blank) letters
+    # @param pos `str` | `iterable` | `None` part(s) of speech - see fetch()
+    # @param select `str` | `None` SQL expression to select, e.g. 'count(*)';
+    # `None` (default) to select the words
+    # @param words `list` | `None` exact words to select (an 'in' condition) in addition to the pattern
+    # @returns `2-tuple` (`str` SQL query, `list` query parameters)
+    def _make_query(self, word=None, blank=' ', pos=None, select=None, words=None):
+        table = self.tables['words']['table']
+        field = f"{table}.{self.tables['words']['fwords']}"
+        sql = f"select {select or field} from {table}"
+        conds = []
+        params = []
         if pos and 'pos' in self.tables and 'fpos' in self.tables['words'] and 'fid' in self.tables['pos'] and 'fpos' in self.tables['pos']:
-            bpos = True
-            sql += f"\njoin {self.tables['pos']['table']} on {self.tables['pos']['table']}.{self.tables['pos']['fid']} = {self.tables['words']['table']}.{self.tables['words']['fpos']}"
-        if not word is None:
-            sql += f"""\nwhere ({self.tables['words']['table']}.{self.tables['words']['fwords']} like '{word.lower().replace(blank, "_")}')"""
-        if bpos:
+            sql += f"\njoin {self.tables['pos']['table']} on {self.tables['pos']['table']}.{self.tables['pos']['fid']} = {table}.{self.tables['words']['fpos']}"
             if is_iterable(pos):
                 pos = [p.upper() for p in pos]
-                pos_conj = f"in ({repr(pos)[1:-1]})"
+                conds.append(f"{self.tables['pos']['table']}.{self.tables['pos']['fpos']} in ({', '.join('?' * len(pos))})")
+                params += pos
             else:
-                pos = pos.upper()
-                pos_conj = f"= {repr(pos)}"
-            sql += f"{conj} {self.tables['pos']['table']}.{self.tables['pos']['fpos']} {pos_conj}"
-            
-        cur = None
+                conds.append(f"{self.tables['pos']['table']}.{self.tables['pos']['fpos']} = ?")
+                params.append(pos.upper())
+        if not word is None:
+            word = word.lower()
+            if self.indexed:
+                conds.append(f"length({field}) = ?")
+                params.append(len(word))
+                for i, c in enumerate(word):
+                    if c == blank: continue
+                    conds.append(f"substr({field}, {i + 1}, 1) = ?")
+                    params.append(c)
+            else:
+                conds.append(f"{field} like ?")
+                params.append(word.replace(blank, '_'))
+        if words:
+            conds.append(f"{field} in ({', '.join('?' * len(words))})")
+            params += words
+        if conds:
+            sql += '\nwhere ' + ' and '.join(conds)
+        return (sql, params)
+    
+    ## Fetches results from the current SQLite DB.
+    def fetch(self, word=None, blank=' ', pos=None, filter_func=None, shuffle=True, truncate=True, rng=None):
+        return list(self.iter_fetch(word, blank, pos, filter_func, shuffle, truncate, rng))
+
+    ## @brief Yields results from the current SQLite DB as they are read by the DB cursor.
+    # To shuffle the results, the rows are ordered by an affine hash of their rowids,
+    # `(rowid * a + b) % p` (p = a prime number above the max rowid), with `a` and `b` 
+    # drawn from the random generator: this gives a different order for each draw but 
+    # the same order for the same seed, which SQLite's own random() cannot do.
+    # Without `filter_func`, the number of rows is limited by the query itself ('limit' clause).
+    # @see Wordsource::iter_fetch()
+    def iter_fetch(self, word=None, blank=' ', pos=None, filter_func=None, shuffle=True, truncate=True, rng=None):
+        if not self.isvalid() or not self.active: return
+        sql, params = self._make_query(word, blank, pos)
+        if shuffle and self.shuffle_words:
+            a, b = (self.rng if rng is None else rng).integers(1, DB_SHUFFLE_PRIME, 2).tolist()
+            sql += f"\norder by ({self.tables['words']['table']}.rowid * ? + ?) % ?"
+            params += [a, b, DB_SHUFFLE_PRIME]
+        limit = self.max_fetch if truncate else None
+        if limit and not filter_func:
+            sql += '\nlimit ?'
+            params.append(limit)
         try:
-            cur = self._execsql(sql)
+            cur = self._execsql(sql, params)
         except:
-            return []
-        if not cur: return []
-        results = [row[0] for row in cur if not filter_func or filter_func(row[0])] 
+            return
+        if not cur: return
+        # detach the cursor, so that other queries don't close it while the results are read
+        self.cur = None
+        n = 0
+        try:
+            for row in cur:
+                if filter_func and not filter_func(row[0]): continue
+                yield row[0]
+                n += 1
+                if limit and n >= limit: break
+        finally:
+            cur.close()
+
+    ## @brief Counts the matching words in the current SQLite DB.
+    # Without `filter_func`, this is a single 'select count(*)' query;
+    # otherwise, the words are filtered one by one as they are read from the DB.
+    # @see Wordsource::count()
+    def count(self, word=None, blank=' ', pos=None, filter_func=None):
+        if not self.isvalid() or not self.active: return 0
+        try:
+            cur = self._execsql(*self._make_query(word, blank, pos, None if filter_func else 'count(*)'))
+        except:
+            return 0
+        if not cur: return 0
+        n = sum(1 for row in cur if filter_func(row[0])) if filter_func else cur.fetchone()[0]
         cur.close()
-        if shuffle: results = self.shuffle(results)
-        return self.truncate(results) if truncate else results
+        return n
+
+    ## @brief Checks if any word in the current SQLite DB matches the pattern.
+    # Without `filter_func`, the query is limited to one row; otherwise, 
+    # the words are read from the DB until one of them passes the filter.
+    # @see Wordsource::exists()
+    def exists(self, word=None, blank=' ', pos=None, filter_func=None):
+        if not self.isvalid() or not self.active: return False
+        sql, params = self._make_query(word, blank, pos, None if filter_func else '1')
+        try:
+            cur = self._execsql(sql if filter_func else sql + '\nlimit 1', params)
+        except:
+            return False
+        if not cur: return False
+        found = any(filter_func(row[0]) for row in cur) if filter_func else not cur.fetchone() is None
+        cur.close()
+        return found
+
+    ## @brief Checks a collection of words with 'in (...)' queries.
+    # The words are looked up in chunks of DB_CHECK_CHUNK (to stay within the SQLite limit
+    # on query parameters), which for a crossword grid usually means a single query.
+    # Words containing the blank placeholder (' ') are patterns rather than words,
+    # so they are checked one by one by check().
+    # @see Wordsource::check_many()
+    def check_many(self, words, pos=None, filter_func=None):
+        words = [w.lower() for w in words]
+        if not self.isvalid() or not self.active: return [True] * len(words)
+        exact = list(dict.fromkeys(w for w in words if not ' ' in w))
+        found = set()
+        for i in range(0, len(exact), DB_CHECK_CHUNK):
+            try:
+                cur = self._execsql(*self._make_query(None, ' ', pos, None, exact[i:i + DB_CHECK_CHUNK]))
+            except:
+                cur = None
+            if not cur: continue
+            found.update(row[0] for row in cur if not filter_func or filter_func(row[0]))
+            cur.close()
+        return [(w in found) if not ' ' in w else self.check(w, pos, filter_func) for w in words]
 
 # ******************************************************************************** #
         
@@ -208,7 +390,7 @@ class TextWordsource(Wordsource):
     # @param max_fetch `int` maximum number of suggestions returned from the word source
     # @warning `None` means no limit on suggestions, which may be time/resource consuming!
     # @param shuffle `bool` if `True`, fetched words will be shuffled
-    def __init__(self, words=[], max_fetch=None, shuffle=True):        
+    def __init__(self, words=[], max_fetch=None, shuffle=True, indexed=True):        
         if words:
             ## `list` list of 2-tuples, where the first element is the source word
             # and the second element is either a list of parts of speech or `None` if 
@@ -218,15 +400,169 @@ class TextWordsource(Wordsource):
                          else (w.lower(), None) for w in words]
         else:
             self.words = []
+        ## `bool` if `True` (default), pattern queries are answered from the 
+        # positional letter index (see build_index()) rather than by a regex scan
+        self.indexed = indexed
+        self.build_index()
         super().__init__(max_fetch, shuffle)
         
     ## Valid only if TextWordsource::words not empty
     def isvalid(self):
         return len(self.words) > 0
+
+    ## @brief Builds the positional letter index over TextWordsource::words.
+    # Words are grouped by length; within each group, every (position, letter) pair
+    # is mapped onto a bitset (Python `int`) whose set bits are the indices of the words 
+    # having that letter at that position. A pattern like 'c_t__' is then resolved
+    # by AND-ing two bitsets from the 5-letter group instead of scanning all the words.
+    # Positions where some words have non-word characters (like hyphens) also get a 
+    # (position, `None`) bitset of the words having a word character there, 
+    # since blanks only stand for word characters (as in the regex-based search).
+    # The index must be rebuilt by calling this method if TextWordsource::words is modified.
+    def build_index(self):
+        ## `dict` | `None` word -> `list` of its entries in TextWordsource::words,
+        # made on demand by check_many()
+        self.members = None
+        ## `dict` positional letter index: word length -> `dict` with the keys:
+        #   * 'words': `list` of indices in TextWordsource::words
+        #   * 'bits': `dict` (position, letter) -> `int` bitset of group members
+        self.index = {}
+        if not self.indexed: return
+        groups = {}
+        for i, w in enumerate(self.words):
+            groups.setdefault(len(w[0]), []).append(i)
+        for wlen, ids in groups.items():
+            bits = {}
+            if wlen:
+                # code points of the group as a (words x positions) matrix
+                codes = np.frombuffer(''.join(self.words[i][0] for i in ids).encode('utf-32-le', 'surrogatepass'), 
+                                      dtype='<u4').reshape(len(ids), wlen)
+                for pos in range(wlen):
+                    column = codes[:, pos]
+                    nonword = None
+                    for code in np.unique(column):
+                        bits[(pos, chr(code))] = int.from_bytes(np.packbits(column == code, bitorder='little').tobytes(), 'little')
+                        if not re.match(r'\w', chr(code)):
+                            nonword = (column == code) if nonword is None else (nonword | (column == code))
+                    if not nonword is None:
+                        bits[(pos, None)] = int.from_bytes(np.packbits(~nonword, bitorder='little').tobytes(), 'little')
+            self.index[wlen] = {'words': ids, 'bits': bits}
+
+    ## Looks up the bitset of the words matching a given pattern in TextWordsource::index.
+    # @param word `str` the word pattern, e.g. 'f th  '
+    # @param blank `str` placeholder character for unknown (blank) letters
+    # @returns `2-tuple` (`dict` | `None` the index group of words of the pattern's length,
+    # `int` | `None` bitset of the matching group members; `None` if all the members match)
+    def _lookup_mask(self, word, blank=' '):
+        group = self.index.get(len(word), None)
+        if not group: return (None, 0)
+        mask = None
+        for pos, c in enumerate(word):
+            if c == blank: 
+                if not (pos, None) in group['bits']: continue
+                c = None
+            b = group['bits'].get((pos, c), 0)
+            mask = b if mask is None else (mask & b)
+            if not mask: return (group, 0)
+        return (group, mask)
+
+    ## Looks up the indices of the words matching a given pattern in TextWordsource::index.
+    # @param word `str` the word pattern, e.g. 'f th  '
+    # @param blank `str` placeholder character for unknown (blank) letters
+    # @returns `list` indices of matching words in TextWordsource::words (in their original order)
+    def _lookup(self, word, blank=' '):
+        group, mask = self._lookup_mask(word, blank)
+        if not mask is None and not mask: return []
+        if mask is None: return group['words'][:]
+        ids = group['words']
+        members = np.flatnonzero(np.unpackbits(np.frombuffer(mask.to_bytes((len(ids) + 7) // 8, 'little'), dtype=np.uint8), 
+                                               bitorder='little'))
+        return [ids[k] for k in members.tolist()]
+
+    ## Checks if a given word entry matches the part-of-speech filter.
+    # @param w `2-tuple` an entry in TextWordsource::words
+    # @param pos `str` | `iterable` | `None` part(s) of speech - see Wordsource::fetch()
+    # @returns `bool` `True` if the entry passes the filter
+    def _match_pos(self, w, pos):
+        if not w[1] or not pos: return True
+        if is_iterable(pos):
+            return any(p.upper() in w[1] for p in pos)
+        return pos.upper() in w[1]
             
     ## Fetches results from TextWordsource::words
-    def fetch(self, word=None, blank=' ', pos=None, filter_func=None, shuffle=True, truncate=True):
+    def fetch(self, word=None, blank=' ', pos=None, filter_func=None, shuffle=True, truncate=True, rng=None):
         if not self.isvalid() or not self.active: return []
+        if not self.indexed: 
+            return self._fetch_scan(word, blank, pos, filter_func, shuffle, truncate, rng)
+        return list(self.iter_fetch(word, blank, pos, filter_func, shuffle, truncate, rng))
+
+    ## @brief Yields results from TextWordsource::words.
+    # The candidates are looked up in the letter index (see build_index()) and visited 
+    # in a random order (see Wordsource::sample_order()); the filters are applied to 
+    # each candidate in turn until Wordsource::max_fetch words are found.
+    # @see Wordsource::iter_fetch()
+    def iter_fetch(self, word=None, blank=' ', pos=None, filter_func=None, shuffle=True, truncate=True, rng=None):
+        if not self.isvalid() or not self.active: return
+        if not self.indexed: 
+            yield from self._fetch_scan(word, blank, pos, filter_func, shuffle, truncate, rng)
+            return
+        ids = range(len(self.words)) if word is None else self._lookup(word.lower(), blank)
+        limit = self.max_fetch if truncate else None
+        n = 0
+        for k in self.sample_order(len(ids), shuffle, rng):
+            w = self.words[ids[k]]
+            if (filter_func and not filter_func(w[0])) or not self._match_pos(w, pos): continue
+            yield w[0]
+            n += 1
+            if limit and n >= limit: return
+
+    ## @brief Counts the matching words in TextWordsource::words.
+    # Without `filter_func` and `pos`, the count is taken from the bitset in the letter index
+    # (see build_index()); otherwise, the indexed candidates are checked one by one.
+    # @see Wordsource::count()
+    def count(self, word=None, blank=' ', pos=None, filter_func=None):
+        if not self.isvalid() or not self.active: return 0
+        if not self.indexed or word is None: 
+            return super().count(word, blank, pos, filter_func)
+        if not filter_func and not pos:
+            group, mask = self._lookup_mask(word.lower(), blank)
+            return len(group['words']) if mask is None else bin(mask).count('1')
+        return sum(1 for i in self._lookup(word.lower(), blank) 
+                   if (not filter_func or filter_func(self.words[i][0])) and self._match_pos(self.words[i], pos))
+
+    ## @brief Checks if any word in TextWordsource::words matches the pattern.
+    # Without `filter_func` and `pos`, the bitset in the letter index is checked for being non-empty
+    # (see build_index()); otherwise, the indexed candidates are checked until one matches.
+    # @see Wordsource::exists()
+    def exists(self, word=None, blank=' ', pos=None, filter_func=None):
+        if not self.isvalid() or not self.active: return False
+        if not self.indexed or word is None: 
+            return super().exists(word, blank, pos, filter_func)
+        if not filter_func and not pos:
+            return self._lookup_mask(word.lower(), blank)[1] != 0
+        return any((not filter_func or filter_func(self.words[i][0])) and self._match_pos(self.words[i], pos) 
+                   for i in self._lookup(word.lower(), blank))
+
+    ## @brief Checks a collection of words by hash lookups in TextWordsource::members.
+    # The lookup table is made on the first call (and dropped by build_index()).
+    # Words containing the blank placeholder (' ') are patterns rather than words,
+    # so they are checked one by one by check().
+    # @see Wordsource::check_many()
+    def check_many(self, words, pos=None, filter_func=None):
+        words = [w.lower() for w in words]
+        if not self.isvalid() or not self.active: return [True] * len(words)
+        if self.members is None:
+            self.members = {}
+            for w in self.words:
+                self.members.setdefault(w[0], []).append(w)
+        return [any((not filter_func or filter_func(entry[0])) and self._match_pos(entry, pos) 
+                    for entry in self.members.get(w, ())) if not ' ' in w else self.check(w, pos, filter_func) 
+                for w in words]
+
+    ## Fetches results from TextWordsource::words by matching each word against a regex
+    # (the non-indexed lookup used if TextWordsource::indexed is `False`).
+    # @see fetch()
+    def _fetch_scan(self, word=None, blank=' ', pos=None, filter_func=None, shuffle=True, truncate=True, rng=None):
         results = []
         regex_w = None if word is None else re.compile(word.lower().replace(blank, r'\w'))        
         for w in self.words:
@@ -247,7 +583,7 @@ class TextWordsource(Wordsource):
                     matched = False
             if matched:
                 results.append(w[0])
-        if shuffle: results = self.shuffle(results)
+        if shuffle: results = self.shuffle(results, rng)
         return self.truncate(results) if truncate else results
 
 # ******************************************************************************** #
@@ -263,7 +599,9 @@ class TextfileWordsource(TextWordsource):
     # @param max_fetch `int` maximum number of suggestions returned from the word source
     # @warning `None` means no limit on suggestions, which may be time/resource consuming!
     # @param shuffle `bool` if `True`, fetched words will be shuffled
-    def __init__(self, path, enc=ENCODING, delimiter=' ', max_fetch=None, shuffle=True):           
+    # @param indexed `bool` if `True` (default), a positional letter index will be built - 
+    # see TextWordsource::build_index()
+    def __init__(self, path, enc=ENCODING, delimiter=' ', max_fetch=None, shuffle=True, indexed=True):           
         self.words = []
         try:
             self._read_data(path, enc, delimiter)
@@ -271,6 +609,8 @@ class TextfileWordsource(TextWordsource):
             self._read_data(path, 'ascii', delimiter)
         except:
             pass
+        self.indexed = indexed
+        self.build_index()
         Wordsource.__init__(self, max_fetch, shuffle)
 
     def _read_data(self, path, enc=ENCODING, delimiter=' '):
@@ -302,11 +642,27 @@ class MultiWordsource(Wordsource):
     # suggested (extracted) from the start of the results list
     # @param max_fetch `int` maximum number of suggestions returned from the word source
     # @warning `None` means no limit on suggestions, which may be time/resource consuming!
-    def __init__(self, order='prefer-last', max_fetch=None):
+    # @param cache_size `int` maximum number of word patterns whose results are kept 
+    # in the cache (see MultiWordsource::cache); 0 or `None` disables caching
+    def __init__(self, order='prefer-last', max_fetch=None, cache_size=256):
         ## `str` the preference order for individual word sources and words
         self.order = order
         ## `list` container for Wordsource objects (word sources)
         self.sources = []
+        ## `int` maximum number of word patterns whose results are kept in the cache
+        self.cache_size = cache_size
+        ## `collections.OrderedDict` LRU cache of the raw (unfiltered, unshuffled and untruncated) 
+        # results fetched from the individual sources. The keys are tuples:
+        # (`str` pattern, `str` blank, part(s) of speech), the values are tuples 
+        # of 2-tuples: (`Wordsource` source, `list` words fetched from it). 
+        # Filtering, shuffling and truncation are applied on top of the cached results in fetch().
+        self.cache = OrderedDict()
+        ## `int` number of fetch() calls served from the cache
+        self.cache_hits = 0
+        ## `int` number of fetch() calls that had to query the sources
+        self.cache_misses = 0
+        # active sources the cached results have been fetched from
+        self._cached_sources = None
         # leave default value of 'shuffle', it's not used here
         super().__init__(max_fetch)
         
@@ -326,15 +682,36 @@ class MultiWordsource(Wordsource):
                 self.sources.insert(0, source)
         else:
             self.sources.insert(position, source)
+        self.clear_cache()
             
     ## Removes all word sources from MultiWordsource::sources.
     def clear(self):
         self.sources.clear()
+        self.clear_cache()
         
     ## Removes a single word source from MultiWordsource::sources.
     # @param index `int` the position index of the word source to remove
     def remove(self, index):
         self.sources.remove(index)
+        self.clear_cache()
+
+    ## @brief Empties the results cache (MultiWordsource::cache).
+    # The cache is cleared automatically when sources are added / removed or 
+    # (de)activated; call this method if the words in any of the sources have been changed.
+    # @param reset_stats `bool` if `True`, the hit / miss counters will also be reset
+    def clear_cache(self, reset_stats=False):
+        self.cache.clear()
+        self._cached_sources = None
+        if reset_stats:
+            self.cache_hits = 0
+            self.cache_misses = 0
+
+    ## Gets the cache statistics.
+    # @returns `dict` cache stats: 'hits', 'misses', 'size' (number of cached patterns)
+    # and 'maxsize' (MultiWordsource::cache_size)
+    def cache_info(self):
+        return {'hits': self.cache_hits, 'misses': self.cache_misses, 
+                'size': len(self.cache), 'maxsize': self.cache_size}
         
     def pop_word(self, suggestions):
         if not suggestions: return None
@@ -344,19 +721,139 @@ class MultiWordsource(Wordsource):
         if not suggestions: return []
         if not self.max_fetch: return suggestions
         return suggestions[:self.max_fetch]
+
+    ## @brief Gets the raw results for a word pattern from the active sources, using the cache.
+    # @param sources `iterable` word sources in the order of preference
+    # @see fetch() for description of the other arguments
+    # @returns `tuple` of 2-tuples: (`Wordsource` source, `list` words fetched from it)
+    def _fetch_cached(self, sources, word=None, blank=' ', pos=None):
+        sources = tuple(src for src in sources if src.active and src.isvalid())
+        # invalidate the cache if any source has been toggled (or replaced)
+        if sources != self._cached_sources:
+            self.cache.clear()
+            self._cached_sources = sources
+        key = (word, blank, tuple(pos) if is_iterable(pos) else pos)
+        results = self.cache.get(key, None)
+        if results is None:
+            self.cache_misses += 1
+            results = tuple((src, src.fetch(word, blank, pos, None, False, False)) for src in sources)
+            self.cache[key] = results
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        else:
+            self.cache_hits += 1
+            self.cache.move_to_end(key)
+        return results
         
     ## Fetches results from all the word sources and combines them into one list of words.
-    def fetch(self, word=None, blank=' ', pos=None, filter_func=None, shuffle=True, truncate=True):
+    def fetch(self, word=None, blank=' ', pos=None, filter_func=None, shuffle=True, truncate=True, rng=None):
         if not self.isvalid(): return []
+        return list(self.iter_fetch(word, blank, pos, filter_func, shuffle, truncate, rng))
+
+    ## @brief Yields the distinct results from all the word sources one by one.
+    # The sources are read one after another (in the order of preference), each in its own
+    # random order (if shuffled), skipping the words already produced,
+    # until MultiWordsource::max_fetch words are found.
+    # @see Wordsource::iter_fetch()
+    def iter_fetch(self, word=None, blank=' ', pos=None, filter_func=None, shuffle=True, truncate=True, rng=None):
+        if not self.isvalid(): return
         sources = self.sources if self.order == 'prefer-first' else reversed(self.sources)
-        suggestions = list(dict.fromkeys(itertools.chain.from_iterable((src.fetch(word, blank, pos, filter_func, shuffle, False) for src in sources))))
-        return self.truncate(suggestions) if suggestions and truncate else suggestions
+        if self.cache_size:
+            # visit the cached results of each source in a random order
+            results = ((words[k] for k in src.sample_order(len(words), shuffle, rng)) 
+                       for src, words in self._fetch_cached(sources, word, blank, pos))
+        else:
+            results = (src.iter_fetch(word, blank, pos, None, shuffle, False, rng) for src in sources)
+        limit = self.max_fetch if truncate else None
+        seen = set()
+        for w in itertools.chain.from_iterable(results):
+            if w in seen or (filter_func and not filter_func(w)): continue
+            seen.add(w)
+            yield w
+            if limit and len(seen) >= limit: return
     
+    ## @brief Counts the distinct words matching the pattern in all the active sources.
+    # A single active source is asked for its count(); otherwise, the words of all the sources
+    # (from the cache if enabled) must be merged to drop the duplicates.
+    # @see Wordsource::count()
+    def count(self, word=None, blank=' ', pos=None, filter_func=None):
+        if not self.isvalid(): return 0
+        sources = [src for src in self.sources if src.active and src.isvalid()]
+        if len(sources) == 1: return sources[0].count(word, blank, pos, filter_func)
+        return len(self.fetch(word, blank, pos, filter_func, shuffle=False, truncate=False))
+
+    ## @brief Checks if any of the active sources has a word matching the pattern.
+    # @see Wordsource::exists()
+    def exists(self, word=None, blank=' ', pos=None, filter_func=None):
+        if not self.isvalid(): return False
+        return any(src.exists(word, blank, pos, filter_func) for src in self.sources if src.active)
+
     def check(self, word, pos=None, filter_func=None):
         if not self.isvalid(): return False
         return any((src.check(word, pos, filter_func) for src in self.sources))
+
+    ## @brief Checks a collection of words in all the sources.
+    # Each source is asked only about the words not found in the previous ones.
+    # @see Wordsource::check_many()
+    def check_many(self, words, pos=None, filter_func=None):
+        words = list(words)
+        results = [False] * len(words)
+        if not self.isvalid(): return results
+        for src in self.sources:
+            missing = [i for i, ok in enumerate(results) if not ok]
+            if not missing: break
+            for i, ok in zip(missing, src.check_many([words[i] for i in missing], pos, filter_func)):
+                results[i] = ok
+        return results
     
     ## Python `len()` overload.
     # @returns `int` number of word sources in MultiWordsource::sources
     def __len__(self):
-        return len(self.sources)
\ No newline at end of file
+        return len(self.sources)
+
+# ******************************************************************************** #
+
+## @brief Creates a word source object from its serialized settings.
+# @param src `dict` serialized word source data -- see `pycross::forms::WordSrcDialog::__init__()`
+# for the format; the 'active' key is ignored
+# @returns `Wordsource` the new DBWordsource, TextfileWordsource or TextWordsource object,
+# or `None` if the source is unavailable (DB or text file not found, empty word list or unsupported type)
+def make_wordsource(src):
+    if src['type'] == 'db':
+        if src.get('dbtype', 'sqlite').lower() != 'sqlite': return None
+        fullpath = not src['file'].lower() in LANG
+        # Sqlitedb::setpath() would create an empty DB in place of a missing one
+        if not os.path.isfile(src['file'] if fullpath else os.path.join(DICFOLDER, src['file'] + '.db')): return None
+        db = Sqlitedb()
+        if not db.setpath(src['file'], fullpath=fullpath, recreate=False, connect=True):
+            return None
+        return DBWordsource(src.get('dbtables', SQL_TABLES), db, shuffle=src.get('shuffle', True))
+
+    elif src['type'] == 'file':
+        if not os.path.isfile(src['file']): return None
+        return TextfileWordsource(src['file'], enc=src.get('encoding', ENCODING), 
+                                  delimiter=src.get('delim', ' '), shuffle=src.get('shuffle', True))
+
+    elif src['type'] == 'list' and src.get('words', None):
+        words = []
+        if src.get('haspos', False):
+            for w in src['words']:
+                w = w.split(src.get('delim', ' '))
+                words.append((w[0], tuple(w[1:]) if len(w) > 1 else None))
+        else:
+            words = src['words']
+        return TextWordsource(words, shuffle=src.get('shuffle', True))
+
+    return None
+
+## @brief Creates a word filter excluding the given words (see crossword::Crossword::wordfilter).
+# @param words `list` of `str` words to exclude (or regex patterns if `regex` is `True`)
+# @param regex `bool` whether `words` are regex patterns (matched case-insensitively)
+# @returns `callable` | `None` filter function: (`str` word) -> `bool` `True` if the word can be used;
+# or `None` if `words` is empty
+def make_wordfilter(words, regex=False):
+    if not words: return None
+    if regex:
+        return lambda w: not any(re.fullmatch(pattern, w, re.I) for pattern in words)
+    excluded = set(pattern.lower() for pattern in words)
+    return lambda w: not w.lower() in excluded